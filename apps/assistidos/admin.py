@@ -1,9 +1,63 @@
 from django.contrib import admin
-from .models import Assistido
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models import Assistido, Cep, normalizar_busca
+from .signals import chave_faceta
+
+
+# Acima disso a contagem da listagem sem filtros vem da estatística do Postgres
+LIMIAR_CONTAGEM_ESTIMADA = 20000
+TEMPO_CACHE_FACETAS = 60 * 60
+
+
+class FacetaEmCacheListFilter(admin.AllValuesFieldListFilter):
+    """
+    Igual ao filtro padrão de valores (SELECT DISTINCT na tabela inteira),
+    mas a lista de valores fica em cache e é invalidada ao salvar/excluir
+    um Assistido (ver signals.py).
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        valores = self.lookup_choices
+        self.lookup_choices = cache.get_or_set(
+            chave_faceta(field_path),
+            lambda: list(valores),
+            TEMPO_CACHE_FACETAS,
+        )
+
+
+class ContagemEstimadaPaginator(Paginator):
+    """
+    Na listagem sem filtros/busca usa a estimativa do Postgres (pg_class.reltuples)
+    em vez de COUNT(*) quando a tabela é grande. Com filtro, conta normalmente.
+    """
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        conexao = connections[getattr(qs, "db", "default")]
+        if conexao.vendor == "postgresql" and not qs.query.where:
+            with conexao.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [qs.model._meta.db_table],
+                )
+                linha = cursor.fetchone()
+            if linha and linha[0] >= LIMIAR_CONTAGEM_ESTIMADA:
+                return linha[0]
+        return super().count
 
 
 @admin.register(Assistido)
 class AssistidoAdmin(admin.ModelAdmin):
+    paginator = ContagemEstimadaPaginator
+    # Evita o segundo COUNT(*) da tabela inteira ("x de N selecionados") ao filtrar
+    show_full_result_count = False
+
     # ==============================
     # LISTAGEM
     # ==============================
@@ -23,9 +77,9 @@ class AssistidoAdmin(admin.ModelAdmin):
     # ==============================
     list_filter = (
         "status",
-        "uf",
-        "bairro",
-        "cidade",
+        ("uf", FacetaEmCacheListFilter),
+        ("bairro", FacetaEmCacheListFilter),
+        ("cidade", FacetaEmCacheListFilter),
         "sit_trabalho",
         "faixa_renda",
         "tipo_moradia",
@@ -43,6 +97,19 @@ class AssistidoAdmin(admin.ModelAdmin):
 
     ordering = ("nome",)
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        A busca usa a coluna normalizada `busca` (índice trigram no Postgres)
+        em vez de OR de icontains em seis colunas. Cada palavra do termo
+        precisa aparecer no texto.
+        """
+        termo = normalizar_busca(search_term)
+        if not termo:
+            return queryset, False
+        for palavra in termo.split():
+            queryset = queryset.filter(busca__contains=palavra)
+        return queryset, False
+
     # ==============================
     # SOMENTE LEITURA
     # ==============================
@@ -118,3 +185,16 @@ class AssistidoAdmin(admin.ModelAdmin):
             )
         }),
     )
+
+
+@admin.register(Cep)
+class CepAdmin(admin.ModelAdmin):
+    """Tabela de referência: carregada por `manage.py importar_ceps`."""
+
+    paginator = ContagemEstimadaPaginator
+    show_full_result_count = False
+
+    list_display = ("cep", "logradouro", "bairro", "cidade", "uf")
+    list_filter = ("uf",)
+    search_fields = ("^cep", "logradouro")
+    readonly_fields = ("logradouro_busca",)
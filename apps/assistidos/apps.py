@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AssistidosConfig(AppConfig):
      name = "apps.assistidos"
+
+     def ready(self):
+          from . import signals  # noqa: F401
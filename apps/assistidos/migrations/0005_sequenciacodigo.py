@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistidos', '0004_alter_assistido_cep_alter_assistido_cpf_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenciaCodigo',
+            fields=[
+                ('dia', models.DateField(primary_key=True, serialize=False)),
+                ('ultimo', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Sequência de código',
+                'verbose_name_plural': 'Sequências de código',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:40
+
+import apps.assistidos.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistidos', '0005_sequenciacodigo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assistido',
+            name='id',
+            field=models.UUIDField(default=apps.assistidos.models.novo_id_assistido, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:10
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+CAMPOS_BUSCA = ("nome", "cpf", "telefone", "bairro", "logradouro", "cidade")
+
+
+def _normalizar_busca(valor):
+    valor = unicodedata.normalize("NFKD", valor or "")
+    valor = "".join(c for c in valor if not unicodedata.combining(c)).lower()
+    valor = "".join(c if c.isalnum() else " " for c in valor)
+    return " ".join(valor.split())
+
+
+def preencher_busca(apps, schema_editor):
+    Assistido = apps.get_model("assistidos", "Assistido")
+    lote = []
+    for a in Assistido.objects.only("id", *CAMPOS_BUSCA).iterator(chunk_size=2000):
+        a.busca = _normalizar_busca(" ".join(getattr(a, c) or "" for c in CAMPOS_BUSCA))[:500]
+        lote.append(a)
+        if len(lote) >= 2000:
+            Assistido.objects.bulk_update(lote, ["busca"])
+            lote = []
+    if lote:
+        Assistido.objects.bulk_update(lote, ["busca"])
+
+
+def criar_indice_trigram(apps, schema_editor):
+    # LIKE '%termo%' só usa índice com pg_trgm; nos outros bancos fica sem índice.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS assistidos_assistido_busca_trgm "
+        "ON assistidos_assistido USING gin (busca gin_trgm_ops)"
+    )
+
+
+def remover_indice_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS assistidos_assistido_busca_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistidos', '0006_assistido_id_uuid7'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assistido',
+            name='busca',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice_trigram, remover_indice_trigram),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistidos', '0007_assistido_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assistido',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistidos', '0008_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Cep',
+            fields=[
+                ('cep', models.CharField(max_length=8, primary_key=True, serialize=False, verbose_name='CEP')),
+                ('logradouro', models.CharField(blank=True, max_length=120)),
+                ('bairro', models.CharField(blank=True, max_length=80)),
+                ('cidade', models.CharField(max_length=80)),
+                ('uf', models.CharField(max_length=2, verbose_name='UF')),
+                ('logradouro_busca', models.CharField(blank=True, db_index=True, editable=False, max_length=120)),
+            ],
+            options={
+                'verbose_name': 'CEP',
+                'verbose_name_plural': 'CEPs',
+                'ordering': ['cep'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='assistido',
+            index=models.Index(fields=['cep'], name='assistido_cep_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assistido',
+            index=models.Index(fields=['cidade', 'bairro'], name='assistido_cidade_bairro_idx'),
+        ),
+    ]
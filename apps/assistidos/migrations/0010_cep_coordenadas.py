@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistidos', '0009_cep'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cep',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cep',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:30
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay, ExtractMonth
+
+
+def preencher_aniversario(apps, schema_editor):
+    # Um UPDATE só; depois disso o normalizar_campos() mantém o campo
+    Assistido = apps.get_model("assistidos", "Assistido")
+    Assistido.objects.filter(data_nascimento__isnull=False).update(
+        aniversario=ExtractMonth("data_nascimento") * 100 + ExtractDay("data_nascimento")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistidos', '0010_cep_coordenadas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assistido',
+            name='aniversario',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(preencher_aniversario, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='assistido',
+            index=models.Index(fields=['data_nascimento'], name='assistido_nascimento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assistido',
+            index=models.Index(fields=['aniversario'], name='assistido_aniversario_idx'),
+        ),
+    ]
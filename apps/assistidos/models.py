@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import secrets
+import os
+import time
+import unicodedata
 import uuid
 from datetime import date
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.utils import timezone
 
 
@@ -25,6 +29,53 @@ def normalizar_cpf(valor: str | None) -> str:
     return "".join(c for c in valor if c.isdigit())
 
 
+def normalizar_busca(valor: str | None) -> str:
+    """
+    Texto de busca: minúsculo, sem acentos e só letras/dígitos separados
+    por espaço ("José  da Silva-Jr." -> "jose da silva jr").
+    """
+    valor = unicodedata.normalize("NFKD", valor or "")
+    valor = "".join(c for c in valor if not unicodedata.combining(c)).lower()
+    valor = "".join(c if c.isalnum() else " " for c in valor)
+    return " ".join(valor.split())
+
+
+def mmdd(data: date | None) -> int | None:
+    """Dia do ano como MMDD (15/03 -> 315): aniversário comparável por faixa."""
+    if not data:
+        return None
+    return data.month * 100 + data.day
+
+
+def uuid7() -> uuid.UUID:
+    """
+    UUID versão 7 (RFC 9562): 48 bits de timestamp Unix em ms + 74 bits aleatórios.
+    Chaves geradas em sequência ficam próximas no índice (B-tree), ao contrário do uuid4.
+    """
+    ms = time.time_ns() // 1_000_000
+    aleatorio = int.from_bytes(os.urandom(10), "big")
+    rand_a = aleatorio >> 68            # 12 bits
+    rand_b = aleatorio & ((1 << 62) - 1)  # 62 bits
+    valor = (
+        (ms & ((1 << 48) - 1)) << 80
+        | 0x7 << 76
+        | rand_a << 64
+        | 0b10 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=valor)
+
+
+def novo_id_assistido() -> uuid.UUID:
+    """
+    Default do Assistido.id. Usa UUIDv7 (ordenado no tempo); com
+    ASSISTIDOS_UUID_V7 = False no settings volta ao uuid4 sem migration.
+    """
+    if getattr(settings, "ASSISTIDOS_UUID_V7", True):
+        return uuid7()
+    return uuid.uuid4()
+
+
 def cpf_valido(cpf: str) -> bool:
     cpf = normalizar_cpf(cpf)
 
@@ -106,7 +157,7 @@ class Escolaridade(models.TextChoices):
 # =============================================================================
 
 class Assistido(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=novo_id_assistido, editable=False)
 
     codigo = models.CharField(max_length=30, unique=True, blank=True, null=True)
 
@@ -173,9 +224,29 @@ class Assistido(models.Model):
     motivo_inativacao = models.CharField(max_length=200, blank=True)
 
     criado_em = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Texto normalizado (nome, CPF, telefone, endereço) usado pela busca do admin.
+    # Mantido pelo normalizar_campos(); no Postgres tem índice trigram (GIN).
+    busca = models.CharField(max_length=500, blank=True, default="", editable=False)
+
+    # data_nascimento como MMDD, mantido pelo normalizar_campos(): filtro de
+    # aniversário (mês, próximos dias) por faixa num índice, sem EXTRACT por linha
+    aniversario = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+
+    # Campos que compõem `busca`
+    CAMPOS_BUSCA = ("nome", "cpf", "telefone", "bairro", "logradouro", "cidade")
 
     class Meta:
         ordering = ["nome"]
+        indexes = [
+            # Filtros/agrupamentos de endereço exatos (valores acertados pela tabela de CEPs)
+            models.Index(fields=["cep"], name="assistido_cep_idx"),
+            models.Index(fields=["cidade", "bairro"], name="assistido_cidade_bairro_idx"),
+            # Faixa de idade = faixa de data de nascimento; ordenar por idade também
+            models.Index(fields=["data_nascimento"], name="assistido_nascimento_idx"),
+            models.Index(fields=["aniversario"], name="assistido_aniversario_idx"),
+        ]
 
     def __str__(self):
         return self.nome
@@ -186,6 +257,8 @@ class Assistido(models.Model):
 
     @property
     def idade(self):
+        if "_idade" in self.__dict__:  # calculada no banco (assistidos_queries.com_idade)
+            return self._idade
         if not self.data_nascimento:
             return None
         hoje = date.today()
@@ -247,16 +320,13 @@ class Assistido(models.Model):
         if self.cpf and not cpf_valido(self.cpf):
             raise ValidationError({"cpf": "CPF inválido."})
 
-    def save(self, *args, **kwargs):
-        if not self.codigo:
-            hoje = timezone.localdate().strftime("%Y%m%d")
-            while True:
-                sufixo = secrets.token_hex(2).upper()
-                codigo = f"A-{hoje}-{sufixo}"
-                if not Assistido.objects.filter(codigo=codigo).exists():
-                    self.codigo = codigo
-                    break
-
+    def normalizar_campos(self):
+        """
+        Normalizações aplicadas antes de gravar (CPF/CEP só dígitos,
+        data de inativação coerente com o status, aniversário e texto de busca).
+        Usado pelo save() e pelos caminhos em lote (bulk_create), que não
+        passam pelo save().
+        """
         if self.cpf:
             self.cpf = normalizar_cpf(self.cpf)
         else:
@@ -270,4 +340,133 @@ class Assistido(models.Model):
         if self.status == StatusCadastro.ATIVO:
             self.data_inativacao = None
 
+        self.aniversario = mmdd(self.data_nascimento)
+        self.busca = self.texto_busca()
+
+    def texto_busca(self) -> str:
+        partes = (getattr(self, campo) or "" for campo in self.CAMPOS_BUSCA)
+        return normalizar_busca(" ".join(partes))[:500]
+
+    def save(self, *args, **kwargs):
+        if not self.codigo:
+            self.codigo = reservar_codigos(1)[0]
+
+        self.normalizar_campos()
+
+        super().save(*args, **kwargs)
+
+
+# =============================================================================
+# SEQUÊNCIA DE CÓDIGOS (A-AAAAMMDD-XXXX)
+# =============================================================================
+
+class SequenciaCodigo(models.Model):
+    """
+    Contador diário usado para gerar Assistido.codigo.
+    Uma linha por dia; `ultimo` guarda o último sufixo já entregue.
+    """
+
+    dia = models.DateField(primary_key=True)
+    ultimo = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Sequência de código"
+        verbose_name_plural = "Sequências de código"
+
+    def __str__(self):
+        return f"{self.dia:%Y%m%d} → {self.ultimo:04X}"
+
+
+MAIOR_SUFIXO = 0xFFFF  # A-AAAAMMDD-XXXX: 4 dígitos hexadecimais
+
+
+class CodigosEsgotados(Exception):
+    """O dia não tem mais sufixos de 4 dígitos livres."""
+
+
+def _maior_sufixo_existente(dia: date) -> int:
+    """
+    Maior sufixo já usado no dia (códigos antigos eram aleatórios), pelo
+    valor numérico: ordem de texto erra com sufixos de tamanhos diferentes.
+    Só roda quando o contador do dia é criado.
+    """
+    prefixo = f"A-{dia:%Y%m%d}-"
+    maior = 0
+    for codigo in Assistido.objects.filter(codigo__startswith=prefixo).values_list("codigo", flat=True).iterator():
+        try:
+            maior = max(maior, int(codigo[len(prefixo):], 16))
+        except ValueError:
+            continue
+    return maior
+
+
+def reservar_codigos(quantidade: int = 1, dia: date | None = None) -> list[str]:
+    """
+    Reserva `quantidade` códigos consecutivos do dia com um único UPDATE
+    (ultimo = ultimo + quantidade). O UPDATE bloqueia a linha do dia até o
+    fim da transação, então inserções concorrentes nunca recebem o mesmo sufixo.
+    Passar de FFFF levanta CodigosEsgotados (a reserva é desfeita).
+    """
+    if quantidade < 1:
+        return []
+
+    dia = dia or timezone.localdate()
+    sequencias = SequenciaCodigo.objects.filter(dia=dia)
+
+    with transaction.atomic():
+        if not sequencias.update(ultimo=F("ultimo") + quantidade):
+            try:
+                with transaction.atomic():
+                    SequenciaCodigo.objects.create(dia=dia, ultimo=_maior_sufixo_existente(dia))
+            except IntegrityError:
+                pass  # outro processo criou o contador do dia ao mesmo tempo
+            sequencias.update(ultimo=F("ultimo") + quantidade)
+
+        ultimo = sequencias.values_list("ultimo", flat=True).get()
+        if ultimo > MAIOR_SUFIXO:
+            raise CodigosEsgotados(
+                f"Códigos de {dia:%d/%m/%Y} esgotados: {quantidade} pedidos, "
+                f"último sufixo seria {ultimo:X} (máximo {MAIOR_SUFIXO:X})."
+            )
+
+    inicio = ultimo - quantidade + 1
+    return [f"A-{dia:%Y%m%d}-{n:04X}" for n in range(inicio, ultimo + 1)]
+
+
+# =============================================================================
+# TABELA DE CEPs (referência local)
+# =============================================================================
+
+class Cep(models.Model):
+    """
+    Endereço de cada CEP, carregado de arquivo (manage.py importar_ceps);
+    nada é consultado fora. Usado no autocompletar do cadastro e para
+    acertar o endereço dos assistidos (manage.py normalizar_enderecos).
+    """
+
+    cep = models.CharField(max_length=8, primary_key=True, verbose_name="CEP")
+    logradouro = models.CharField(max_length=120, blank=True)
+    bairro = models.CharField(max_length=80, blank=True)
+    cidade = models.CharField(max_length=80)
+    uf = models.CharField(max_length=2, verbose_name="UF")
+
+    # Centro aproximado do CEP (graus), quando o arquivo traz: rota das entregas
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+
+    # normalizar_busca(logradouro): busca por prefixo sem acento/caixa, indexada
+    logradouro_busca = models.CharField(max_length=120, blank=True, db_index=True, editable=False)
+
+    class Meta:
+        ordering = ["cep"]
+        verbose_name = "CEP"
+        verbose_name_plural = "CEPs"
+
+    def __str__(self):
+        return f"{self.cep[:5]}-{self.cep[5:]} {self.logradouro or self.cidade}"
+
+    def save(self, *args, **kwargs):
+        self.cep = normalizar_cep(self.cep).zfill(8)
+        self.uf = (self.uf or "").upper()
+        self.logradouro_busca = normalizar_busca(self.logradouro)[:120]
         super().save(*args, **kwargs)
@@ -0,0 +1,25 @@
+# apps/assistidos/signals.py
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Assistido
+
+
+# Campos de texto livre com filtro no admin (lista de valores em cache)
+CAMPOS_FACETA = ("bairro", "cidade", "uf")
+
+
+def chave_faceta(campo: str) -> str:
+    return f"assistidos:faceta:{campo}"
+
+
+def limpar_cache_facetas():
+    """Descarta as listas de valores dos filtros do admin (recalculadas no próximo acesso)."""
+    cache.delete_many([chave_faceta(c) for c in CAMPOS_FACETA])
+
+
+@receiver(post_save, sender=Assistido)
+@receiver(post_delete, sender=Assistido)
+def assistido_alterado(sender, **kwargs):
+    limpar_cache_facetas()
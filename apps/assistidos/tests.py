@@ -1,3 +1,54 @@
-from django.test import TestCase
+import time
+import uuid
+from datetime import date
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from .models import Assistido, CodigosEsgotados, SequenciaCodigo, reservar_codigos, uuid7
+
+
+DIA = date(2026, 1, 15)
+
+
+class ReservarCodigosTests(TestCase):
+    def test_codigos_consecutivos_no_formato(self):
+        self.assertEqual(reservar_codigos(3, DIA), ["A-20260115-0001", "A-20260115-0002", "A-20260115-0003"])
+        self.assertEqual(reservar_codigos(1, DIA), ["A-20260115-0004"])
+
+    def test_continua_depois_do_maior_sufixo_antigo(self):
+        # Códigos antigos (aleatórios): vale o maior valor numérico
+        for sufixo in ("00FF", "0A10", "009Z"):
+            Assistido.objects.create(nome=f"Antigo {sufixo}", codigo=f"A-20260115-{sufixo}")
+        self.assertEqual(reservar_codigos(1, DIA), ["A-20260115-0A11"])
+
+    def test_quantidade_zero_nao_reserva(self):
+        self.assertEqual(reservar_codigos(0, DIA), [])
+        self.assertFalse(SequenciaCodigo.objects.filter(dia=DIA).exists())
+
+    def test_passar_de_ffff_falha_e_desfaz_a_reserva(self):
+        SequenciaCodigo.objects.create(dia=DIA, ultimo=0xFFFE)
+        self.assertEqual(reservar_codigos(1, DIA), ["A-20260115-FFFF"])
+        with self.assertRaises(CodigosEsgotados):
+            reservar_codigos(2, DIA)
+        self.assertEqual(SequenciaCodigo.objects.get(dia=DIA).ultimo, 0xFFFF)
+
+
+class Uuid7Tests(SimpleTestCase):
+    def test_versao_e_variante(self):
+        valor = uuid7()
+        self.assertEqual(valor.version, 7)
+        self.assertEqual(valor.variant, uuid.RFC_4122)
+
+    def test_timestamp_em_ms_no_inicio(self):
+        antes = time.time_ns() // 1_000_000
+        valor = uuid7()
+        depois = time.time_ns() // 1_000_000
+        self.assertTrue(antes <= valor.int >> 80 <= depois)
+
+    def test_ordenados_no_tempo_e_unicos(self):
+        valores = []
+        for _ in range(3):
+            valores.append(uuid7())
+            time.sleep(0.002)  # ms diferentes: a ordem não depende da parte aleatória
+        self.assertEqual(valores, sorted(valores))
+        self.assertEqual(len({uuid7() for _ in range(1000)}), 1000)
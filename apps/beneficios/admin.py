@@ -1,13 +1,57 @@
+from collections import defaultdict
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.forms.models import BaseInlineFormSet
+from django.utils import timezone
+
+from apps.operacoes.services.auditoria import registrar_entregas
+from apps.operacoes.services.eventos_lote import notificar_itens
+
 from .models import Beneficio, BeneficioAssistido,  LoteEntrega, ItemEntrega
 
 
+class ItemEntregaInlineFormSet(BaseInlineFormSet):
+    """
+    Formset do inline paginado: renderiza só uma página de itens por vez
+    (?itens_pagina=N na URL do lote), em vez de centenas de formulários.
+    """
+
+    por_pagina = 50
+    numero_pagina = 1
+
+    def get_queryset(self):
+        if not hasattr(self, "_queryset_pagina"):
+            qs = super().get_queryset()
+            # Desempate por pk: nomes repetidos não podem trocar de página
+            # entre o GET que renderiza e o POST que valida
+            ordem = qs.query.order_by or qs.model._meta.ordering
+            paginator = Paginator(qs.order_by(*ordem, "pk"), self.por_pagina)
+            self.pagina = paginator.get_page(self.numero_pagina)
+            self._queryset_pagina = self.pagina.object_list
+        return self._queryset_pagina
+
+
 class ItemEntregaInline(admin.TabularInline):
     model = ItemEntrega
+    formset = ItemEntregaInlineFormSet
+    template = "admin/beneficios/itementrega/tabular_paginado.html"
     extra = 0
     fields = ("assistido_nome", "entregue")
     readonly_fields = ("assistido_nome",)
 
+    def get_queryset(self, request):
+        # assistido_nome e o __str__ de cada linha (lote/atribuição) sem consulta extra por item
+        return super().get_queryset(request).select_related(
+            "lote__beneficio", "atribuicao__assistido", "atribuicao__beneficio"
+        )
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.numero_pagina = request.GET.get("itens_pagina") or 1
+        return formset
+
     def assistido_nome(self, obj):
         # obj.atribuicao -> BeneficioAssistido -> assistido -> nome
         return obj.atribuicao.assistido.nome
@@ -37,6 +81,63 @@ class LoteEntregaAdmin(admin.ModelAdmin):
     search_fields = ("beneficio__nome",)
     date_hierarchy = "data_entrega"
     inlines = [ItemEntregaInline]
+    actions = ["marcar_itens_entregues", "marcar_itens_pendentes"]
+
+    def _marcar_itens(self, request, queryset, entregue: bool) -> int:
+        """
+        Um único UPDATE ... WHERE id IN (...). Os ids são lidos (e travados)
+        antes, na mesma transação: a auditoria leva exatamente os alterados.
+        """
+        agora = timezone.now()
+        with transaction.atomic():
+            pares = list(
+                ItemEntrega.objects
+                .select_for_update(of=("self",))  # sem travar os lotes (JOIN)
+                .filter(lote__in=queryset, entregue=not entregue)
+                .values_list("lote_id", "id")
+            )
+            total = ItemEntrega.objects.filter(id__in=[i for _, i in pares]).update(
+                entregue=entregue, marcado_em=agora, atualizado_em=agora
+            )
+            por_lote = defaultdict(list)
+            for lote_id, item_id in pares:
+                por_lote[lote_id].append((item_id, entregue))
+            for lote_id, alterados in por_lote.items():
+                notificar_itens(lote_id, alterados)
+                registrar_entregas(lote_id, alterados, "admin", usuario=request.user)
+        return total
+
+    @admin.action(description="Marcar todos os itens dos lotes selecionados como ENTREGUES")
+    def marcar_itens_entregues(self, request, queryset):
+        total = self._marcar_itens(request, queryset, True)
+        self.message_user(request, f"{total} item(ns) marcado(s) como entregue(s).")
+
+    @admin.action(description="Marcar todos os itens dos lotes selecionados como PENDENTES")
+    def marcar_itens_pendentes(self, request, queryset):
+        total = self._marcar_itens(request, queryset, False)
+        self.message_user(request, f"{total} item(ns) marcado(s) como pendente(s).")
+
+    def save_formset(self, request, form, formset, change):
+        if formset.model is not ItemEntrega:
+            return super().save_formset(request, form, formset, change)
+
+        itens = formset.save(commit=False)
+        # Marcado/desmarcado no inline: marcado_em novo, como no checklist
+        # (a sincronização offline decide pelo mais recente)
+        agora = timezone.now()
+        alterados = []
+        for item, campos in formset.changed_objects:
+            if "entregue" in campos:
+                item.marcado_em = agora
+                alterados.append((item.pk, item.entregue))
+        for item in itens:
+            item.save()
+        for item in formset.deleted_objects:
+            item.delete()
+        formset.save_m2m()
+
+        notificar_itens(form.instance.pk, alterados)
+        registrar_entregas(form.instance.pk, alterados, "admin", usuario=request.user)
 
     def save_model(self, request, obj, form, change):
         # 1) Salva o lote primeiro (precisa do obj.id)
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('beneficios', '0004_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itementrega',
+            name='marcado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistidos', '0008_atualizado_em'),
+        ('beneficios', '0005_itementrega_marcado_em'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='beneficioassistido',
+            index=models.Index(fields=['assistido', 'beneficio'], name='atrib_assist_benef_idx'),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Tudo (quente + arquivo) para as consultas que alcançam o arquivo.
+# UNION ALL: os ids não se repetem (o arquivo guarda o id original).
+VIEWS = """
+CREATE VIEW beneficios_loteentrega_historico AS
+    SELECT id, beneficio_id, data_entrega, criado_em, atualizado_em, FALSE AS arquivado
+      FROM beneficios_loteentrega
+    UNION ALL
+    SELECT id, beneficio_id, data_entrega, criado_em, atualizado_em, TRUE AS arquivado
+      FROM beneficios_loteentregaarquivo;
+
+CREATE VIEW beneficios_itementrega_historico AS
+    SELECT id, lote_id, atribuicao_id, entregue, marcado_em, atualizado_em
+      FROM beneficios_itementrega
+    UNION ALL
+    SELECT id, lote_id, atribuicao_id, entregue, marcado_em, atualizado_em
+      FROM beneficios_itementregaarquivo;
+"""
+
+REMOVER_VIEWS = """
+DROP VIEW IF EXISTS beneficios_itementrega_historico;
+DROP VIEW IF EXISTS beneficios_loteentrega_historico;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('beneficios', '0006_indice_atribuicao_assistido_beneficio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemEntregaHistorico',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('entregue', models.BooleanField()),
+                ('marcado_em', models.DateTimeField(null=True)),
+                ('atualizado_em', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'beneficios_itementrega_historico',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='LoteEntregaHistorico',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('data_entrega', models.DateField()),
+                ('criado_em', models.DateTimeField()),
+                ('atualizado_em', models.DateTimeField()),
+                ('arquivado', models.BooleanField()),
+            ],
+            options={
+                'db_table': 'beneficios_loteentrega_historico',
+                'ordering': ('-data_entrega', '-id'),
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='LoteEntregaArquivo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('data_entrega', models.DateField()),
+                ('criado_em', models.DateTimeField()),
+                ('atualizado_em', models.DateTimeField()),
+                ('beneficio', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lotes_arquivados', to='beneficios.beneficio')),
+            ],
+            options={
+                'verbose_name': 'Lote de Entrega (arquivo)',
+                'verbose_name_plural': 'Lotes de Entrega (arquivo)',
+                'ordering': ('-data_entrega', '-id'),
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemEntregaArquivo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('entregue', models.BooleanField(default=False)),
+                ('marcado_em', models.DateTimeField(blank=True, null=True)),
+                ('atualizado_em', models.DateTimeField()),
+                ('atribuicao', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entregas_arquivadas', to='beneficios.beneficioassistido')),
+                ('lote', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='itens', to='beneficios.loteentregaarquivo')),
+            ],
+            options={
+                'verbose_name': 'Item de Entrega (arquivo)',
+                'verbose_name_plural': 'Itens de Entrega (arquivo)',
+            },
+        ),
+        migrations.RunSQL(VIEWS, REMOVER_VIEWS),
+    ]
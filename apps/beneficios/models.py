@@ -46,6 +46,8 @@ class Beneficio(models.Model):
         help_text="Permite desativar um benefício sem apagá-lo.",
     )
 
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True)
+
     class Meta:
         ordering = ["categoria", "nome"]
 
@@ -82,9 +84,14 @@ class BeneficioAssistido(models.Model):
     data_termino = models.DateField(null=True, blank=True)
 
     criado_em = models.DateTimeField(default=timezone.now)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["-criado_em"]
+        indexes = [
+            # "este assistido já tem ciclo deste benefício?" (atribuição em massa)
+            models.Index(fields=["assistido", "beneficio"], name="atrib_assist_benef_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["assistido", "beneficio"],
@@ -187,6 +194,7 @@ class LoteEntrega(models.Model):
     )
     data_entrega = models.DateField()
     criado_em = models.DateTimeField(default=timezone.now)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("beneficio", "data_entrega")
@@ -209,6 +217,10 @@ class ItemEntrega(models.Model):
         related_name="entregas",
     )
     entregue = models.BooleanField(default=False)
+    # Momento da última marcação (no aparelho, quando vem do checklist offline).
+    # Usado como "última escrita vence" na sincronização em lote.
+    marcado_em = models.DateTimeField(null=True, blank=True)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("lote", "atribuicao")
@@ -218,4 +230,96 @@ class ItemEntrega(models.Model):
 
     def __str__(self):
         status = "Entregue" if self.entregue else "Pendente"
-        return f"{self.lote} - {self.atribuicao} ({status})"
\ No newline at end of file
+        return f"{self.lote} - {self.atribuicao} ({status})"
+
+# =========================
+#  ARQUIVO (lotes antigos)
+# =========================
+
+class LoteEntregaArquivo(models.Model):
+    """
+    Lote antigo movido pelo `manage.py arquivar_lotes` (tabela fria).
+    Mantém o id original: links e eventos de auditoria continuam valendo.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    beneficio = models.ForeignKey(
+        "beneficios.Beneficio",
+        on_delete=models.PROTECT,
+        related_name="lotes_arquivados",
+    )
+    data_entrega = models.DateField()
+    criado_em = models.DateTimeField()
+    atualizado_em = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-data_entrega", "-id")
+        verbose_name = "Lote de Entrega (arquivo)"
+        verbose_name_plural = "Lotes de Entrega (arquivo)"
+
+
+class ItemEntregaArquivo(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    lote = models.ForeignKey(
+        LoteEntregaArquivo,
+        on_delete=models.CASCADE,
+        related_name="itens",
+    )
+    atribuicao = models.ForeignKey(
+        "beneficios.BeneficioAssistido",
+        on_delete=models.PROTECT,
+        related_name="entregas_arquivadas",
+    )
+    entregue = models.BooleanField(default=False)
+    marcado_em = models.DateTimeField(null=True, blank=True)
+    atualizado_em = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Item de Entrega (arquivo)"
+        verbose_name_plural = "Itens de Entrega (arquivo)"
+
+
+# Leitura de tudo (quente + arquivo): views SQL com UNION ALL, criadas na
+# migração 0007. Só leitura; usadas pelas consultas quando o período pedido
+# alcança o arquivo.
+
+class LoteEntregaHistorico(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    beneficio = models.ForeignKey(
+        "beneficios.Beneficio",
+        on_delete=models.DO_NOTHING,
+        related_name="+",
+    )
+    data_entrega = models.DateField()
+    criado_em = models.DateTimeField()
+    atualizado_em = models.DateTimeField()
+    arquivado = models.BooleanField()
+
+    class Meta:
+        managed = False
+        db_table = "beneficios_loteentrega_historico"
+        ordering = ("-data_entrega", "-id")
+
+    def __str__(self):
+        return f"{self.beneficio} - {self.data_entrega.strftime('%d/%m/%Y')}"
+
+
+class ItemEntregaHistorico(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    lote = models.ForeignKey(
+        LoteEntregaHistorico,
+        on_delete=models.DO_NOTHING,
+        related_name="itens",
+    )
+    atribuicao = models.ForeignKey(
+        "beneficios.BeneficioAssistido",
+        on_delete=models.DO_NOTHING,
+        related_name="historico_entregas",
+    )
+    entregue = models.BooleanField()
+    marcado_em = models.DateTimeField(null=True)
+    atualizado_em = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "beneficios_itementrega_historico"
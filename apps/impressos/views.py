@@ -1,6 +1,25 @@
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import render
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponseForbidden
+from django.shortcuts import get_object_or_404, render
+from django.templatetags.static import static
+
+from apps.assistidos.models import Assistido
+from apps.operacoes.permissoes import pode_ver
+
 
 @login_required
 def ficha_inscricao(request):
-    return render(request, "impressos/ficha_inscricao_assistido.html")
+    # ?assistido=<id> -> ficha preenchida com o cadastro; sem parâmetro, em branco
+    assistidos = []
+    assistido_id = (request.GET.get("assistido") or "").strip()
+    if assistido_id:
+        if not pode_ver(request.user):
+            return HttpResponseForbidden("Sem permissão.")
+        try:
+            assistidos = [get_object_or_404(Assistido, id=assistido_id)]
+        except ValidationError:  # id que não é UUID
+            raise Http404
+
+    contexto = {"assistidos": assistidos, "logo_src": static("img/logo.png")}
+    return render(request, "impressos/ficha_inscricao_assistido.html", contexto)
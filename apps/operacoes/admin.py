@@ -1,3 +1,30 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import EventoAuditoria, Tarefa
+
+
+@admin.register(Tarefa)
+class TarefaAdmin(admin.ModelAdmin):
+    list_display = ("id", "tipo", "status", "progresso", "criado_por", "criado_em", "concluido_em", "worker")
+    list_filter = ("status", "tipo")
+    search_fields = ("tipo", "mensagem")
+    readonly_fields = [f.name for f in Tarefa._meta.fields]
+    list_select_related = ("criado_por",)
+
+
+@admin.register(EventoAuditoria)
+class EventoAuditoriaAdmin(admin.ModelAdmin):
+    list_display = ("criado_em", "acao", "resumo", "quantidade", "usuario")
+    list_filter = ("acao",)
+    search_fields = ("resumo", "modelo", "objeto_id")
+    readonly_fields = [f.name for f in EventoAuditoria._meta.fields]
+    list_select_related = ("usuario",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
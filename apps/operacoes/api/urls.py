@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = "api"
+
+urlpatterns = [
+    path("assistidos/", views.assistidos, name="assistidos"),
+    path("atribuicoes/", views.atribuicoes, name="atribuicoes"),
+    path("entregas/lotes/", views.entregas_lotes, name="entregas_lotes"),
+    path("entregas/itens/", views.entregas_itens, name="entregas_itens"),
+]
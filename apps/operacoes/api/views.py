@@ -0,0 +1,310 @@
+# apps/operacoes/api/views.py
+"""
+API JSON somente leitura (planilhas, app de tablet etc.).
+
+- Mesmos filtros das consultas (services/*_queries.py).
+- Serialização via values(): nenhum model é instanciado.
+- Paginação por cursor (keyset): ?limite=N&cursor=<next_cursor da resposta anterior>.
+- Seleção de campos: ?campos=id,nome,cpf
+- ETag/Last-Modified: resposta 304 quando as tabelas não mudaram (services/versoes.py),
+  sem rodar a consulta nem serializar.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from functools import wraps
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+
+from apps.beneficios.models import BeneficioAssistido
+from apps.operacoes.permissoes import pode_ver
+from apps.operacoes.services.assistidos_queries import assistidos_identificacao_qs
+from apps.operacoes.services.entregas_queries import historico_itens_por_assistido, lotes_com_resumo
+from apps.operacoes.services.versoes import (
+    TABELAS_ASSISTIDOS,
+    TABELAS_ATRIBUICOES,
+    TABELAS_ENTREGAS,
+    consulta_condicional,
+)
+
+
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 1000
+
+
+# =========================
+#  CAMPOS (nome público -> caminho no ORM)
+# =========================
+
+CAMPOS_ASSISTIDO = {
+    "id": "id",
+    "codigo": "codigo",
+    "nome": "nome",
+    "cpf": "cpf",
+    "data_nascimento": "data_nascimento",
+    "idade": "_idade",  # anotada no banco (assistidos_queries.com_idade)
+    "telefone": "telefone",
+    "status": "status",
+    "logradouro": "logradouro",
+    "numero": "numero",
+    "complemento": "complemento",
+    "bairro": "bairro",
+    "cidade": "cidade",
+    "uf": "uf",
+    "cep": "cep",
+    "criado_em": "criado_em",
+    "atualizado_em": "atualizado_em",
+}
+PADRAO_ASSISTIDO = ("id", "codigo", "nome", "status", "telefone", "logradouro", "numero", "cep")
+
+CAMPOS_ATRIBUICAO = {
+    "id": "id",
+    "assistido_id": "assistido_id",
+    "assistido_nome": "assistido__nome",
+    "beneficio_id": "beneficio_id",
+    "beneficio_nome": "beneficio__nome",
+    "ativo": "ativo",
+    "data_inicio": "data_inicio",
+    "data_termino": "data_termino",
+    "criado_em": "criado_em",
+    "atualizado_em": "atualizado_em",
+}
+PADRAO_ATRIBUICAO = tuple(CAMPOS_ATRIBUICAO)
+
+CAMPOS_ITEM = {
+    "id": "id",
+    "entregue": "entregue",
+    "lote_id": "lote_id",
+    "data_entrega": "lote__data_entrega",
+    "beneficio_id": "lote__beneficio_id",
+    "beneficio_nome": "lote__beneficio__nome",
+    "atribuicao_id": "atribuicao_id",
+    "assistido_id": "atribuicao__assistido_id",
+    "assistido_nome": "atribuicao__assistido__nome",
+    "atualizado_em": "atualizado_em",
+}
+PADRAO_ITEM = tuple(CAMPOS_ITEM)
+
+CAMPOS_LOTE = {
+    "id": "id",
+    "data_entrega": "data_entrega",
+    "beneficio_id": "beneficio_id",
+    "beneficio_nome": "beneficio__nome",
+    "total": "total",
+    "entregues": "entregues",
+    "pendentes": "pendentes",
+}
+PADRAO_LOTE = tuple(CAMPOS_LOTE)
+
+
+# =========================
+#  HELPERS
+# =========================
+
+class ParametroInvalido(Exception):
+    pass
+
+
+def api_view(view):
+    """GET autenticado com permissão de consulta; erros em JSON (sem redirect para login)."""
+
+    @require_GET
+    @wraps(view)
+    def _view(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({"erro": "Autenticação necessária."}, status=401)
+        if not pode_ver(request.user):
+            return JsonResponse({"erro": "Sem permissão."}, status=403)
+        try:
+            return view(request, *args, **kwargs)
+        except ParametroInvalido as exc:
+            return JsonResponse({"erro": str(exc)}, status=400)
+
+    return _view
+
+
+def _get(request, nome, padrao=""):
+    return (request.GET.get(nome) or padrao).strip()
+
+
+def _campos_solicitados(request, disponiveis: dict, padrao: tuple) -> list[str]:
+    bruto = _get(request, "campos")
+    if not bruto:
+        return list(padrao)
+    campos = [c.strip() for c in bruto.split(",") if c.strip()]
+    invalidos = [c for c in campos if c not in disponiveis]
+    if invalidos:
+        raise ParametroInvalido(f"Campos inválidos: {', '.join(invalidos)}")
+    return campos
+
+
+def _limite(request) -> int:
+    bruto = _get(request, "limite", str(LIMITE_PADRAO))
+    if not bruto.isdigit() or int(bruto) < 1:
+        raise ParametroInvalido("limite deve ser um inteiro positivo.")
+    return min(int(bruto), LIMITE_MAXIMO)
+
+
+def _codificar_cursor(valores: list) -> str:
+    bruto = json.dumps(valores, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def _campo_ordem(qs, caminho: str):
+    """Field do model (ou da anotação) por trás de um caminho de ordenação."""
+    if caminho in qs.query.annotations:
+        return qs.query.annotations[caminho].output_field
+    model = qs.model
+    partes = caminho.split("__")
+    for parte in partes[:-1]:
+        model = model._meta.get_field(parte).related_model
+    return model._meta.get_field(partes[-1])
+
+
+def _decodificar_cursor(cursor: str, qs, ordem: list[str]) -> list:
+    """
+    Valores do cursor já convertidos para o tipo de cada campo da ordem:
+    cursor bem formado com valor do tipo errado também é 400, não 500.
+    """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(bruto)
+    except (ValueError, TypeError):
+        raise ParametroInvalido("cursor inválido.")
+    if not isinstance(valores, list) or len(valores) != len(ordem):
+        raise ParametroInvalido("cursor inválido.")
+
+    convertidos = []
+    for campo, valor in zip(ordem, valores):
+        try:
+            if valor is None or isinstance(valor, (list, dict)):
+                raise ValidationError("tipo")
+            convertidos.append(_campo_ordem(qs, campo.lstrip("-")).to_python(valor))
+        except (ValidationError, ValueError, TypeError, FieldDoesNotExist):
+            raise ParametroInvalido("cursor inválido.")
+    return convertidos
+
+
+def _filtro_apos(ordem: list[str], valores: list) -> Q:
+    """
+    Keyset: linhas que vêm DEPOIS de `valores` na ordenação `ordem`
+    (ex.: ["nome", "id"] -> nome > v0 OR (nome = v0 AND id > v1)).
+    """
+    filtro = Q()
+    for i, campo in enumerate(ordem):
+        desc = campo.startswith("-")
+        nome = campo.lstrip("-")
+        cond = Q(**{f"{nome}__lt" if desc else f"{nome}__gt": valores[i]})
+        for anterior, valor in zip(ordem[:i], valores[:i]):
+            cond &= Q(**{anterior.lstrip("-"): valor})
+        filtro |= cond
+    return filtro
+
+
+def _paginar(request, qs, ordem: list[str], disponiveis: dict, padrao: tuple):
+    """Aplica cursor/limite/campos e devolve (linhas, next_cursor) usando values()."""
+    campos = _campos_solicitados(request, disponiveis, padrao)
+    limite = _limite(request)
+    chaves = [c.lstrip("-") for c in ordem]
+
+    qs = qs.order_by(*ordem)
+    cursor = _get(request, "cursor")
+    if cursor:
+        qs = qs.filter(_filtro_apos(ordem, _decodificar_cursor(cursor, qs, ordem)))
+
+    caminhos = list(dict.fromkeys([disponiveis[c] for c in campos] + chaves))
+    linhas = list(qs.values(*caminhos)[: limite + 1])
+
+    proximo = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo = _codificar_cursor([linhas[-1][c] for c in chaves])
+
+    resultado = [{c: linha[disponiveis[c]] for c in campos} for linha in linhas]
+    return resultado, proximo
+
+
+def _responder(resultados, proximo):
+    corpo = json.dumps(
+        {"results": resultados, "next_cursor": proximo},
+        cls=DjangoJSONEncoder,
+        ensure_ascii=False,
+    )
+    return HttpResponse(corpo, content_type="application/json; charset=utf-8")
+
+
+# =========================
+#  ENDPOINTS
+# =========================
+
+@api_view
+@consulta_condicional(*TABELAS_ASSISTIDOS)
+def assistidos(request):
+    qs = assistidos_identificacao_qs(
+        q=_get(request, "q"),
+        status=_get(request, "status"),
+        logradouro=_get(request, "logradouro"),
+        cep=_get(request, "cep"),
+        bairro=_get(request, "bairro"),
+        cidade=_get(request, "cidade"),
+        idade_min=_get(request, "idade_min"),
+        idade_max=_get(request, "idade_max"),
+        aniversario=_get(request, "aniversario"),
+    )
+    resultados, proximo = _paginar(request, qs, ["nome", "id"], CAMPOS_ASSISTIDO, PADRAO_ASSISTIDO)
+    return _responder(resultados, proximo)
+
+
+@api_view
+@consulta_condicional(*TABELAS_ATRIBUICOES)
+def atribuicoes(request):
+    qs = BeneficioAssistido.objects.all()
+
+    status = _get(request, "status", "todos").lower()
+    if status == "ativos":
+        qs = qs.filter(ativo=True)
+    elif status == "encerrados":
+        qs = qs.filter(ativo=False)
+
+    beneficio_id = _get(request, "beneficio_id")
+    if beneficio_id.isdigit():
+        qs = qs.filter(beneficio_id=int(beneficio_id))
+
+    q = _get(request, "q")
+    if q:
+        qs = qs.filter(Q(assistido__nome__icontains=q) | Q(assistido__cpf__icontains=q))
+
+    resultados, proximo = _paginar(request, qs, ["-id"], CAMPOS_ATRIBUICAO, PADRAO_ATRIBUICAO)
+    return _responder(resultados, proximo)
+
+
+@api_view
+@consulta_condicional(*TABELAS_ENTREGAS)
+def entregas_itens(request):
+    qs = historico_itens_por_assistido(
+        q=_get(request, "q"),
+        data_ini=_get(request, "data_ini"),
+        data_fim=_get(request, "data_fim"),
+        beneficio_id=_get(request, "beneficio_id"),
+        status=_get(request, "status", "todos"),
+    )
+    resultados, proximo = _paginar(request, qs, ["-lote__data_entrega", "-id"], CAMPOS_ITEM, PADRAO_ITEM)
+    return _responder(resultados, proximo)
+
+
+@api_view
+@consulta_condicional(*TABELAS_ENTREGAS)
+def entregas_lotes(request):
+    qs = lotes_com_resumo(
+        q=_get(request, "q"),
+        data_ini=_get(request, "data_ini"),
+        data_fim=_get(request, "data_fim"),
+        beneficio_id=_get(request, "beneficio_id"),
+    )
+    resultados, proximo = _paginar(request, qs, ["-data_entrega", "-id"], CAMPOS_LOTE, PADRAO_LOTE)
+    return _responder(resultados, proximo)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class OperacoesConfig(AppConfig):
     name = "apps.operacoes"
 
+    def ready(self):
+        # Registra os tipos de tarefa em segundo plano
+        from . import tarefas  # noqa: F401
+        # Auditoria das alterações de cadastro e atribuição
+        from . import signals  # noqa: F401
@@ -37,6 +37,10 @@ urlpatterns = [
 
     path("lotes/", views.consulta_lotes_resumo, name="consulta_lotes_resumo"),
 
+    # Elegibilidade: quem deveria ter recebido no período e não recebeu
+    path("entregas/faltosos/", views.entregas_faltosos, name="entregas_faltosos"),
+    path("entregas/faltosos/imprimir/", views.entregas_faltosos_print, name="entregas_faltosos_print"),
+
 
     ]
 
@@ -2,28 +2,40 @@ from __future__ import annotations
 
 from datetime import date
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db.models import Count, Q
-from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
 from django.utils.dateparse import parse_date
 
 from apps.assistidos.models import Assistido, TriSimNao
-from apps.beneficios.models import Beneficio, BeneficioAssistido, ItemEntrega, LoteEntrega
-from apps.operacoes.permissoes import pode_ver
-
+from apps.beneficios.models import Beneficio, BeneficioAssistido, ItemEntrega, LoteEntrega, LoteEntregaHistorico
+from apps.operacoes.fragmentos import pede_fragmento, render_lista
 from apps.operacoes.services.assistidos_queries import (
     assistidos_identificacao_qs,
     assistidos_saude_qs,
     assistidos_socioeconomico_qs,
 )
+from apps.operacoes.services import elegibilidade
+from apps.operacoes.services.arquivo_entregas import data_corte, modelo_itens
+from apps.operacoes.services.ceps import opcoes_endereco
+from apps.operacoes.services.rotas import itens_em_rota
+from apps.operacoes.services.consultas_async import materializar, render_async
 from apps.operacoes.services.entregas_queries import (
     historico_itens_por_assistido,
     itens_do_lote,
     lotes_com_resumo,
     opcoes_beneficios,
 )
+from apps.operacoes.services.versoes import (
+    TABELAS_ASSISTIDOS,
+    TABELAS_ATRIBUICOES,
+    TABELAS_CHAMADA,
+    TABELAS_ENTREGAS,
+    consulta_condicional,
+)
 
 # =========================
 #  ORDENAÇÃO (WHITELISTS)
@@ -69,6 +81,11 @@ ORDERS_IDENTIFICACAO = {
     "-cep": "-cep",
     "logradouro": "logradouro",
     "-logradouro": "-logradouro",
+    # idade crescente = nascimento decrescente (índice em data_nascimento)
+    "idade": "-data_nascimento",
+    "-idade": "data_nascimento",
+    "aniversario": "aniversario",  # próximo aniversário primeiro (assistidos_identificacao_qs)
+    "-aniversario": "-aniversario",
 }
 
 ORDERS_SAUDE = {
@@ -106,6 +123,15 @@ ORDERS_BENEFICIO_ASSISTIDOS = {
     "-data_termino": "-data_termino",
 }
 
+ORDERS_FALTOSOS = {
+    "assistido__nome": "assistido__nome",
+    "-assistido__nome": "-assistido__nome",
+    "data_inicio": "data_inicio",
+    "-data_inicio": "-data_inicio",
+    "ultima_entrega": "ultima_entrega",
+    "-ultima_entrega": "-ultima_entrega",
+}
+
 # =========================
 #  HELPERS DE ORDER
 # =========================
@@ -135,45 +161,58 @@ def _get_order_entregas_lote(request):
 def _get_order_beneficio_assistidos(request):
     return _get_order(request, ORDERS_BENEFICIO_ASSISTIDOS, "assistido__nome")
 
+def _get_order_faltosos(request):
+    return _get_order(request, ORDERS_FALTOSOS, "assistido__nome")
+
 # =========================
 #  CONSULTAS - ASSISTIDOS
 # =========================
 
 @login_required
-def identificacao_lista(request):
-    if not pode_ver(request.user):
-        return HttpResponse("Sem permissão.", status=403)
-
+@consulta_condicional(*TABELAS_ASSISTIDOS)
+async def identificacao_lista(request):
     qs = assistidos_identificacao_qs(
         q=(request.GET.get("q") or "").strip(),
         status=(request.GET.get("status") or "").strip(),
         logradouro=(request.GET.get("logradouro") or "").strip(),
         cep=(request.GET.get("cep") or "").strip(),
+        bairro=(request.GET.get("bairro") or "").strip(),
+        cidade=(request.GET.get("cidade") or "").strip(),
+        idade_min=(request.GET.get("idade_min") or "").strip(),
+        idade_max=(request.GET.get("idade_max") or "").strip(),
+        aniversario=(request.GET.get("aniversario") or "").strip(),
         order_by=_get_order_identificacao(request),
     )
-    return render(request, "operacoes/consultas/identificacao_lista.html", {"assistidos": qs, "total": qs.count()})
+    assistidos = await materializar(qs)
+    contexto = {"assistidos": assistidos, "total": len(assistidos)}
+    if not pede_fragmento(request):  # listas dos filtros só na página inteira
+        contexto["opcoes_bairro"] = await sync_to_async(opcoes_endereco)("bairro")
+        contexto["opcoes_cidade"] = await sync_to_async(opcoes_endereco)("cidade")
+    return await render_async(request, "operacoes/consultas/identificacao_lista.html", contexto, lista=True)
 
 
 @login_required
-def identificacao_print(request):
-    if not pode_ver(request.user):
-        return HttpResponse("Sem permissão.", status=403)
-
+@consulta_condicional(*TABELAS_ASSISTIDOS)
+async def identificacao_print(request):
     qs = assistidos_identificacao_qs(
         q=(request.GET.get("q") or "").strip(),
         status=(request.GET.get("status") or "").strip(),
         logradouro=(request.GET.get("logradouro") or "").strip(),
         cep=(request.GET.get("cep") or "").strip(),
+        bairro=(request.GET.get("bairro") or "").strip(),
+        cidade=(request.GET.get("cidade") or "").strip(),
+        idade_min=(request.GET.get("idade_min") or "").strip(),
+        idade_max=(request.GET.get("idade_max") or "").strip(),
+        aniversario=(request.GET.get("aniversario") or "").strip(),
         order_by=_get_order_identificacao(request),
     )
-    return render(request, "operacoes/consultas/identificacao_print.html", {"assistidos": qs, "total": qs.count()})
+    assistidos = await materializar(qs)
+    return await render_async(request, "operacoes/consultas/identificacao_print.html", {"assistidos": assistidos, "total": len(assistidos)})
 
 
 @login_required
-def saude_lista(request):
-    if not pode_ver(request.user):
-        return HttpResponse("Sem permissão.", status=403)
-
+@consulta_condicional(*TABELAS_ASSISTIDOS)
+async def saude_lista(request):
     qs = assistidos_saude_qs(
         q=(request.GET.get("q") or "").strip(),
         status=(request.GET.get("status") or "").strip(),
@@ -183,23 +222,22 @@ def saude_lista(request):
         doenca_permanente=(request.GET.get("doenca_permanente") or "").strip(),
         order_by=_get_order_saude(request),
     )
+    assistidos = await materializar(qs)
 
     contexto = {
-        "assistidos": qs,
-        "total": qs.count(),
+        "assistidos": assistidos,
+        "total": len(assistidos),
         "choices_diabetes": TriSimNao.choices,
         "choices_pressao_alta": TriSimNao.choices,
         "choices_medic_uso_continuo": TriSimNao.choices,
         "choices_doenca_permanente": TriSimNao.choices,
     }
-    return render(request, "operacoes/consultas/saude_lista.html", contexto)
+    return await render_async(request, "operacoes/consultas/saude_lista.html", contexto, lista=True)
 
 
 @login_required
-def saude_print(request):
-    if not pode_ver(request.user):
-        return HttpResponse("Sem permissão.", status=403)
-
+@consulta_condicional(*TABELAS_ASSISTIDOS)
+async def saude_print(request):
     qs = assistidos_saude_qs(
         q=(request.GET.get("q") or "").strip(),
         status=(request.GET.get("status") or "").strip(),
@@ -209,23 +247,22 @@ def saude_print(request):
         doenca_permanente=(request.GET.get("doenca_permanente") or "").strip(),
         order_by=_get_order_saude(request),
     )
+    assistidos = await materializar(qs)
 
     contexto = {
-        "assistidos": qs,
-        "total": qs.count(),
+        "assistidos": assistidos,
+        "total": len(assistidos),
         "choices_diabetes": TriSimNao.choices,
         "choices_pressao_alta": TriSimNao.choices,
         "choices_medic_uso_continuo": TriSimNao.choices,
         "choices_doenca_permanente": TriSimNao.choices,
     }
-    return render(request, "operacoes/consultas/saude_print.html", contexto)
+    return await render_async(request, "operacoes/consultas/saude_print.html", contexto)
 
 
 @login_required
-def socioeconomico_lista(request):
-    if not pode_ver(request.user):
-        return HttpResponse("Sem permissão.", status=403)
-
+@consulta_condicional(*TABELAS_ASSISTIDOS)
+async def socioeconomico_lista(request):
     qs = assistidos_socioeconomico_qs(
         q=(request.GET.get("q") or "").strip(),
         status=(request.GET.get("status") or "").strip(),
@@ -236,24 +273,23 @@ def socioeconomico_lista(request):
         area_risco=(request.GET.get("area_risco") or "").strip(),
         order_by=_get_order_socioeconomico(request),
     )
+    assistidos = await materializar(qs)
 
     contexto = {
-        "assistidos": qs,
-        "total": qs.count(),
+        "assistidos": assistidos,
+        "total": len(assistidos),
         "choices_sit_trabalho": Assistido._meta.get_field("sit_trabalho").choices,
         "choices_faixa_renda": Assistido._meta.get_field("faixa_renda").choices,
         "choices_tipo_moradia": Assistido._meta.get_field("tipo_moradia").choices,
         "choices_escolaridade": Assistido._meta.get_field("escolaridade").choices,
         "choices_area_risco": Assistido._meta.get_field("area_risco").choices,
     }
-    return render(request, "operacoes/consultas/socioeconomico_lista.html", contexto)
+    return await render_async(request, "operacoes/consultas/socioeconomico_lista.html", contexto, lista=True)
 
 
 @login_required
-def socioeconomico_print(request):
-    if not pode_ver(request.user):
-        return HttpResponse("Sem permissão.", status=403)
-
+@consulta_condicional(*TABELAS_ASSISTIDOS)
+async def socioeconomico_print(request):
     qs = assistidos_socioeconomico_qs(
         q=(request.GET.get("q") or "").strip(),
         status=(request.GET.get("status") or "").strip(),
@@ -264,17 +300,18 @@ def socioeconomico_print(request):
         area_risco=(request.GET.get("area_risco") or "").strip(),
         order_by=_get_order_socioeconomico(request),
     )
+    assistidos = await materializar(qs)
 
     contexto = {
-        "assistidos": qs,
-        "total": qs.count(),
+        "assistidos": assistidos,
+        "total": len(assistidos),
         "choices_sit_trabalho": Assistido._meta.get_field("sit_trabalho").choices,
         "choices_faixa_renda": Assistido._meta.get_field("faixa_renda").choices,
         "choices_tipo_moradia": Assistido._meta.get_field("tipo_moradia").choices,
         "choices_escolaridade": Assistido._meta.get_field("escolaridade").choices,
         "choices_area_risco": Assistido._meta.get_field("area_risco").choices,
     }
-    return render(request, "operacoes/consultas/socioeconomico_print.html", contexto)
+    return await render_async(request, "operacoes/consultas/socioeconomico_print.html", contexto)
 
 # =========================
 #  CONSULTAS - ATRIBUIÇÕES
@@ -282,10 +319,8 @@ def socioeconomico_print(request):
 # (mantive seu código como está; podemos migrar para service depois)
 
 @login_required
+@consulta_condicional(*TABELAS_ATRIBUICOES)
 def atribuicoes_consulta(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     status = (request.GET.get("status") or "todos").strip().lower()
     q = (request.GET.get("q") or "").strip()
 
@@ -310,14 +345,12 @@ def atribuicoes_consulta(request):
         grupos.setdefault(a.assistido, []).append(a)
 
     contexto = {"grupos": grupos, "status": status, "q": q, "total": qs.count()}
-    return render(request, "operacoes/consultas/atribuicoes_consulta_lista.html", contexto)
+    return render_lista(request, "operacoes/consultas/atribuicoes_consulta_lista.html", contexto)
 
 
 @login_required
+@consulta_condicional(*TABELAS_ATRIBUICOES)
 def atribuicoes_consulta_print(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     status = (request.GET.get("status") or "todos").strip().lower()
     q = (request.GET.get("q") or "").strip()
 
@@ -349,10 +382,8 @@ def atribuicoes_consulta_print(request):
 # =========================
 
 @login_required
+@consulta_condicional(*TABELAS_ATRIBUICOES)
 def beneficio_assistidos_consulta(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     beneficio_id = (request.GET.get("beneficio_id") or "").strip()
     status = (request.GET.get("status") or "ativos").strip().lower()
     order = _get_order_beneficio_assistidos(request)
@@ -385,14 +416,12 @@ def beneficio_assistidos_consulta(request):
         "atribuicoes": qs,
         "total": qs.count(),
     }
-    return render(request, "operacoes/consultas/beneficio_assistidos_lista.html", contexto)
+    return render_lista(request, "operacoes/consultas/beneficio_assistidos_lista.html", contexto)
 
 
 @login_required
+@consulta_condicional(*TABELAS_ATRIBUICOES)
 def beneficio_assistidos_print(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     beneficio_id = (request.GET.get("beneficio_id") or "").strip()
     status = (request.GET.get("status") or "ativos").strip().lower()
     order = _get_order_beneficio_assistidos(request)
@@ -435,10 +464,8 @@ def beneficio_assistidos_print(request):
 # =========================
 
 @login_required
-def entregas_lotes_lista(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
+@consulta_condicional(*TABELAS_ENTREGAS)
+async def entregas_lotes_lista(request):
     q = (request.GET.get("q") or "").strip()
     data_ini = (request.GET.get("data_ini") or "").strip()
     data_fim = (request.GET.get("data_fim") or "").strip()
@@ -451,24 +478,24 @@ def entregas_lotes_lista(request):
         beneficio_id=beneficio_id,
         order_by=_get_order_entregas_lotes(request),
     )
+    lotes = await materializar(qs)
 
     contexto = {
-        "lotes": qs,
-        "total": qs.count(),
-        "beneficios": opcoes_beneficios(),
+        "lotes": lotes,
+        "total": len(lotes),
+        "beneficios": await materializar(opcoes_beneficios()),
         "q": q,
         "beneficio_id": beneficio_id,
         "data_ini": data_ini,
         "data_fim": data_fim,
+        "arquivo_corte": data_corte(),
     }
-    return render(request, "operacoes/consultas/entregas_lotes_lista.html", contexto)
+    return await render_async(request, "operacoes/consultas/entregas_lotes_lista.html", contexto, lista=True)
 
 
 @login_required
-def entregas_lotes_print(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
+@consulta_condicional(*TABELAS_ENTREGAS)
+async def entregas_lotes_print(request):
     q = (request.GET.get("q") or "").strip()
     data_ini = (request.GET.get("data_ini") or "").strip()
     data_fim = (request.GET.get("data_fim") or "").strip()
@@ -481,24 +508,23 @@ def entregas_lotes_print(request):
         beneficio_id=beneficio_id,
         order_by=_get_order_entregas_lotes(request),
     )
+    lotes = await materializar(qs)
 
     contexto = {
-        "lotes": qs,
-        "total": qs.count(),
-        "beneficios": opcoes_beneficios(),
+        "lotes": lotes,
+        "total": len(lotes),
+        "beneficios": await materializar(opcoes_beneficios()),
         "q": q,
         "beneficio_id": beneficio_id,
         "data_ini": data_ini,
         "data_fim": data_fim,
     }
-    return render(request, "operacoes/consultas/entregas_lotes_print.html", contexto)
+    return await render_async(request, "operacoes/consultas/entregas_lotes_print.html", contexto)
 
 
 @login_required
+@consulta_condicional(*TABELAS_ENTREGAS)
 def entregas_lote_detalhe(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     lote_id = (request.GET.get("lote_id") or "").strip()
     order = _get_order_entregas_lote(request)
     lote, itens_qs, entregues, pendentes = itens_do_lote(lote_id=lote_id, order_by=order)
@@ -516,10 +542,8 @@ def entregas_lote_detalhe(request):
 
 
 @login_required
+@consulta_condicional(*TABELAS_ENTREGAS)
 def entregas_lote_print(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     lote_id = (request.GET.get("lote_id") or "").strip()
     order = _get_order_entregas_lote(request)
     lote, itens_qs, entregues, pendentes = itens_do_lote(lote_id=lote_id, order_by=order)
@@ -537,10 +561,8 @@ def entregas_lote_print(request):
 
 
 @login_required
+@consulta_condicional(*TABELAS_ENTREGAS)
 def entregas_assistido_historico(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     q = (request.GET.get("q") or "").strip()
     data_ini = (request.GET.get("data_ini") or "").strip()
     data_fim = (request.GET.get("data_fim") or "").strip()
@@ -568,15 +590,14 @@ def entregas_assistido_historico(request):
         "total": qs.count(),
         "entregues_count": qs.filter(entregue=True).count(),
         "pendentes_count": qs.filter(entregue=False).count(),
+        "arquivo_corte": data_corte(),
     }
-    return render(request, "operacoes/consultas/entregas_assistido_historico.html", contexto)
+    return render_lista(request, "operacoes/consultas/entregas_assistido_historico.html", contexto)
 
 
 @login_required
+@consulta_condicional(*TABELAS_ENTREGAS)
 def entregas_assistido_historico_print(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     q = (request.GET.get("q") or "").strip()
     data_ini = (request.GET.get("data_ini") or "").strip()
     data_fim = (request.GET.get("data_fim") or "").strip()
@@ -609,10 +630,8 @@ def entregas_assistido_historico_print(request):
 
 
 @login_required
+@consulta_condicional(*TABELAS_CHAMADA)
 def entregas_lote_chamada(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     data_ini = (request.GET.get("data_ini") or "").strip()
     data_fim = (request.GET.get("data_fim") or "").strip()
     beneficio_id = (request.GET.get("beneficio_id") or "").strip()
@@ -642,31 +661,40 @@ def entregas_lote_chamada(request):
         "beneficio_id": beneficio_id,
         "total": len(lotes_list),
     }
-    return render(request, "operacoes/consultas/entregas_lote_chamada.html", contexto)
+    return render_lista(request, "operacoes/consultas/entregas_lote_chamada.html", contexto)
 
 
 @login_required
+@consulta_condicional(*TABELAS_CHAMADA)
 def entregas_lote_chamada_print(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
     lote_id = (request.GET.get("lote_id") or "").strip()
     if not lote_id.isdigit():
         messages.error(request, "Informe um lote válido para imprimir a lista de chamada.")
         return redirect("consultas:entregas_lote_chamada")
 
-    lote = get_object_or_404(LoteEntrega.objects.select_related("beneficio"), id=int(lote_id))
-    itens_qs = ItemEntrega.objects.select_related("atribuicao__assistido").filter(lote=lote).order_by("atribuicao__assistido__nome")
+    lote = LoteEntrega.objects.select_related("beneficio").filter(id=int(lote_id)).first()
+    if lote is None:
+        # Lote já arquivado: mesma lista, lida das views do histórico
+        lote = get_object_or_404(LoteEntregaHistorico.objects.select_related("beneficio"), id=int(lote_id))
+    rota = request.GET.get("ordem") == "rota"
+    if rota:
+        # Entrega em casa: por bairro, na ordem do caminho (services/rotas.py)
+        itens = itens_em_rota(lote)
+    else:
+        itens = list(
+            modelo_itens(lote).objects
+            .select_related("atribuicao__assistido")
+            .filter(lote_id=lote.pk)
+            .order_by("atribuicao__assistido__nome")
+        )
 
-    contexto = {"lote": lote, "itens": itens_qs, "total": itens_qs.count()}
+    contexto = {"lote": lote, "itens": itens, "total": len(itens), "rota": rota}
     return render(request, "operacoes/consultas/entregas_lote_chamada_print.html", contexto)
 
 
 @login_required
-def consulta_lotes_resumo(request):
-    if not pode_ver(request.user):
-        return HttpResponseForbidden("Sem permissão.")
-
+@consulta_condicional(*TABELAS_ENTREGAS)
+async def consulta_lotes_resumo(request):
     q = (request.GET.get("q") or "").strip()
     beneficio_id = (request.GET.get("beneficio_id") or request.GET.get("beneficio") or "").strip()
     data_ini = (request.GET.get("data_ini") or request.GET.get("data_inicio") or request.GET.get("data_inicial") or "").strip()
@@ -679,14 +707,65 @@ def consulta_lotes_resumo(request):
         beneficio_id=beneficio_id,
         order_by="-data_entrega",
     )
+    lotes = await materializar(qs)
 
     contexto = {
-        "lotes": qs,
-        "beneficios": opcoes_beneficios(),
+        "lotes": lotes,
+        "beneficios": await materializar(opcoes_beneficios()),
         "q": q,
         "beneficio_id": beneficio_id,
         "data_ini": data_ini,
         "data_fim": data_fim,
         "campo_data": "data_entrega",
     }
-    return render(request, "operacoes/consultas/lotes_resumo.html", contexto)
+    return await render_async(request, "operacoes/consultas/lotes_resumo.html", contexto, lista=True)
+
+
+# =========================
+#  CONSULTAS - FALTOSOS (elegibilidade)
+# =========================
+
+def _contexto_faltosos(request) -> dict:
+    beneficio_id = (request.GET.get("beneficio_id") or "").strip()
+    try:
+        data = parse_date((request.GET.get("data") or "").strip()) or timezone.localdate()
+    except ValueError:
+        data = timezone.localdate()
+    situacao = (request.GET.get("situacao") or "pendentes").strip().lower()
+    if situacao not in elegibilidade.SITUACOES:
+        situacao = "pendentes"
+
+    beneficio = Beneficio.objects.filter(id=beneficio_id).first() if beneficio_id.isdigit() else None
+
+    contexto = {
+        "beneficios": Beneficio.objects.order_by("nome", "id"),
+        "beneficio_id": beneficio_id,
+        "beneficio_sel": beneficio,
+        "data": data,
+        "situacao": situacao,
+        "atribuicoes": [],
+        "total": 0,
+        "resumo": None,
+    }
+    if beneficio:
+        atribuicoes = list(
+            elegibilidade.relatorio(beneficio, data, situacao, _get_order_faltosos(request))
+        )
+        contexto.update(
+            atribuicoes=atribuicoes,
+            total=len(atribuicoes),
+            resumo=elegibilidade.resumo(beneficio, data),
+        )
+    return contexto
+
+
+@login_required
+@consulta_condicional(*TABELAS_ENTREGAS)
+def entregas_faltosos(request):
+    return render_lista(request, "operacoes/consultas/entregas_faltosos.html", _contexto_faltosos(request))
+
+
+@login_required
+@consulta_condicional(*TABELAS_ENTREGAS)
+def entregas_faltosos_print(request):
+    return render(request, "operacoes/consultas/entregas_faltosos_print.html", _contexto_faltosos(request))
@@ -0,0 +1,40 @@
+# apps/operacoes/fragmentos.py
+"""
+Respostas parciais (só o bloco de resultados) para filtros e ordenação.
+
+Cada tela de lista "x.html" inclui o parcial "_x_resultados.html" dentro de
+<div id="resultados" data-fragmento-alvo>. Quando o pedido vem com o cabeçalho
+X-Fragmento: 1 (ou ?fragmento=1), a view devolve só o parcial, sem base.html.
+O JS de base.html faz o fetch e troca o conteúdo; sem JS tudo funciona como antes.
+"""
+import posixpath
+
+from django.shortcuts import render
+from django.utils.cache import patch_vary_headers
+
+
+CABECALHO = "X-Fragmento"
+PARAMETRO = "fragmento"
+
+
+def pede_fragmento(request) -> bool:
+    return request.headers.get(CABECALHO) == "1" or request.GET.get(PARAMETRO) == "1"
+
+
+def template_resultados(template_name: str) -> str:
+    """"operacoes/consultas/saude_lista.html" -> "operacoes/consultas/_saude_lista_resultados.html"."""
+    pasta, nome = posixpath.split(template_name)
+    raiz, ext = posixpath.splitext(nome)
+    return posixpath.join(pasta, f"_{raiz}_resultados{ext}")
+
+
+def render_lista(request, template_name, contexto=None):
+    """render() que devolve só o parcial de resultados quando pedido."""
+    if pede_fragmento(request):
+        resposta = render(request, template_resultados(template_name), contexto)
+        resposta[CABECALHO] = "1"
+    else:
+        resposta = render(request, template_name, contexto)
+    # Página inteira e fragmento têm a mesma URL: caches precisam separar
+    patch_vary_headers(resposta, [CABECALHO])
+    return resposta
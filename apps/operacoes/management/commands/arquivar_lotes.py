@@ -0,0 +1,65 @@
+# apps/operacoes/management/commands/arquivar_lotes.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from apps.operacoes.services.arquivo_entregas import (
+    LOTES_POR_BLOCO,
+    arquivar_lotes,
+    data_corte,
+    lotes_arquivaveis,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move lotes de entrega antigos (e os seus itens) para as tabelas de arquivo. "
+        "Corte: entregas antes de hoje - ARQUIVO_ENTREGAS_MESES (primeiro dia do mês)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--meses",
+            type=int,
+            default=settings.ARQUIVO_ENTREGAS_MESES,
+            help=(
+                f"Arquivar entregas com mais de N meses (padrão: {settings.ARQUIVO_ENTREGAS_MESES}; "
+                "não pode ser menor que ARQUIVO_ENTREGAS_MESES)"
+            ),
+        )
+        parser.add_argument(
+            "--bloco",
+            type=int,
+            default=LOTES_POR_BLOCO,
+            help=f"Lotes por transação (padrão: {LOTES_POR_BLOCO})",
+        )
+        parser.add_argument("--simular", action="store_true", help="Só mostra o que seria arquivado")
+
+    def handle(self, *args, **options):
+        if options["meses"] < settings.ARQUIVO_ENTREGAS_MESES:
+            # As consultas decidem pelo corte da configuração se leem o arquivo
+            raise CommandError(
+                f"--meses não pode ser menor que ARQUIVO_ENTREGAS_MESES ({settings.ARQUIVO_ENTREGAS_MESES})."
+            )
+        antes_de = data_corte(options["meses"])
+
+        if options["simular"]:
+            totais = lotes_arquivaveis(antes_de).aggregate(lotes=Count("id", distinct=True), itens=Count("itens"))
+            self.stdout.write(
+                f"Entregas antes de {antes_de:%d/%m/%Y}: {totais['lotes']} lotes, {totais['itens']} itens."
+            )
+            return
+
+        def progresso(feitos, total, itens):
+            self.stdout.write(f"  {feitos}/{total} lotes ({itens} itens)")
+
+        inicio = time.monotonic()
+        resultado = arquivar_lotes(antes_de, bloco=options["bloco"], progresso=progresso)
+        duracao = time.monotonic() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Arquivados: {resultado['lotes']} lotes, {resultado['itens']} itens "
+            f"(entregas antes de {antes_de:%d/%m/%Y}) | tempo: {duracao:.1f}s"
+        ))
@@ -0,0 +1,153 @@
+# apps/operacoes/management/commands/benchmark_chaves_uuid.py
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.assistidos.models import uuid7
+
+
+GERADORES = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara chaves uuid4 x uuid7 em tabelas temporárias que imitam "
+        "Assistido (pai) e BeneficioAssistido (filho com FK indexada): "
+        "vazão de INSERT, tamanho dos índices e cache hit do JOIN (Postgres)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--linhas", type=int, default=100_000, help="Linhas na tabela pai")
+        parser.add_argument("--filhos", type=int, default=2, help="Linhas filhas por linha pai")
+        parser.add_argument("--lote", type=int, default=5_000, help="Linhas por executemany")
+
+    # -------------------------
+    # SQL por banco
+    # -------------------------
+
+    def _tipo_uuid(self):
+        return "uuid" if connection.vendor == "postgresql" else "char(32)"
+
+    def _valor(self, u: uuid.UUID):
+        return str(u) if connection.vendor == "postgresql" else u.hex
+
+    def _criar_tabelas(self, cursor, nome):
+        tipo = self._tipo_uuid()
+        cursor.execute(f"DROP TABLE IF EXISTS bench_{nome}_filho")
+        cursor.execute(f"DROP TABLE IF EXISTS bench_{nome}")
+        cursor.execute(f"CREATE TABLE bench_{nome} (id {tipo} PRIMARY KEY, nome varchar(120) NOT NULL)")
+        cursor.execute(
+            f"CREATE TABLE bench_{nome}_filho ("
+            f" id integer PRIMARY KEY, pai_id {tipo} NOT NULL REFERENCES bench_{nome} (id))"
+        )
+        cursor.execute(f"CREATE INDEX bench_{nome}_filho_pai ON bench_{nome}_filho (pai_id)")
+
+    def _remover_tabelas(self, cursor, nome):
+        cursor.execute(f"DROP TABLE IF EXISTS bench_{nome}_filho")
+        cursor.execute(f"DROP TABLE IF EXISTS bench_{nome}")
+
+    def _tamanho_indices(self, cursor, nome):
+        if connection.vendor != "postgresql":
+            return None
+        cursor.execute(
+            "SELECT pg_relation_size(%s) + pg_relation_size(%s)",
+            [f"bench_{nome}_pkey", f"bench_{nome}_filho_pai"],
+        )
+        return cursor.fetchone()[0]
+
+    def _blocos_indice(self, cursor, nome):
+        cursor.execute(
+            "SELECT COALESCE(SUM(idx_blks_hit), 0), COALESCE(SUM(idx_blks_read), 0) "
+            "FROM pg_statio_user_indexes WHERE relname IN (%s, %s)",
+            [f"bench_{nome}", f"bench_{nome}_filho"],
+        )
+        return cursor.fetchone()
+
+    # -------------------------
+    # Execução
+    # -------------------------
+
+    def _rodar(self, nome, gerar, linhas, filhos, lote):
+        resultado = {}
+        with connection.cursor() as cursor:
+            self._criar_tabelas(cursor, nome)
+
+            ids = []
+            inicio = time.perf_counter()
+            for base in range(0, linhas, lote):
+                bloco = [self._valor(gerar()) for _ in range(min(lote, linhas - base))]
+                ids.extend(bloco)
+                with transaction.atomic():
+                    cursor.executemany(
+                        f"INSERT INTO bench_{nome} (id, nome) VALUES (%s, %s)",
+                        [(i, "assistido") for i in bloco],
+                    )
+            resultado["insert_pai_s"] = time.perf_counter() - inicio
+
+            # Filhos chegam ao longo do tempo: atribuições de assistidos recentes e antigos
+            filhos_ids = [random.choice(ids) for _ in range(linhas * filhos)]
+            inicio = time.perf_counter()
+            for base in range(0, len(filhos_ids), lote):
+                bloco = filhos_ids[base:base + lote]
+                with transaction.atomic():
+                    cursor.executemany(
+                        f"INSERT INTO bench_{nome}_filho (id, pai_id) VALUES (%s, %s)",
+                        [(base + n + 1, pai) for n, pai in enumerate(bloco)],
+                    )
+            resultado["insert_filho_s"] = time.perf_counter() - inicio
+
+            if connection.vendor == "postgresql":
+                cursor.execute(f"ANALYZE bench_{nome}")
+                cursor.execute(f"ANALYZE bench_{nome}_filho")
+                antes = self._blocos_indice(cursor, nome)
+
+            # JOIN sobre os pais mais recentes (padrão das telas: cadastros novos)
+            recentes = ids[-min(len(ids), 5_000):]
+            inicio = time.perf_counter()
+            for base in range(0, len(recentes), 500):
+                marcadores = ", ".join(["%s"] * len(recentes[base:base + 500]))
+                cursor.execute(
+                    f"SELECT COUNT(*) FROM bench_{nome} p JOIN bench_{nome}_filho f ON f.pai_id = p.id "
+                    f"WHERE p.id IN ({marcadores})",
+                    recentes[base:base + 500],
+                )
+                cursor.fetchone()
+            resultado["join_s"] = time.perf_counter() - inicio
+
+            if connection.vendor == "postgresql":
+                depois = self._blocos_indice(cursor, nome)
+                hit = depois[0] - antes[0]
+                lidos = depois[1] - antes[1]
+                resultado["cache_hit"] = hit / (hit + lidos) if (hit + lidos) else None
+                resultado["indices_bytes"] = self._tamanho_indices(cursor, nome)
+
+            self._remover_tabelas(cursor, nome)
+        return resultado
+
+    def handle(self, *args, **options):
+        linhas, filhos, lote = options["linhas"], options["filhos"], options["lote"]
+        self.stdout.write(f"Banco: {connection.vendor} | pais: {linhas} | filhos/pai: {filhos}")
+
+        for nome, gerar in GERADORES.items():
+            r = self._rodar(nome, gerar, linhas, filhos, lote)
+            linha = (
+                f"{nome}: INSERT pai {linhas / r['insert_pai_s']:,.0f} linhas/s | "
+                f"INSERT filho {linhas * filhos / r['insert_filho_s']:,.0f} linhas/s | "
+                f"JOIN {r['join_s'] * 1000:.0f} ms"
+            )
+            if r.get("cache_hit") is not None:
+                linha += f" | cache hit índices {r['cache_hit']:.1%}"
+            if r.get("indices_bytes") is not None:
+                linha += f" | índices {r['indices_bytes'] / 1024 / 1024:.1f} MiB"
+            self.stdout.write(linha)
+
+        if connection.vendor != "postgresql":
+            self.stdout.write(self.style.WARNING(
+                "Cache hit e tamanho de índice só são medidos no Postgres (pg_statio)."
+            ))
@@ -0,0 +1,126 @@
+# apps/operacoes/management/commands/carga_consultas.py
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+
+CAMINHOS = [
+    "/operacoes/consultas/identificacao/",
+    "/operacoes/consultas/saude/",
+    "/operacoes/consultas/socioeconomico/",
+    "/operacoes/consultas/entregas/",
+    "/operacoes/consultas/lotes/",
+    "/operacoes/consultas/identificacao/imprimir/",
+]
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[k]
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga das consultas contra um servidor rodando (Gunicorn sync ou "
+        "ASGI/Uvicorn): N clientes simultâneos por D segundos, vazão e latências "
+        "p50/p95/p99. Rode o mesmo comando contra os dois perfis para comparar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Endereço do servidor")
+        parser.add_argument("--usuario", required=True, help="Usuário com acesso às consultas")
+        parser.add_argument(
+            "--concorrencia", default="1,8,32,64",
+            help="Níveis de clientes simultâneos, separados por vírgula",
+        )
+        parser.add_argument("--duracao", type=float, default=10.0, help="Segundos por nível")
+        parser.add_argument("--caminho", action="append", dest="caminhos", help="Repetível; padrão: consultas principais")
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    # -------------------------
+    # Sessão
+    # -------------------------
+
+    def _cookie_sessao(self, username):
+        """Cria a sessão no mesmo banco do servidor (sem passar pelo formulário de login)."""
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário {username!r} não encontrado.")
+        cliente = Client()
+        cliente.force_login(user)
+        nome = settings.SESSION_COOKIE_NAME
+        return f"{nome}={cliente.cookies[nome].value}"
+
+    # -------------------------
+    # Execução
+    # -------------------------
+
+    def _rodar_nivel(self, base, caminhos, cookie, clientes, duracao, timeout):
+        latencias = []
+        erros = 0
+        lock = threading.Lock()
+        fim = time.perf_counter() + duracao
+
+        def cliente(indice):
+            nonlocal erros
+            i = indice
+            while time.perf_counter() < fim:
+                pedido = urllib.request.Request(
+                    base + caminhos[i % len(caminhos)],
+                    headers={"Cookie": cookie},
+                )
+                i += 1
+                inicio = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(pedido, timeout=timeout) as resposta:
+                        resposta.read()
+                        ok = resposta.status == 200
+                except (urllib.error.URLError, OSError):
+                    ok = False
+                gasto = time.perf_counter() - inicio
+                with lock:
+                    if ok:
+                        latencias.append(gasto)
+                    else:
+                        erros += 1
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clientes) as executor:
+            list(executor.map(cliente, range(clientes)))
+        return latencias, erros, time.perf_counter() - inicio
+
+    def handle(self, *args, **opts):
+        base = opts["url"].rstrip("/")
+        caminhos = opts["caminhos"] or CAMINHOS
+        try:
+            niveis = [int(n) for n in opts["concorrencia"].split(",") if n.strip()]
+        except ValueError:
+            raise CommandError("--concorrencia deve ser uma lista de inteiros.")
+
+        cookie = self._cookie_sessao(opts["usuario"])
+
+        self.stdout.write(f"Servidor: {base} | {len(caminhos)} caminho(s) | {opts['duracao']:.0f}s por nível")
+        self.stdout.write(f"{'clientes':>8} {'req':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+        for clientes in niveis:
+            latencias, erros, gasto = self._rodar_nivel(
+                base, caminhos, cookie, clientes, opts["duracao"], opts["timeout"]
+            )
+            ms = [l * 1000 for l in latencias]
+            self.stdout.write(
+                f"{clientes:>8} {len(ms):>7} {len(ms) / gasto:>8.1f} "
+                f"{(statistics.median(ms) if ms else 0):>8.1f} {percentil(ms, 95):>8.1f} "
+                f"{percentil(ms, 99):>8.1f} {erros:>6}"
+            )
@@ -0,0 +1,23 @@
+# apps/operacoes/management/commands/detectar_duplicidades.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.operacoes.services.duplicidades import detectar
+
+
+class Command(BaseCommand):
+    help = (
+        "Procura cadastros de assistidos possivelmente duplicados e grava as "
+        "suspeitas novas na fila de revisão (Assistidos > Duplicidades)."
+    )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        r = detectar()
+        duracao = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"Cadastros: {r['cadastros']} | pares comparados: {r['comparacoes']} | "
+            f"suspeitas: {r['encontradas']} ({r['novas']} novas) | "
+            f"blocos ignorados: {r['blocos_ignorados']} | tempo: {duracao:.1f}s"
+        ))
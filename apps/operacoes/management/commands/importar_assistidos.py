@@ -0,0 +1,57 @@
+# apps/operacoes/management/commands/importar_assistidos.py
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.operacoes.services.importacao_assistidos import (
+    TAMANHO_LOTE,
+    ImportacaoErro,
+    importar_assistidos,
+    ler_arquivo,
+    relatorio_erros_csv,
+)
+
+
+class Command(BaseCommand):
+    help = "Importa assistidos em lote a partir de um arquivo CSV ou XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do arquivo .csv ou .xlsx")
+        parser.add_argument(
+            "--relatorio",
+            help="Onde gravar o CSV com as linhas rejeitadas (padrão: <arquivo>.erros.csv)",
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=TAMANHO_LOTE,
+            help=f"Linhas por lote de gravação (padrão: {TAMANHO_LOTE})",
+        )
+
+    def handle(self, *args, **options):
+        caminho = Path(options["arquivo"])
+        if not caminho.exists():
+            raise CommandError(f"Arquivo não encontrado: {caminho}")
+
+        inicio = time.monotonic()
+        try:
+            if caminho.suffix.lower() == ".xlsx":
+                with caminho.open("rb") as fh:
+                    resultado = importar_assistidos(ler_arquivo(fh, caminho.name), tamanho_lote=options["lote"])
+            else:
+                with caminho.open("r", encoding="utf-8-sig", errors="replace", newline="") as fh:
+                    resultado = importar_assistidos(ler_arquivo(fh, caminho.name), tamanho_lote=options["lote"])
+        except ImportacaoErro as exc:
+            raise CommandError(str(exc)) from exc
+        duracao = time.monotonic() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Linhas lidas: {resultado.lidas} | criadas: {resultado.criadas} | "
+            f"rejeitadas: {resultado.rejeitadas} | tempo: {duracao:.1f}s"
+        ))
+
+        if resultado.erros:
+            destino = Path(options["relatorio"] or f"{caminho}.erros.csv")
+            destino.write_text(relatorio_erros_csv(resultado.erros), encoding="utf-8-sig")
+            self.stdout.write(self.style.WARNING(f"Relatório de erros: {destino}"))
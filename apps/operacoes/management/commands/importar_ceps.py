@@ -0,0 +1,46 @@
+# apps/operacoes/management/commands/importar_ceps.py
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.operacoes.services.ceps import TAMANHO_LOTE, importar_ceps
+from apps.operacoes.services.importacao_assistidos import ImportacaoErro, ler_arquivo
+
+
+class Command(BaseCommand):
+    help = (
+        "Carrega a tabela local de CEPs a partir de um arquivo CSV ou XLSX "
+        "(colunas: cep, logradouro, bairro, cidade/localidade, uf). CEP existente é atualizado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do arquivo .csv ou .xlsx")
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=TAMANHO_LOTE,
+            help=f"Linhas por lote de gravação (padrão: {TAMANHO_LOTE})",
+        )
+
+    def handle(self, *args, **options):
+        caminho = Path(options["arquivo"])
+        if not caminho.exists():
+            raise CommandError(f"Arquivo não encontrado: {caminho}")
+
+        inicio = time.monotonic()
+        try:
+            if caminho.suffix.lower() == ".xlsx":
+                with caminho.open("rb") as fh:
+                    resultado = importar_ceps(ler_arquivo(fh, caminho.name), tamanho_lote=options["lote"])
+            else:
+                with caminho.open("r", encoding="utf-8-sig", errors="replace", newline="") as fh:
+                    resultado = importar_ceps(ler_arquivo(fh, caminho.name), tamanho_lote=options["lote"])
+        except ImportacaoErro as exc:
+            raise CommandError(str(exc)) from exc
+        duracao = time.monotonic() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Linhas lidas: {resultado['lidas']} | gravadas: {resultado['gravadas']} | "
+            f"rejeitadas: {resultado['rejeitadas']} | tempo: {duracao:.1f}s"
+        ))
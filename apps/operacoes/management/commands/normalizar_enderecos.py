@@ -0,0 +1,37 @@
+# apps/operacoes/management/commands/normalizar_enderecos.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.operacoes.services.ceps import TAMANHO_LOTE, normalizar_enderecos
+
+
+class Command(BaseCommand):
+    help = (
+        "Acerta o endereço dos assistidos pela tabela de CEPs: CEP só com dígitos, "
+        "bairro/cidade/UF iguais aos da tabela e logradouro em branco completado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=TAMANHO_LOTE,
+            help=f"Assistidos por bloco (padrão: {TAMANHO_LOTE})",
+        )
+        parser.add_argument("--simular", action="store_true", help="Só conta o que seria alterado")
+
+    def handle(self, *args, **options):
+        def progresso(lidos, alterados):
+            self.stdout.write(f"  {lidos} lidos ({alterados} alterados)")
+
+        inicio = time.monotonic()
+        r = normalizar_enderecos(simular=options["simular"], tamanho_lote=options["lote"], progresso=progresso)
+        duracao = time.monotonic() - inicio
+
+        campos = ", ".join(f"{c}: {n}" for c, n in sorted(r["campos"].items())) or "nenhum"
+        verbo = "Seriam alterados" if options["simular"] else "Alterados"
+        self.stdout.write(self.style.SUCCESS(
+            f"Lidos: {r['lidos']} | {verbo}: {r['alterados']} ({campos}) | "
+            f"CEP fora da tabela: {r['sem_referencia']} | tempo: {duracao:.1f}s"
+        ))
@@ -0,0 +1,130 @@
+# apps/operacoes/management/commands/run_workers.py
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from apps.operacoes.services.tarefas import (
+    executar,
+    limpar_antigas,
+    recuperar_abandonadas,
+    reservar_proxima,
+)
+
+
+INTERVALO_MANUTENCAO = 60  # s entre recuperar_abandonadas/limpar_antigas
+
+
+def _loop_worker(nome, parar, intervalo, max_tarefas, pai):
+    """Processo filho: pega a próxima tarefa da fila, executa, repete."""
+    if not apps.ready:  # start method "spawn"
+        django.setup()
+    # Quem decide parar é o processo pai (a tarefa em andamento termina)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    feitas = 0
+    while not parar.is_set() and os.getppid() == pai:
+        close_old_connections()
+        tarefa = reservar_proxima(nome)
+        if tarefa is None:
+            parar.wait(intervalo)
+            continue
+        executar(tarefa)
+        feitas += 1
+        if max_tarefas and feitas >= max_tarefas:
+            break  # o pai sobe outro processo (libera memória de tarefas grandes)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Executa as tarefas em segundo plano (apps.operacoes.Tarefa) com um pool "
+        "de processos. Cada processo pega uma tarefa por vez da fila no banco."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processos", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+            help="Processos executando tarefas em paralelo",
+        )
+        parser.add_argument("--intervalo", type=float, default=2.0, help="Espera (s) com a fila vazia")
+        parser.add_argument(
+            "--max-tarefas", type=int, default=100,
+            help="Reinicia cada processo depois de N tarefas (0 = nunca)",
+        )
+        parser.add_argument(
+            "--uma-vez", action="store_true",
+            help="Esvazia a fila neste processo e sai (cron / depuração)",
+        )
+
+    def handle(self, *args, **opts):
+        prefixo = f"{socket.gethostname()}:{os.getpid()}"
+
+        if opts["uma_vez"]:
+            recuperar_abandonadas()
+            feitas = 0
+            while (tarefa := reservar_proxima(prefixo)) is not None:
+                executar(tarefa)
+                feitas += 1
+            self.stdout.write(self.style.SUCCESS(f"{feitas} tarefa(s) executada(s)."))
+            return
+
+        contexto = multiprocessing.get_context()
+        parar = contexto.Event()
+        processos: dict[int, multiprocessing.Process] = {}
+
+        def subir(indice):
+            # Conexões abertas no pai não podem ser herdadas pelos filhos (fork)
+            connections.close_all()
+            p = contexto.Process(
+                target=_loop_worker,
+                args=(f"{prefixo}/{indice}", parar, opts["intervalo"], opts["max_tarefas"], os.getpid()),
+                name=f"tarefas-{indice}",
+                # não-daemon: tarefas podem abrir o próprio pool de processos (PDF)
+            )
+            p.start()
+            processos[indice] = p
+
+        encerrando = False
+
+        def encerrar(signum, frame):
+            # Só marca: Event.set() dentro do handler pode travar no próprio Event.wait()
+            nonlocal encerrando
+            encerrando = True
+
+        signal.signal(signal.SIGTERM, encerrar)
+        signal.signal(signal.SIGINT, encerrar)
+
+        for i in range(opts["processos"]):
+            subir(i)
+        self.stdout.write(f"{opts['processos']} processo(s) de tarefas no ar ({prefixo}). Ctrl+C para parar.")
+
+        ultima_manutencao = 0.0
+        while not encerrando:
+            if time.monotonic() - ultima_manutencao >= INTERVALO_MANUTENCAO:
+                ultima_manutencao = time.monotonic()
+                devolvidas = recuperar_abandonadas()
+                removidas = limpar_antigas()
+                connections.close_all()
+                if devolvidas or removidas:
+                    self.stdout.write(f"Manutenção: {devolvidas} devolvida(s) à fila, {removidas} removida(s).")
+
+            for i, p in list(processos.items()):
+                if not p.is_alive():
+                    p.join()
+                    if not encerrando:
+                        subir(i)
+            time.sleep(1.0)
+
+        parar.set()
+        self.stdout.write("Parando: aguardando as tarefas em andamento…")
+        for p in processos.values():
+            p.join()
+        self.stdout.write(self.style.SUCCESS("Workers encerrados."))
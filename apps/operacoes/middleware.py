@@ -0,0 +1,33 @@
+# apps/operacoes/middleware.py
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.decorators import sync_and_async_middleware
+
+from apps.operacoes.services import auditoria
+
+
+@sync_and_async_middleware
+def AuditoriaMiddleware(get_response):
+    """
+    Junta os eventos de auditoria da requisição e grava todos de uma vez
+    quando a resposta sai (services.auditoria.coletando).
+    Deve vir depois do AuthenticationMiddleware (usuário da requisição).
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            eventos = []
+            token = auditoria._eventos.set(eventos)
+            try:
+                return await get_response(request)
+            finally:
+                auditoria._eventos.reset(token)
+                if eventos:
+                    await sync_to_async(auditoria.gravar)(eventos, await request.auser())
+
+        return middleware
+
+    def middleware(request):
+        with auditoria.coletando(request.user):
+            return get_response(request)
+
+    return middleware
@@ -0,0 +1,47 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=60)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('PENDENTE', 'Na fila'), ('EXECUTANDO', 'Executando'), ('CONCLUIDA', 'Concluída'), ('ERRO', 'Erro')], default='PENDENTE', max_length=20)),
+                ('progresso', models.PositiveSmallIntegerField(default=0)),
+                ('mensagem', models.CharField(blank=True, max_length=200)),
+                ('erro', models.TextField(blank=True)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('worker', models.CharField(blank=True, max_length=80)),
+                ('arquivo', models.CharField(blank=True, max_length=255)),
+                ('nome_arquivo', models.CharField(blank=True, max_length=150)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('redirecionar_para', models.CharField(blank=True, max_length=255)),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('criado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tarefas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tarefa',
+                'verbose_name_plural': 'Tarefas',
+                'ordering': ('-criado_em', '-id'),
+                'indexes': [models.Index(fields=['status', 'criado_em'], name='tarefa_fila_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operacoes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoAuditoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('acao', models.CharField(max_length=60)),
+                ('modelo', models.CharField(blank=True, max_length=80)),
+                ('objeto_id', models.CharField(blank=True, max_length=64)),
+                ('resumo', models.CharField(blank=True, max_length=255)),
+                ('dados', models.JSONField(blank=True, default=dict)),
+                ('quantidade', models.PositiveIntegerField(default=1)),
+                ('criado_em', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='eventos_auditoria', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Evento de auditoria',
+                'verbose_name_plural': 'Eventos de auditoria',
+                'ordering': ('-criado_em', '-id'),
+                'indexes': [models.Index(fields=['modelo', 'objeto_id'], name='auditoria_objeto_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:10
+
+import django.core.serializers.json
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operacoes', '0002_evento_auditoria'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='eventoauditoria',
+            name='auditoria_objeto_idx',
+        ),
+        migrations.AlterField(
+            model_name='eventoauditoria',
+            name='dados',
+            field=models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+        migrations.AddIndex(
+            model_name='eventoauditoria',
+            index=models.Index(fields=['modelo', 'objeto_id', '-criado_em'], name='auditoria_objeto_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistidos', '0008_atualizado_em'),
+        ('operacoes', '0003_auditoria_historico'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuspeitaDuplicidade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pontuacao', models.FloatField()),
+                ('motivos', models.CharField(blank=True, max_length=120)),
+                ('status', models.CharField(choices=[('PENDENTE', 'Aguardando revisão'), ('MESCLADA', 'Mesclada'), ('DESCARTADA', 'Não é duplicidade')], db_index=True, default='PENDENTE', max_length=12)),
+                ('revisado_em', models.DateTimeField(blank=True, null=True)),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('assistido_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='assistidos.assistido')),
+                ('assistido_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='assistidos.assistido')),
+                ('revisado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Suspeita de duplicidade',
+                'verbose_name_plural': 'Suspeitas de duplicidade',
+                'ordering': ('-pontuacao', 'id'),
+                'constraints': [models.UniqueConstraint(fields=('assistido_a', 'assistido_b'), name='uniq_suspeita_par')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operacoes', '0004_suspeita_duplicidade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaTabela',
+            fields=[
+                ('tabela', models.CharField(max_length=80, primary_key=True, serialize=False)),
+                ('contador', models.PositiveBigIntegerField(default=0)),
+                ('alterado_em', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Marca de tabela',
+                'verbose_name_plural': 'Marcas de tabela',
+            },
+        ),
+    ]
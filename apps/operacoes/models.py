@@ -0,0 +1,185 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class StatusTarefa(models.TextChoices):
+    PENDENTE = "PENDENTE", "Na fila"
+    EXECUTANDO = "EXECUTANDO", "Executando"
+    CONCLUIDA = "CONCLUIDA", "Concluída"
+    ERRO = "ERRO", "Erro"
+
+
+class Tarefa(models.Model):
+    """
+    Tarefa em segundo plano (fila no próprio banco).
+
+    A view enfileira (tipo + parametros) e devolve a tela de acompanhamento;
+    `manage.py run_workers` executa. O resultado, quando há arquivo, fica em
+    disco (settings.TAREFAS_DIR) e só o caminho relativo é guardado aqui.
+    """
+
+    tipo = models.CharField(max_length=60)
+    parametros = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        max_length=20,
+        choices=StatusTarefa.choices,
+        default=StatusTarefa.PENDENTE,
+    )
+    progresso = models.PositiveSmallIntegerField(default=0)  # 0..100
+    mensagem = models.CharField(max_length=200, blank=True)
+    erro = models.TextField(blank=True)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=80, blank=True)
+
+    # Resultado
+    arquivo = models.CharField(max_length=255, blank=True)
+    nome_arquivo = models.CharField(max_length=150, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    redirecionar_para = models.CharField(max_length=255, blank=True)
+
+    criado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="tarefas",
+    )
+    criado_em = models.DateTimeField(default=timezone.now)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-criado_em", "-id")
+        verbose_name = "Tarefa"
+        verbose_name_plural = "Tarefas"
+        indexes = [
+            # Próxima da fila: WHERE status = 'PENDENTE' ORDER BY criado_em
+            models.Index(fields=["status", "criado_em"], name="tarefa_fila_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def finalizada(self) -> bool:
+        return self.status in (StatusTarefa.CONCLUIDA, StatusTarefa.ERRO)
+
+
+class EventoAuditoria(models.Model):
+    """
+    Trilha de auditoria: quem fez o quê, quando.
+
+    Operações em massa gravam um evento-resumo (quantidade + ids afetados
+    em `dados`); alterações de um registro apontam para ele por
+    `modelo` + `objeto_id` (histórico por registro).
+
+    Só inserção: evento gravado não é alterado nem excluído pelo sistema.
+    """
+
+    acao = models.CharField(max_length=60)
+    modelo = models.CharField(max_length=80, blank=True)       # "beneficios.beneficioassistido"
+    objeto_id = models.CharField(max_length=64, blank=True)
+    resumo = models.CharField(max_length=255, blank=True)
+    dados = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    quantidade = models.PositiveIntegerField(default=1)
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="eventos_auditoria",
+    )
+    criado_em = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ("-criado_em", "-id")
+        verbose_name = "Evento de auditoria"
+        verbose_name_plural = "Eventos de auditoria"
+        indexes = [
+            # Histórico de um registro já sai na ordem, sem ordenar no banco
+            models.Index(fields=["modelo", "objeto_id", "-criado_em"], name="auditoria_objeto_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.acao} ({self.quantidade}) em {self.criado_em:%d/%m/%Y %H:%M}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Eventos de auditoria não podem ser alterados.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Eventos de auditoria não podem ser excluídos.")
+
+
+class MarcaTabela(models.Model):
+    """
+    Contador por tabela para o que MAX(atualizado_em) não enxerga: exclusões
+    (carimbo do GET condicional, services/versoes.py, no lugar de um COUNT
+    da tabela inteira) e a versão da tabela de CEPs (services/ceps.py).
+    No banco: vale para todos os processos, qualquer que seja o CACHES.
+    """
+
+    tabela = models.CharField(max_length=80, primary_key=True)  # "beneficios.itementrega"
+    contador = models.PositiveBigIntegerField(default=0)
+    alterado_em = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Marca de tabela"
+        verbose_name_plural = "Marcas de tabela"
+
+    def __str__(self):
+        return f"{self.tabela} #{self.contador}"
+
+
+class StatusSuspeita(models.TextChoices):
+    PENDENTE = "PENDENTE", "Aguardando revisão"
+    MESCLADA = "MESCLADA", "Mesclada"
+    DESCARTADA = "DESCARTADA", "Não é duplicidade"
+
+
+class SuspeitaDuplicidade(models.Model):
+    """
+    Par de cadastros que parecem ser a mesma família (services.duplicidades).
+
+    O par é guardado em ordem (assistido_a < assistido_b): rodar a detecção
+    de novo não repete suspeitas já revisadas.
+    """
+
+    assistido_a = models.ForeignKey(
+        "assistidos.Assistido", on_delete=models.CASCADE, related_name="+"
+    )
+    assistido_b = models.ForeignKey(
+        "assistidos.Assistido", on_delete=models.CASCADE, related_name="+"
+    )
+    pontuacao = models.FloatField()
+    motivos = models.CharField(max_length=120, blank=True)  # "nome, nascimento, telefone"
+
+    status = models.CharField(
+        max_length=12, choices=StatusSuspeita.choices, default=StatusSuspeita.PENDENTE, db_index=True
+    )
+    revisado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    revisado_em = models.DateTimeField(null=True, blank=True)
+    criado_em = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("-pontuacao", "id")
+        verbose_name = "Suspeita de duplicidade"
+        verbose_name_plural = "Suspeitas de duplicidade"
+        constraints = [
+            models.UniqueConstraint(fields=["assistido_a", "assistido_b"], name="uniq_suspeita_par"),
+        ]
+
+    def __str__(self):
+        return f"{self.assistido_a_id} x {self.assistido_b_id} ({self.pontuacao:.2f})"
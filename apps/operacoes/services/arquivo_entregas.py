@@ -0,0 +1,144 @@
+# apps/operacoes/services/arquivo_entregas.py
+"""
+Arquivo de entregas: lotes antigos (e os seus itens) saem das tabelas
+quentes para LoteEntregaArquivo / ItemEntregaArquivo.
+
+- Corte: data de entrega anterior a hoje - settings.ARQUIVO_ENTREGAS_MESES.
+  O comando nunca arquiva depois desse corte, então as consultas sabem,
+  só pela data, se precisam do arquivo (sem consultar o banco).
+- Movimento em SQL (INSERT ... SELECT + DELETE), em blocos de lotes, cada
+  bloco numa transação: ids preservados, nada passa pelo Python.
+- Consultas: tabelas quentes por padrão; quando o período do filtro
+  alcança o corte (início antes dele, ou sem início e fim antes dele) ou
+  o lote procurado pelo id já foi arquivado, as views *_historico
+  (quente + arquivo, UNION ALL).
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.beneficios.models import (
+    ItemEntrega,
+    ItemEntregaArquivo,
+    ItemEntregaHistorico,
+    LoteEntrega,
+    LoteEntregaArquivo,
+    LoteEntregaHistorico,
+)
+from apps.operacoes.services.auditoria import registrar_evento
+from apps.operacoes.services.versoes import marcar_tabela
+
+
+LOTES_POR_BLOCO = 50
+
+CAMPOS_LOTE = ("id", "beneficio_id", "data_entrega", "criado_em", "atualizado_em")
+CAMPOS_ITEM = ("id", "lote_id", "atribuicao_id", "entregue", "marcado_em", "atualizado_em")
+
+
+# =========================
+#  CORTE
+# =========================
+
+def data_corte(meses: int | None = None, hoje: date | None = None) -> date:
+    """Primeiro dia que continua nas tabelas quentes."""
+    meses = settings.ARQUIVO_ENTREGAS_MESES if meses is None else meses
+    hoje = hoje or timezone.localdate()
+    total = hoje.year * 12 + (hoje.month - 1) - meses
+    ano, mes = divmod(total, 12)
+    return date(ano, mes + 1, 1)
+
+
+def usa_arquivo(data_ini: date | None, data_fim: date | None = None) -> bool:
+    """
+    Período que pode alcançar lotes arquivados: começa antes do corte, ou
+    não tem início e termina antes dele. Sem data nenhuma: só o quente.
+    """
+    corte = data_corte()
+    if data_ini is not None:
+        return data_ini < corte
+    return data_fim is not None and data_fim < corte
+
+
+def lote_arquivado(lote_id: int) -> bool:
+    """Id que não está mais na tabela quente (busca direta pelo número do lote)."""
+    return (
+        not LoteEntrega.objects.filter(pk=lote_id).exists()
+        and LoteEntregaArquivo.objects.filter(pk=lote_id).exists()
+    )
+
+
+def modelos(data_ini: date | None, data_fim: date | None = None, *, arquivo: bool = False):
+    """(modelo de lote, modelo de item) a consultar para o período."""
+    if arquivo or usa_arquivo(data_ini, data_fim):
+        return LoteEntregaHistorico, ItemEntregaHistorico
+    return LoteEntrega, ItemEntrega
+
+
+def modelo_itens(lote):
+    """Modelo de item de um lote quente ou de um LoteEntregaHistorico (arquivado=True: o arquivo)."""
+    _, item_model = modelos(None, arquivo=getattr(lote, "arquivado", False))
+    return item_model
+
+
+# =========================
+#  ARQUIVAMENTO
+# =========================
+
+def _executar(sql: str, ids: list[int]) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(sql.replace("%IDS", ", ".join(["%s"] * len(ids))), ids)
+        return cursor.rowcount
+
+
+def _copiar(origem, destino, campos, coluna: str, ids: list[int]) -> int:
+    colunas = ", ".join(campos)
+    return _executar(
+        f"INSERT INTO {destino._meta.db_table} ({colunas}) "
+        f"SELECT {colunas} FROM {origem._meta.db_table} WHERE {coluna} IN (%IDS)",
+        ids,
+    )
+
+
+def _apagar(model, coluna: str, ids: list[int]) -> int:
+    return _executar(f"DELETE FROM {model._meta.db_table} WHERE {coluna} IN (%IDS)", ids)
+
+
+def lotes_arquivaveis(antes_de: date):
+    return LoteEntrega.objects.filter(data_entrega__lt=antes_de).order_by("data_entrega", "id")
+
+
+def arquivar_lotes(antes_de: date | None = None, *, bloco: int = LOTES_POR_BLOCO, progresso=None) -> dict:
+    """Move lotes com entrega antes de `antes_de` (padrão: o corte). Retorna os totais."""
+    corte = data_corte()
+    antes_de = min(antes_de or corte, corte)
+
+    ids = list(lotes_arquivaveis(antes_de).values_list("id", flat=True))
+    lotes = itens = 0
+    for inicio in range(0, len(ids), bloco):
+        parte = ids[inicio:inicio + bloco]
+        with transaction.atomic():
+            # Ordem das FKs: lote no arquivo antes dos itens; itens quentes antes do lote
+            lotes += _copiar(LoteEntrega, LoteEntregaArquivo, CAMPOS_LOTE, "id", parte)
+            itens += _copiar(ItemEntrega, ItemEntregaArquivo, CAMPOS_ITEM, "lote_id", parte)
+            _apagar(ItemEntrega, "lote_id", parte)
+            _apagar(LoteEntrega, "id", parte)
+        if progresso:
+            progresso(lotes, len(ids), itens)
+
+    if lotes:
+        # DELETE direto não dispara post_delete: marca as exclusões aqui
+        marcar_tabela(LoteEntrega)
+        marcar_tabela(ItemEntrega)
+        registrar_evento(
+            "ARQUIVAR_LOTES",
+            resumo=f"{lotes} lotes ({itens} itens) com entrega antes de {antes_de:%d/%m/%Y} arquivados",
+            quantidade=lotes,
+            ids=ids,
+            antes_de=antes_de,
+            itens=itens,
+        )
+    return {"lotes": lotes, "itens": itens, "antes_de": antes_de}
@@ -0,0 +1,107 @@
+# apps/operacoes/services/assistidos_massa.py
+"""
+Inativação / reativação de muitos assistidos de uma vez (recadastramento anual).
+
+O conjunto vem de uma consulta (assistidos_da_consulta). Em vez de um save()
+por cadastro, um UPDATE com a mesma regra de Assistido.normalizar_campos():
+INATIVO recebe data de inativação; ATIVO perde a data. `codigo` e `busca` não
+dependem do status, então não há o que recalcular.
+
+Na inativação, os ciclos abertos desses assistidos podem ser encerrados na
+mesma transação (encerrar_em_massa, com o seu próprio evento de auditoria).
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.assistidos.models import Assistido, StatusCadastro
+from apps.beneficios.models import BeneficioAssistido
+from apps.operacoes.services.atribuicoes_massa import abertas, encerrar_em_massa
+from apps.operacoes.services.auditoria import registrar_evento, registrar_por_objeto
+
+
+def _alvo(assistidos, status: str):
+    return assistidos.order_by().exclude(status=status)
+
+
+def _atribuicoes_de(alvo, data: date):
+    return abertas(BeneficioAssistido.objects.filter(assistido__in=alvo.values("pk")), data)
+
+
+def previa_status(assistidos, status: str, data: date | None = None) -> dict:
+    data = data or timezone.localdate()
+    alvo = _alvo(assistidos, status)
+    return {
+        "selecionados": assistidos.count(),
+        "alterar": alvo.count(),
+        "ja_no_status": assistidos.filter(status=status).count(),
+        "atribuicoes_abertas": (
+            _atribuicoes_de(alvo, data).count() if status == StatusCadastro.INATIVO else 0
+        ),
+    }
+
+
+def alterar_status_em_massa(
+    assistidos,
+    status: str,
+    *,
+    motivo: str = "",
+    data: date | None = None,
+    encerrar_atribuicoes: bool = False,
+    usuario=None,
+    filtros=None,
+) -> dict:
+    """Aplica o status a quem ainda não está nele. Retorna os totais para a tela."""
+    if status not in StatusCadastro.values:
+        raise ValueError(f"Status inválido: {status}")
+
+    data = data or timezone.localdate()
+    alvo = _alvo(assistidos, status)
+
+    if status == StatusCadastro.INATIVO:
+        campos = {"status": status, "data_inativacao": data, "motivo_inativacao": motivo[:200]}
+    else:
+        campos = {"status": status, "data_inativacao": None}
+    campos["atualizado_em"] = timezone.now()
+
+    encerradas = 0
+    with transaction.atomic():
+        ids = [str(pk) for pk in alvo.values_list("pk", flat=True)]
+
+        # Antes do UPDATE dos cadastros: depois dele `alvo` fica vazio
+        if status == StatusCadastro.INATIVO and encerrar_atribuicoes:
+            encerradas = encerrar_em_massa(
+                _atribuicoes_de(alvo, data),
+                data,
+                usuario=usuario,
+                motivo=f"Inativação em massa: {motivo}" if motivo else "Inativação em massa",
+                filtros=filtros,
+            )["encerradas"]
+
+        alterados = alvo.update(**campos)
+
+        if alterados:
+            registrar_evento(
+                "INATIVAR_ASSISTIDOS" if status == StatusCadastro.INATIVO else "REATIVAR_ASSISTIDOS",
+                usuario=usuario,
+                resumo=(
+                    f"{alterados} assistidos {'inativados' if status == StatusCadastro.INATIVO else 'reativados'}"
+                    + (f": {motivo}" if motivo else "")
+                ),
+                quantidade=alterados,
+                ids=ids,
+                data=data.isoformat(),
+                motivo=motivo,
+                atribuicoes_encerradas=encerradas,
+                filtros=filtros or {},
+            )
+            # Histórico de cada cadastro
+            registrar_por_objeto(
+                Assistido, ids, "INATIVAR" if status == StatusCadastro.INATIVO else "REATIVAR",
+                usuario=usuario, motivo=motivo,
+            )
+
+    return {"alterados": alterados, "atribuicoes_encerradas": encerradas}
@@ -1,8 +1,14 @@
 # apps/operacoes/services/assistidos_queries.py
 from __future__ import annotations
 
-from django.db.models import Q
-from apps.assistidos.models import Assistido
+from datetime import date, timedelta
+
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from apps.assistidos.models import Assistido, mmdd, normalizar_cep
+from apps.operacoes.services.ceps import faixa_cep
 
 
 # =========================
@@ -38,9 +44,70 @@ def _apply_status_filter(qs, status: str):
     return qs
 
 
-def _normalize_cep(cep: str) -> str:
-    """Normaliza CEP digitado (remove hífen e espaços)."""
-    return (cep or "").replace("-", "").strip()
+def _apply_cep_filter(qs, cep: str):
+    """
+    CEP completo: igualdade. Parcial: prefixo como faixa
+    (cep BETWEEN '01300000' AND '01399999'), que usa o índice.
+    """
+    cep = normalizar_cep(cep)[:8]
+    if len(cep) == 8:
+        return qs.filter(cep=cep)
+    if cep:
+        inicio, fim = faixa_cep(cep)
+        return qs.filter(cep__gte=inicio, cep__lte=fim)
+    return qs
+
+
+def _inteiro(valor) -> int | None:
+    valor = str(valor or "").strip()
+    return int(valor) if valor.isdigit() else None
+
+
+def _anos_antes(hoje: date, anos: int) -> date:
+    try:
+        return hoje.replace(year=hoje.year - anos)
+    except ValueError:  # 29/02 em ano não bissexto
+        return hoje.replace(year=hoje.year - anos, day=28)
+
+
+def _apply_idade_filter(qs, idade_min, idade_max, hoje: date):
+    """
+    Faixa de idade vira faixa de data de nascimento (índice), sem calcular
+    a idade linha a linha: idade >= N <=> nasceu até hoje - N anos.
+    """
+    idade_min, idade_max = _inteiro(idade_min), _inteiro(idade_max)
+    if idade_min is not None:
+        qs = qs.filter(data_nascimento__lte=_anos_antes(hoje, idade_min))
+    if idade_max is not None:
+        qs = qs.filter(data_nascimento__gt=_anos_antes(hoje, idade_max + 1))
+    return qs
+
+
+def aniversario_q(dias: int, hoje: date) -> Q:
+    """Aniversário de hoje até hoje + `dias` (MMDD; a janela pode virar o ano)."""
+    if dias >= 365:
+        return Q(aniversario__isnull=False)
+    inicio, fim = mmdd(hoje), mmdd(hoje + timedelta(days=dias))
+    if inicio <= fim:
+        return Q(aniversario__gte=inicio, aniversario__lte=fim)
+    return Q(aniversario__gte=inicio) | Q(aniversario__lte=fim)
+
+
+def aniversario_mes_q(mes: int) -> Q:
+    return Q(aniversario__gte=mes * 100 + 1, aniversario__lte=mes * 100 + 31)
+
+
+def com_idade(qs, hoje: date | None = None):
+    """Anota `_idade` (lida por Assistido.idade) calculada no banco."""
+    hoje = hoje or timezone.localdate()
+    ainda_nao = Case(When(aniversario__gt=mmdd(hoje), then=Value(1)), default=Value(0))
+    return qs.annotate(_idade=Value(hoje.year) - ExtractYear("data_nascimento") - ainda_nao)
+
+
+def _ordem_aniversario(hoje: date):
+    """Próximo aniversário primeiro: os de hoje em diante, depois os do começo do ano."""
+    ja_passou = Case(When(aniversario__lt=mmdd(hoje), then=Value(1)), default=Value(0))
+    return (ja_passou, "aniversario", "nome")
 
 
 # =========================
@@ -53,12 +120,21 @@ def assistidos_identificacao_qs(
     status: str = "",
     logradouro: str = "",
     cep: str = "",
+    bairro: str = "",
+    cidade: str = "",
+    idade_min: str = "",
+    idade_max: str = "",
+    aniversario: str = "",
     order_by: str = "nome",
+    hoje: date | None = None,
 ):
     """
     Consulta: Identificação e Endereço (lista e impressão usam a mesma função)
+    Bairro e cidade comparam por igualdade (valores acertados por normalizar_enderecos).
+    Idade e aniversário (próximos N dias) filtram por faixa em colunas indexadas.
     """
-    qs = _base_qs()
+    hoje = hoje or timezone.localdate()
+    qs = com_idade(_base_qs(), hoje)
     qs = _apply_q_search(qs, q)
     qs = _apply_status_filter(qs, status)
 
@@ -66,10 +142,24 @@ def assistidos_identificacao_qs(
     if logradouro:
         qs = qs.filter(logradouro__icontains=logradouro)
 
-    cep_clean = _normalize_cep(cep)
-    if cep_clean:
-        qs = qs.filter(cep__icontains=cep_clean)
+    qs = _apply_cep_filter(qs, cep)
+
+    bairro = (bairro or "").strip()
+    if bairro:
+        qs = qs.filter(bairro=bairro)
+
+    cidade = (cidade or "").strip()
+    if cidade:
+        qs = qs.filter(cidade=cidade)
+
+    qs = _apply_idade_filter(qs, idade_min, idade_max, hoje)
+
+    dias = _inteiro(aniversario)
+    if dias is not None:
+        qs = qs.filter(aniversario_q(dias, hoje))
 
+    if order_by == "aniversario":
+        return qs.order_by(*_ordem_aniversario(hoje))
     return qs.order_by(order_by)
 
 
@@ -143,3 +233,31 @@ def assistidos_socioeconomico_qs(
         qs = qs.filter(area_risco=area_risco)
 
     return qs.order_by(order_by)
+
+
+# =========================
+# Seleção a partir de uma consulta (ações em massa)
+# =========================
+
+CONSULTAS_SELECAO = {
+    "identificacao": (assistidos_identificacao_qs, (
+        "q", "status", "logradouro", "cep", "bairro", "cidade", "idade_min", "idade_max", "aniversario",
+    )),
+    "saude": (
+        assistidos_saude_qs,
+        ("q", "status", "diabetes", "pressao_alta", "medic_uso_continuo", "doenca_permanente"),
+    ),
+    "socioeconomico": (
+        assistidos_socioeconomico_qs,
+        ("q", "status", "sit_trabalho", "faixa_renda", "tipo_moradia", "escolaridade", "area_risco"),
+    ),
+}
+
+
+def assistidos_da_consulta(origem: str, params):
+    """
+    Mesmo conjunto que a consulta `origem` mostra para os filtros `params`
+    (QueryDict da tela). Origem desconhecida -> identificação.
+    """
+    funcao, campos = CONSULTAS_SELECAO.get(origem, CONSULTAS_SELECAO["identificacao"])
+    return funcao(**{c: (params.get(c) or "").strip() for c in campos})
@@ -0,0 +1,186 @@
+# apps/operacoes/services/atribuicoes_massa.py
+"""
+Atribuição de um benefício a muitos assistidos de uma vez.
+
+Atribuir: o conjunto vem de uma consulta (assistidos_da_consulta). Quem já tem um
+ciclo aberto do benefício é descartado por um único anti-join (NOT EXISTS);
+o resto entra num bulk_create dentro de uma transação. Auditoria: um
+evento-resumo + um evento no histórico de cada assistido.
+
+bulk_create não chama save(): o `ativo` é calculado aqui com a mesma regra
+de BeneficioAssistido.save() (início no futuro = ainda inativo).
+
+Encerrar: um único UPDATE + um evento-resumo na auditoria.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from apps.assistidos.models import Assistido, StatusCadastro
+from apps.beneficios.models import BeneficioAssistido
+from apps.operacoes.services.auditoria import registrar_evento, registrar_por_objeto
+
+
+TAMANHO_BLOCO = 1000
+
+
+def _ciclo_aberto(beneficio, data_inicio: date):
+    """Ciclo do mesmo benefício ativo ou que ainda não terminou em data_inicio."""
+    return BeneficioAssistido.objects.filter(
+        Q(ativo=True) | Q(data_termino__isnull=True) | Q(data_termino__gt=data_inicio),
+        assistido=OuterRef("pk"),
+        beneficio_id=beneficio.pk,
+    )
+
+
+def separar(assistidos, beneficio, data_inicio: date):
+    """
+    (aptos, ja_possuem, inativos): querysets sobre o conjunto selecionado.
+    Só assistidos ATIVOS recebem benefício (mesma regra da atribuição individual).
+    """
+    assistidos = assistidos.order_by()
+    ativos = assistidos.filter(status=StatusCadastro.ATIVO).annotate(
+        tem_ciclo=Exists(_ciclo_aberto(beneficio, data_inicio))
+    )
+    return (
+        ativos.filter(tem_ciclo=False),
+        ativos.filter(tem_ciclo=True),
+        assistidos.exclude(status=StatusCadastro.ATIVO),
+    )
+
+
+def previa(assistidos, beneficio, data_inicio: date) -> dict:
+    aptos, ja_possuem, inativos = separar(assistidos, beneficio, data_inicio)
+    return {
+        "selecionados": assistidos.count(),
+        "aptos": aptos.count(),
+        "ja_possuem": ja_possuem.count(),
+        "inativos": inativos.count(),
+    }
+
+
+def atribuir_em_massa(assistidos, beneficio, data_inicio: date, *, usuario=None, filtros=None) -> dict:
+    """Cria as atribuições que faltam. Retorna os totais para a mensagem da tela."""
+    if not beneficio.ativo:
+        raise ValueError("Somente benefícios ATIVOS podem ser atribuídos.")
+
+    ativo = data_inicio <= timezone.localdate()
+    agora = timezone.now()
+
+    with transaction.atomic():
+        aptos, ja_possuem, inativos = separar(assistidos, beneficio, data_inicio)
+        ids = list(aptos.values_list("pk", flat=True))
+        ja = ja_possuem.count()
+        fora = inativos.count()
+
+        atendidos = []  # assistidos que de fato ganharam a atribuição
+        for inicio in range(0, len(ids), TAMANHO_BLOCO):
+            bloco = ids[inicio:inicio + TAMANHO_BLOCO]
+            BeneficioAssistido.objects.bulk_create(
+                [
+                    BeneficioAssistido(
+                        assistido_id=pk,
+                        beneficio_id=beneficio.pk,
+                        data_inicio=data_inicio,
+                        ativo=ativo,
+                        criado_em=agora,
+                    )
+                    for pk in bloco
+                ],
+                # Corrida com outra atribuição simultânea: a constraint de
+                # ciclo ativo único descarta a repetida em vez de abortar tudo
+                ignore_conflicts=True,
+            )
+            # ignore_conflicts não diz quais entraram: as deste bloco são as
+            # com o criado_em desta chamada (índice assistido + benefício)
+            atendidos += BeneficioAssistido.objects.filter(
+                assistido_id__in=bloco,
+                beneficio_id=beneficio.pk,
+                data_inicio=data_inicio,
+                criado_em=agora,
+            ).values_list("assistido_id", flat=True)
+        criadas = len(atendidos)
+
+        if criadas:
+            registrar_evento(
+                "ATRIBUIR_BENEFICIO",
+                usuario=usuario,
+                resumo=f"{beneficio.nome} atribuído a {criadas} assistidos",
+                quantidade=criadas,
+                ids=atendidos,
+                beneficio=beneficio.pk,
+                data_inicio=data_inicio,
+                filtros=filtros or {},
+            )
+            # Histórico de cada assistido atendido
+            registrar_por_objeto(
+                Assistido, atendidos, "ATRIBUIR_BENEFICIO",
+                usuario=usuario, beneficio=beneficio.pk, data_inicio=data_inicio,
+            )
+
+    return {
+        "criadas": criadas,
+        "ja_possuem": ja + (len(ids) - criadas),
+        "inativos": fora,
+    }
+
+
+# =========================
+#  ENCERRAMENTO EM MASSA
+# =========================
+
+def abertas(atribuicoes, data_termino: date):
+    """Ciclos que o encerramento em `data_termino` de fato altera."""
+    return atribuicoes.filter(
+        Q(ativo=True) | Q(data_termino__isnull=True) | Q(data_termino__gt=data_termino)
+    )
+
+
+def previa_encerramento(atribuicoes, data_termino: date) -> dict:
+    alvo = abertas(atribuicoes, data_termino)
+    return {
+        "encerrar": alvo.filter(data_inicio__lte=data_termino).count(),
+        # Término antes do início é inválido (BeneficioAssistido.clean)
+        "nao_iniciadas": alvo.filter(data_inicio__gt=data_termino).count(),
+    }
+
+
+def encerrar_em_massa(atribuicoes, data_termino: date, *, usuario=None, motivo: str = "", filtros=None) -> dict:
+    """
+    Encerra os ciclos num único UPDATE e registra o resumo na auditoria.
+
+    Mesma regra de BeneficioAssistido.save(): término hoje ou antes -> inativo;
+    término futuro mantém `ativo` como está até a data chegar. Só se desativa
+    ciclo aqui, então a constraint de ciclo ativo único nunca é violada.
+    """
+    hoje = timezone.localdate()
+    alvo = abertas(atribuicoes, data_termino).filter(data_inicio__lte=data_termino)
+
+    campos = {"data_termino": data_termino, "atualizado_em": timezone.now()}
+    if data_termino <= hoje:
+        campos["ativo"] = False
+
+    with transaction.atomic():
+        # ids só para a auditoria; o UPDATE usa o próprio filtro (um comando)
+        ids = list(alvo.order_by().values_list("pk", flat=True))
+        total = alvo.update(**campos)
+
+        if total:
+            registrar_evento(
+                "ENCERRAR_ATRIBUICOES",
+                usuario=usuario,
+                resumo=f"{total} atribuições encerradas em {data_termino:%d/%m/%Y}" + (f": {motivo}" if motivo else ""),
+                quantidade=total,
+                ids=ids,
+                data_termino=data_termino.isoformat(),
+                motivo=motivo,
+                filtros=filtros or {},
+            )
+            # Histórico de cada atribuição
+            registrar_por_objeto(BeneficioAssistido, ids, "ENCERRAR", usuario=usuario, data_termino=data_termino, motivo=motivo)
+
+    return {"encerradas": total}
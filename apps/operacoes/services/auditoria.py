@@ -0,0 +1,161 @@
+# apps/operacoes/services/auditoria.py
+"""
+Trilha de auditoria (apps.operacoes.EventoAuditoria), só inserção.
+
+Durante uma requisição os eventos vão para um buffer (ContextVar) e são
+gravados de uma vez, num bulk_create, quando a resposta sai
+(AuditoriaMiddleware). Assim marcar 300 entregas não vira 300 INSERTs a
+mais no dia de entrega.
+
+- Evento só entra no buffer depois do COMMIT (transaction.on_commit):
+  alteração desfeita por rollback não deixa rastro falso.
+- Fora de requisição (comandos, run_workers) não há buffer: grava no commit.
+- Usuário: o informado na chamada, ou o da requisição em andamento.
+"""
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+
+from apps.operacoes.models import EventoAuditoria
+
+
+logger = logging.getLogger(__name__)
+
+# Acima disto os ids afetados não vão para `dados` do evento-resumo
+LIMITE_IDS = 10_000
+TAMANHO_BLOCO = 1000
+
+_eventos: ContextVar[list | None] = ContextVar("auditoria_eventos", default=None)
+
+
+# =========================
+#  BUFFER
+# =========================
+
+@contextmanager
+def coletando(usuario=None):
+    """
+    Acumula os eventos do bloco e grava tudo no fim (um bulk_create).
+    `usuario` (pode ser o request.user preguiçoso) só é lido se houver evento.
+    """
+    eventos = []
+    token = _eventos.set(eventos)
+    try:
+        yield eventos
+    finally:
+        _eventos.reset(token)
+        if eventos:
+            gravar(eventos, usuario)
+
+
+def gravar(eventos: list, usuario=None) -> None:
+    usuario_id = _usuario_id_de(usuario)
+    for evento in eventos:
+        if evento.usuario_id is None:
+            evento.usuario_id = usuario_id
+    try:
+        EventoAuditoria.objects.bulk_create(eventos, batch_size=TAMANHO_BLOCO)
+    except Exception:
+        # Falha na auditoria não derruba a operação que já foi gravada
+        logger.exception("Não foi possível gravar %s eventos de auditoria.", len(eventos))
+
+
+def _enfileirar(eventos: list) -> None:
+    buffer = _eventos.get()
+    if buffer is None:
+        # Fora de request (shell, comandos, tarefas): grava no commit, com a mesma proteção
+        transaction.on_commit(lambda: gravar(eventos))
+    else:
+        transaction.on_commit(lambda: buffer.extend(eventos))
+
+
+def _usuario_id_de(usuario) -> int | None:
+    return usuario.pk if getattr(usuario, "is_authenticated", False) else None
+
+
+# =========================
+#  REGISTRO
+# =========================
+
+def registrar_evento(
+    acao: str,
+    *,
+    usuario=None,
+    resumo: str = "",
+    quantidade: int = 1,
+    objeto=None,
+    ids=None,
+    **dados,
+) -> None:
+    """
+    Um evento. `objeto`: instância afetada (quando é uma só);
+    `ids`: chaves afetadas numa operação em massa (evento-resumo).
+    """
+    if ids is not None:
+        ids = list(ids)
+        if len(ids) <= LIMITE_IDS:
+            dados["ids"] = ids
+        else:
+            dados["ids_omitidos"] = len(ids)
+
+    _enfileirar([
+        EventoAuditoria(
+            acao=acao,
+            modelo=objeto._meta.label_lower if objeto is not None else "",
+            objeto_id=str(objeto.pk) if objeto is not None else "",
+            resumo=resumo[:255],
+            quantidade=quantidade,
+            dados=dados,
+            usuario_id=_usuario_id_de(usuario),
+        )
+    ])
+
+
+def registrar_por_objeto(model, ids, acao: str, *, usuario=None, **dados) -> None:
+    """Um evento por registro afetado (histórico de cada um), para operações em massa."""
+    modelo = model._meta.label_lower
+    usuario_id = _usuario_id_de(usuario)
+    _enfileirar([
+        EventoAuditoria(acao=acao, modelo=modelo, objeto_id=str(pk), dados=dados, usuario_id=usuario_id)
+        for pk in ids
+    ])
+
+
+def registrar_entregas(lote_id: int, alterados, origem: str, *, usuario=None) -> None:
+    """alterados: [(item_id, entregue)] — os mesmos pares enviados a notificar_itens."""
+    usuario_id = _usuario_id_de(usuario)
+    _enfileirar([
+        EventoAuditoria(
+            acao="ENTREGUE" if entregue else "DESMARCADO",
+            modelo="beneficios.itementrega",
+            objeto_id=str(item_id),
+            dados={"lote": lote_id, "origem": origem},
+            usuario_id=usuario_id,
+        )
+        for item_id, entregue in alterados
+    ])
+
+
+# =========================
+#  HISTÓRICO
+# =========================
+
+def historico(*alvos, limite: int = 200):
+    """
+    Eventos de um ou mais registros, do mais recente ao mais antigo.
+    alvos: (model, [ids]) — usa o índice (modelo, objeto_id, criado_em).
+    """
+    from django.db.models import Q
+
+    filtro = Q()
+    for model, ids in alvos:
+        ids = [str(i) for i in ids]
+        if ids:
+            filtro |= Q(modelo=model._meta.label_lower, objeto_id__in=ids)
+    if not filtro:
+        return EventoAuditoria.objects.none()
+    return EventoAuditoria.objects.filter(filtro).select_related("usuario")[:limite]
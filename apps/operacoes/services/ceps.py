@@ -0,0 +1,306 @@
+# apps/operacoes/services/ceps.py
+"""
+Tabela local de CEPs (assistidos.Cep): importada de arquivo, sem rede.
+
+- Prefixo como faixa: "013" vira cep BETWEEN '01300000' AND '01399999'
+  (logradouro: logradouro_busca >= termo AND < termo + U+FFFF). Usa o
+  índice em qualquer banco; LIKE 'x%' não usa no SQLite (sem distinção
+  de caixa) nem no Postgres sem pattern_ops.
+- Versão da tabela no banco (MarcaTabela, incrementada na importação e
+  em cada edição pelo admin): vale para todos os processos; lida pelo
+  cache compartilhado por alguns segundos (limpo na importação/edição
+  deste processo), então o autocompletar não consulta o banco. Sugestões em
+  lru_cache por processo com a versão na chave; rota e PDF da chamada
+  também a usam nas suas chaves.
+- Latitude/longitude (centro do CEP) são opcionais no arquivo; servem à
+  ordem de rota das entregas (services/rotas.py).
+- normalizar_enderecos(): acerta bairro/cidade/UF (e logradouro em
+  branco) dos assistidos pelo CEP, para filtrar/agrupar por igualdade.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.assistidos.models import Assistido, Cep, normalizar_busca, normalizar_cep
+from apps.assistidos.signals import CAMPOS_FACETA, chave_faceta, limpar_cache_facetas
+from apps.operacoes.services.auditoria import registrar_evento
+from apps.operacoes.services.versoes import marcar_tabela, marcas_tabelas
+
+
+TAMANHO_LOTE = 5000
+LIMITE_SUGESTOES = 10
+TEMPO_CACHE_OPCOES = 60 * 60
+MINIMO_DIGITOS = 3
+MINIMO_LETRAS = 3
+# Versão da tabela no cache compartilhado: o autocompletar não vai ao banco a
+# cada tecla; outro processo vê a nova versão em no máximo este tempo.
+CHAVE_VERSAO = "ceps:versao"
+TEMPO_CACHE_VERSAO = 5
+
+CAMPOS_ENDERECO = ("logradouro", "bairro", "cidade", "uf")
+
+# Cabeçalhos comuns das bases de CEP (já normalizados) -> campo
+ALIASES = {
+    "localidade": "cidade",
+    "municipio": "cidade",
+    "estado": "uf",
+    "nome_logradouro": "logradouro",
+    "lat": "latitude",
+    "lon": "longitude",
+    "lng": "longitude",
+}
+
+
+# =========================
+#  IMPORTAÇÃO
+# =========================
+
+def _texto(valor) -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _coordenada(valor, limite: float) -> float | None:
+    texto = _texto(valor).replace(",", ".")
+    try:
+        numero = float(texto)
+    except ValueError:
+        return None
+    return numero if -limite <= numero <= limite else None
+
+
+def _montar_cep(dados: dict) -> Cep | None:
+    dados = {ALIASES.get(k, k): v for k, v in dados.items()}
+    cep = normalizar_cep(_texto(dados.get("cep"))).zfill(8)
+    cidade = _texto(dados.get("cidade"))
+    if len(cep) != 8 or cep == "00000000" or not cidade:
+        return None
+    logradouro = _texto(dados.get("logradouro"))[:120]
+    return Cep(
+        cep=cep,
+        logradouro=logradouro,
+        bairro=_texto(dados.get("bairro"))[:80],
+        cidade=cidade[:80],
+        uf=_texto(dados.get("uf")).upper()[:2],
+        latitude=_coordenada(dados.get("latitude"), 90),
+        longitude=_coordenada(dados.get("longitude"), 180),
+        logradouro_busca=normalizar_busca(logradouro)[:120],
+    )
+
+
+def importar_ceps(linhas: Iterable[dict], *, tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    """
+    Grava as linhas (dicts de ler_arquivo) com upsert em lotes: CEP que já
+    existe é atualizado. Linhas sem CEP de 8 dígitos ou sem cidade são rejeitadas.
+    """
+    lidas = gravadas = rejeitadas = 0
+    lote: dict[str, Cep] = {}
+
+    def gravar():
+        nonlocal gravadas
+        with transaction.atomic():
+            Cep.objects.bulk_create(
+                lote.values(),
+                update_conflicts=True,
+                unique_fields=["cep"],
+                update_fields=[*CAMPOS_ENDERECO, "latitude", "longitude", "logradouro_busca"],
+            )
+        gravadas += len(lote)
+        lote.clear()
+
+    for dados in linhas:
+        lidas += 1
+        cep = _montar_cep(dados)
+        if cep is None:
+            rejeitadas += 1
+            continue
+        lote[cep.cep] = cep  # repetido no arquivo: vale a última linha
+        if len(lote) >= tamanho_lote:
+            gravar()
+    if lote:
+        gravar()
+
+    marcar_tabela(Cep)
+    limpar_cache()  # libera a memória deste processo; os outros trocam de chave pela versão
+    return {"lidas": lidas, "gravadas": gravadas, "rejeitadas": rejeitadas}
+
+
+# =========================
+#  CONSULTA
+# =========================
+
+def faixa_cep(prefixo: str) -> tuple[str, str]:
+    """Menor e maior CEP com o prefixo (só dígitos, até 8)."""
+    return prefixo.ljust(8, "0"), prefixo.ljust(8, "9")
+
+
+def _como_dict(cep: Cep) -> dict:
+    return {
+        "cep": cep.cep,
+        "logradouro": cep.logradouro,
+        "bairro": cep.bairro,
+        "cidade": cep.cidade,
+        "uf": cep.uf,
+    }
+
+
+@lru_cache(maxsize=4096)
+def _sugestoes(chave: str, versao: str) -> tuple[dict, ...]:
+    if chave.isdigit():
+        inicio, fim = faixa_cep(chave)
+        qs = Cep.objects.filter(cep__gte=inicio, cep__lte=fim).order_by("cep")
+    else:
+        qs = (
+            Cep.objects
+            .filter(logradouro_busca__gte=chave, logradouro_busca__lt=chave + "\uffff")
+            .order_by("logradouro_busca", "cep")
+        )
+    return tuple(_como_dict(c) for c in qs[:LIMITE_SUGESTOES])
+
+
+def sugerir(termo: str) -> list[dict]:
+    """
+    Endereços para o autocompletar: prefixo de CEP (com ou sem hífen) ou
+    início do logradouro. Termo curto demais não consulta nada.
+    """
+    termo = (termo or "").strip()
+    digitos = normalizar_cep(termo)
+    if digitos and len(digitos) == len(termo.replace("-", "").replace(".", "")):
+        chave, minimo = digitos[:8], MINIMO_DIGITOS
+    else:
+        chave, minimo = normalizar_busca(termo), MINIMO_LETRAS
+    if len(chave) < minimo:
+        return []
+    return list(_sugestoes(chave, versao_tabela()))
+
+
+def buscar_cep(cep: str) -> dict | None:
+    cep = normalizar_cep(cep)
+    if len(cep) != 8:
+        return None
+    resultado = _sugestoes(cep, versao_tabela())
+    return resultado[0] if resultado else None
+
+
+def limpar_cache() -> None:
+    _sugestoes.cache_clear()
+    cache.delete(CHAVE_VERSAO)
+
+
+def _ler_versao() -> str:
+    contador, _ = marcas_tabelas([Cep]).get(Cep._meta.label_lower, (0, None))
+    return str(contador)
+
+
+def versao_tabela() -> str:
+    """Muda a cada importação/edição: entra nas chaves de cache que dependem da tabela."""
+    return cache.get_or_set(CHAVE_VERSAO, _ler_versao, TEMPO_CACHE_VERSAO)
+
+
+def opcoes_endereco(campo: str) -> list[str]:
+    """
+    Valores distintos de bairro/cidade/UF para as listas dos filtros.
+    Mesmo cache dos filtros do admin (invalidado ao salvar um Assistido).
+    """
+    if campo not in CAMPOS_FACETA:
+        raise ValueError(campo)
+    valores = cache.get_or_set(
+        chave_faceta(campo),
+        lambda: list(Assistido.objects.distinct().order_by(campo).values_list(campo, flat=True)),
+        TEMPO_CACHE_OPCOES,
+    )
+    return [v for v in valores if v]
+
+
+# =========================
+#  NORMALIZAÇÃO DOS ASSISTIDOS
+# =========================
+
+def _corrigir(assistido: Assistido, ref: Cep | None, cep: str) -> list[str]:
+    """Aplica o endereço da tabela e devolve os campos alterados."""
+    alterados = []
+    if cep != assistido.cep:
+        assistido.cep = cep
+        alterados.append("cep")
+    if ref is None:
+        return alterados
+
+    novos = {"bairro": ref.bairro, "cidade": ref.cidade, "uf": ref.uf}
+    if not assistido.logradouro.strip():
+        # Só completa: logradouro digitado (com detalhes) fica como está
+        novos["logradouro"] = ref.logradouro
+    for campo, valor in novos.items():
+        if valor and getattr(assistido, campo) != valor:
+            setattr(assistido, campo, valor)
+            alterados.append(campo)
+    return alterados
+
+
+def normalizar_enderecos(*, simular: bool = False, tamanho_lote: int = TAMANHO_LOTE, progresso=None) -> dict:
+    """
+    Percorre os assistidos com CEP: CEP só com dígitos (zeros à esquerda
+    recuperados) e bairro/cidade/UF iguais aos da tabela. Com `simular`
+    só conta. Retorna {lidos, sem_referencia, alterados, campos}.
+    """
+    campos_lidos = ("id", "nome", "cpf", "telefone", "cep", *CAMPOS_ENDERECO)
+    qs = Assistido.objects.exclude(cep="").only(*campos_lidos).order_by("pk")
+
+    lidos = sem_referencia = 0
+    alterados: list = []  # pks
+    por_campo: dict[str, int] = {}
+
+    def aplicar(bloco: list[Assistido]):
+        nonlocal sem_referencia
+        ceps = {}
+        for a in bloco:
+            cep = normalizar_cep(a.cep)
+            ceps[a.pk] = cep.zfill(8) if 5 <= len(cep) < 8 else cep
+        referencias = Cep.objects.in_bulk(set(ceps.values()))
+        agora = timezone.now()
+        mudaram = []
+        for a in bloco:
+            ref = referencias.get(ceps[a.pk])
+            if ref is None:
+                sem_referencia += 1
+            campos = _corrigir(a, ref, ceps[a.pk])
+            if campos:
+                for c in campos:
+                    por_campo[c] = por_campo.get(c, 0) + 1
+                a.busca = a.texto_busca()
+                a.atualizado_em = agora  # bulk_update não passa pelo auto_now
+                mudaram.append(a)
+        if mudaram and not simular:
+            Assistido.objects.bulk_update(
+                mudaram, ["cep", *CAMPOS_ENDERECO, "busca", "atualizado_em"], batch_size=1000
+            )
+        alterados.extend(a.pk for a in mudaram)
+
+    bloco = []
+    for assistido in qs.iterator(chunk_size=tamanho_lote):
+        lidos += 1
+        bloco.append(assistido)
+        if len(bloco) >= tamanho_lote:
+            aplicar(bloco)
+            bloco = []
+            if progresso:
+                progresso(lidos, len(alterados))
+    if bloco:
+        aplicar(bloco)
+
+    if alterados and not simular:
+        limpar_cache_facetas()
+        registrar_evento(
+            "NORMALIZAR_ENDERECOS",
+            resumo=f"Endereço de {len(alterados)} assistidos acertado pela tabela de CEPs",
+            quantidade=len(alterados),
+            campos=por_campo,
+        )
+    return {"lidos": lidos, "sem_referencia": sem_referencia, "alterados": len(alterados), "campos": por_campo}
@@ -0,0 +1,111 @@
+# apps/operacoes/services/checkin.py
+"""
+Check-in no balcão: código lido (leitor de barras / digitado) -> item do lote -> entregue.
+
+- Mapa codigo -> (item_id, nome) por lote, em cache durante a entrega
+  (uma consulta na primeira leitura; as seguintes não tocam o banco para achar o item).
+- Código fora do mapa (item incluído depois) cai na busca indexada por
+  Assistido.codigo (unique) e o mapa é refeito.
+- A marcação é um único UPDATE ... WHERE id = ? AND entregue = false.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.beneficios.models import ItemEntrega
+from apps.operacoes.services.auditoria import registrar_entregas
+from apps.operacoes.services.eventos_lote import notificar_itens
+
+
+CACHE_TIMEOUT = 60 * 60 * 4  # um dia de entrega
+
+
+@dataclass
+class ResultadoCheckin:
+    encontrado: bool
+    codigo: str
+    item_id: int | None = None
+    nome: str = ""
+    ja_entregue: bool = False
+
+    def como_dict(self) -> dict:
+        return {
+            "encontrado": self.encontrado,
+            "codigo": self.codigo,
+            "item_id": self.item_id,
+            "nome": self.nome,
+            "ja_entregue": self.ja_entregue,
+        }
+
+
+def normalizar_codigo(codigo: str) -> str:
+    # Leitores costumam mandar espaços/CR; teclado pode vir em minúsculas
+    return (codigo or "").strip().upper()
+
+
+def chave_mapa(lote_id) -> str:
+    return f"checkin:lote:{lote_id}"
+
+
+def limpar_mapa(lote_id) -> None:
+    cache.delete(chave_mapa(lote_id))
+
+
+def mapa_codigos(lote_id, *, recarregar: bool = False) -> dict[str, tuple[int, str]]:
+    chave = chave_mapa(lote_id)
+    mapa = None if recarregar else cache.get(chave)
+    if mapa is None:
+        mapa = {
+            codigo: (item_id, nome)
+            for item_id, codigo, nome in ItemEntrega.objects
+            .filter(lote_id=lote_id, atribuicao__assistido__codigo__isnull=False)
+            .values_list("id", "atribuicao__assistido__codigo", "atribuicao__assistido__nome")
+        }
+        cache.set(chave, mapa, CACHE_TIMEOUT)
+    return mapa
+
+
+def _localizar(lote_id, codigo):
+    encontrado = mapa_codigos(lote_id).get(codigo)
+    if encontrado:
+        return encontrado
+
+    # Não estava no mapa: busca indexada (codigo é unique) e, se existir, refaz o mapa
+    linha = (
+        ItemEntrega.objects
+        .filter(lote_id=lote_id, atribuicao__assistido__codigo=codigo)
+        .values_list("id", "atribuicao__assistido__nome")
+        .first()
+    )
+    if linha:
+        mapa_codigos(lote_id, recarregar=True)
+    return linha
+
+
+def registrar_checkin(lote_id, codigo: str) -> ResultadoCheckin:
+    codigo = normalizar_codigo(codigo)
+    if not codigo:
+        return ResultadoCheckin(encontrado=False, codigo=codigo)
+
+    localizado = _localizar(lote_id, codigo)
+    if not localizado:
+        return ResultadoCheckin(encontrado=False, codigo=codigo)
+
+    item_id, nome = localizado
+    agora = timezone.now()
+    alterados = ItemEntrega.objects.filter(id=item_id, entregue=False).update(
+        entregue=True, marcado_em=agora, atualizado_em=agora
+    )
+    if alterados:
+        notificar_itens(lote_id, [(item_id, True)])
+        registrar_entregas(lote_id, [(item_id, True)], "checkin")
+        return ResultadoCheckin(encontrado=True, codigo=codigo, item_id=item_id, nome=nome)
+
+    # 0 linhas: já estava entregue, ou o item saiu do lote depois do mapa
+    if ItemEntrega.objects.filter(id=item_id).exists():
+        return ResultadoCheckin(encontrado=True, codigo=codigo, item_id=item_id, nome=nome, ja_entregue=True)
+    limpar_mapa(lote_id)
+    return ResultadoCheckin(encontrado=False, codigo=codigo)
@@ -0,0 +1,28 @@
+# apps/operacoes/services/consultas_async.py
+"""
+Apoio às views de consulta assíncronas (modo ASGI).
+
+Os services *_queries.py só montam QuerySets (não tocam o banco), então servem
+para as duas versões. A diferença fica aqui:
+- a avaliação usa o ORM assíncrono (async for / acount), sem bloquear o event loop;
+- o template recebe listas já carregadas (avaliar QuerySet no template a partir
+  de uma view async levanta SynchronousOnlyOperation);
+- render (context processors consultam grupos do usuário) roda em thread.
+"""
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render
+
+from apps.operacoes.fragmentos import render_lista
+
+
+async def materializar(qs) -> list:
+    """Carrega o QuerySet com o ORM assíncrono; len() da lista substitui o COUNT(*)."""
+    return [obj async for obj in qs]
+
+
+async def render_async(request, template_name, contexto=None, *, lista=False):
+    """render()/render_lista() fora do event loop (context processors usam o banco)."""
+    funcao = render_lista if lista else render
+    return await sync_to_async(funcao)(request, template_name, contexto)
@@ -0,0 +1,310 @@
+# apps/operacoes/services/duplicidades.py
+"""
+Detecção de cadastros duplicados (mesma família registrada duas vezes).
+
+- Blocagem: cada cadastro recebe algumas chaves (nome fonético + ano de
+  nascimento, data de nascimento, telefone, CEP + primeiro nome). Só se comparam cadastros que
+  dividem uma chave; blocos grandes demais (telefone "00000000", CEP de
+  condomínio) são ignorados. Nada de comparar todos contra todos.
+- Pontuação: semelhança dos nomes (difflib) + bônus por nascimento,
+  telefone e CEP iguais; nascimento diferente pesa contra. CPFs diferentes
+  (ambos preenchidos) nunca são duplicidade.
+- Resultado: fila SuspeitaDuplicidade para revisão humana; mesclar()
+  move as atribuições para o cadastro mantido e inativa o outro.
+"""
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import combinations
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.assistidos.models import Assistido, StatusCadastro, normalizar_busca
+from apps.beneficios.models import BeneficioAssistido
+from apps.operacoes.models import StatusSuspeita, SuspeitaDuplicidade
+from apps.operacoes.services.atribuicoes_massa import encerrar_em_massa
+from apps.operacoes.services.auditoria import registrar_evento, registrar_por_objeto
+
+
+LIMIAR = 0.72
+LIMITE_BLOCO = 200
+PESO_NOME = 0.6
+BONUS = {"nascimento": 0.15, "telefone": 0.15, "cep": 0.10}
+PENALIDADE_NASCIMENTO = 0.2
+
+PARTICULAS = {"da", "de", "do", "das", "dos", "e"}
+
+# Campos copiados do cadastro removido quando o mantido está em branco
+CAMPOS_COMPLETAR = (
+    "data_nascimento", "telefone", "logradouro", "numero", "complemento",
+    "bairro", "cidade", "uf", "cep", "data_inicio_apoio",
+)
+
+
+# =========================
+#  CHAVES
+# =========================
+
+# Regras na ordem (texto já sem acentos e minúsculo)
+_FONETICA = [
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"lh"), "l"),
+    (re.compile(r"nh"), "n"),
+    (re.compile(r"ch|sh"), "x"),
+    (re.compile(r"th"), "t"),
+    (re.compile(r"gu(?=[ei])"), "g"),
+    (re.compile(r"g(?=[ei])"), "j"),
+    (re.compile(r"qu?"), "k"),
+    (re.compile(r"sc(?=[ei])"), "s"),
+    (re.compile(r"c(?=[ei])"), "s"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"y"), "i"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"h"), ""),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+_VOGAIS = re.compile(r"(?<=.)[aeiou]")
+
+
+@lru_cache(maxsize=50_000)  # nomes e sobrenomes se repetem muito
+def fonetica(palavra: str) -> str:
+    """Chave fonética simplificada do português ("Thiago" e "Tiago" -> "tg")."""
+    for regra, troca in _FONETICA:
+        palavra = regra.sub(troca, palavra)
+    return _VOGAIS.sub("", palavra)
+
+
+def nome_comparavel(nome: str) -> str:
+    """Sem acentos e sem "da/de/dos": "José da Silva" e "Jose Silva" ficam iguais."""
+    return " ".join(p for p in normalizar_busca(nome).split() if p not in PARTICULAS)
+
+
+def chave_nome(nome: str) -> str:
+    partes = [p for p in nome_comparavel(nome).split() if not p.isdigit()]
+    if not partes:
+        return ""
+    return fonetica(partes[0]) + "|" + fonetica(partes[-1]) if len(partes) > 1 else fonetica(partes[0])
+
+
+def normalizar_telefone(valor: str) -> str:
+    """Últimos 8 dígitos: ignora DDD e o 9 extra do celular."""
+    digitos = "".join(c for c in (valor or "") if c.isdigit())
+    return digitos[-8:] if len(digitos) >= 8 else ""
+
+
+@dataclass
+class Registro:
+    id: object
+    nome: str
+    cpf: str
+    nascimento: date | None
+    telefone: str
+    cep: str
+    chave_nome: str
+
+    def chaves(self):
+        if self.chave_nome:
+            # Nome sozinho junta blocos enormes nos nomes comuns: vai com o ano
+            ano = self.nascimento.year if self.nascimento else ""
+            yield f"n:{self.chave_nome}:{ano}"
+            if self.cep:
+                yield "c:" + self.cep + self.chave_nome.split("|")[0]
+        if self.nascimento:
+            yield f"d:{self.nascimento:%Y%m%d}"
+        if self.telefone:
+            yield "t:" + self.telefone
+
+
+def _registros() -> list[Registro]:
+    return [
+        Registro(
+            id=pk,
+            nome=nome_comparavel(nome),
+            cpf=cpf or "",
+            nascimento=nascimento,
+            telefone=normalizar_telefone(telefone),
+            cep=cep or "",
+            chave_nome=chave_nome(nome),
+        )
+        for pk, nome, cpf, nascimento, telefone, cep in Assistido.objects.values_list(
+            "id", "nome", "cpf", "data_nascimento", "telefone", "cep"
+        ).iterator(chunk_size=5000)
+    ]
+
+
+# =========================
+#  COMPARAÇÃO
+# =========================
+
+def comparar(a: Registro, b: Registro) -> tuple[float, list[str]] | None:
+    """(pontuação, motivos) quando o par passa do LIMIAR; senão None."""
+    if a.cpf and b.cpf and a.cpf != b.cpf:
+        return None
+
+    motivos = []
+    bonus = 0.0
+    for campo, peso in BONUS.items():
+        va, vb = getattr(a, campo), getattr(b, campo)
+        if va and va == vb:
+            bonus += peso
+            motivos.append(campo)
+    if a.nascimento and b.nascimento and a.nascimento != b.nascimento:
+        bonus -= PENALIDADE_NASCIMENTO
+    if PESO_NOME + bonus < LIMIAR:
+        return None  # nem com nomes idênticos chegaria lá
+
+    comparador = SequenceMatcher(None, a.nome, b.nome)
+    # quick_ratio() é um limite superior barato do ratio(): corta a maioria dos pares
+    if PESO_NOME * comparador.quick_ratio() + bonus < LIMIAR:
+        return None
+    semelhanca = comparador.ratio()
+    pontuacao = PESO_NOME * semelhanca + bonus
+    if pontuacao < LIMIAR:
+        return None
+    if a.cpf and a.cpf == b.cpf:
+        motivos.append("cpf")
+    return round(min(pontuacao, 1.0), 3), [f"nome {semelhanca:.0%}"] + motivos
+
+
+def pares_suspeitos(registros: list[Registro]) -> tuple[list[tuple[Registro, Registro, float, list[str]]], dict]:
+    """Compara só dentro dos blocos. Retorna (pares acima do LIMIAR, estatísticas)."""
+    blocos = defaultdict(list)
+    for i, r in enumerate(registros):
+        for chave in r.chaves():
+            blocos[chave].append(i)
+
+    vistos = set()
+    pares = []
+    ignorados = 0
+    for membros in blocos.values():
+        if len(membros) < 2:
+            continue
+        if len(membros) > LIMITE_BLOCO:
+            ignorados += 1
+            continue
+        for i, j in combinations(membros, 2):
+            if (i, j) in vistos:
+                continue
+            vistos.add((i, j))
+            resultado = comparar(registros[i], registros[j])
+            if resultado:
+                pares.append((registros[i], registros[j], *resultado))
+    return pares, {"comparacoes": len(vistos), "blocos_ignorados": ignorados}
+
+
+def detectar(progresso=None) -> dict:
+    """Lê os cadastros, procura os pares e grava as suspeitas novas."""
+    registros = _registros()
+    if progresso:
+        progresso(20, mensagem=f"{len(registros)} cadastros lidos")
+
+    pares, estatisticas = pares_suspeitos(registros)
+    if progresso:
+        progresso(80, mensagem=f"{estatisticas['comparacoes']} pares comparados")
+
+    suspeitas = []
+    for ra, rb, pontuacao, motivos in pares:
+        a, b = sorted((ra.id, rb.id))
+        suspeitas.append(SuspeitaDuplicidade(
+            assistido_a_id=a,
+            assistido_b_id=b,
+            pontuacao=pontuacao,
+            motivos=", ".join(motivos)[:120],
+        ))
+
+    antes = SuspeitaDuplicidade.objects.count()
+    # Par já na fila (inclusive revisado) não volta
+    SuspeitaDuplicidade.objects.bulk_create(suspeitas, batch_size=1000, ignore_conflicts=True)
+    novas = SuspeitaDuplicidade.objects.count() - antes
+
+    return {
+        "cadastros": len(registros),
+        "encontradas": len(suspeitas),
+        "novas": novas,
+        **estatisticas,
+    }
+
+
+# =========================
+#  REVISÃO
+# =========================
+
+def descartar(suspeita: SuspeitaDuplicidade, *, usuario=None) -> None:
+    suspeita.status = StatusSuspeita.DESCARTADA
+    suspeita.revisado_por = usuario if getattr(usuario, "is_authenticated", False) else None
+    suspeita.revisado_em = timezone.now()
+    suspeita.save(update_fields=["status", "revisado_por", "revisado_em"])
+
+
+def mesclar(suspeita: SuspeitaDuplicidade, manter_id, *, usuario=None) -> dict:
+    """
+    Mantém um cadastro e inativa o outro:
+    - atribuições do removido passam para o mantido; ciclo ativo de um
+      benefício que o mantido também tem ativo é encerrado hoje antes;
+    - campos em branco do mantido são completados com os do removido;
+    - o removido fica INATIVO, com o motivo apontando o código mantido.
+    """
+    ids = {str(suspeita.assistido_a_id), str(suspeita.assistido_b_id)}
+    if str(manter_id) not in ids:
+        raise ValueError("O cadastro mantido precisa ser um dos dois da suspeita.")
+    (remover_id,) = ids - {str(manter_id)}
+    hoje = timezone.localdate()
+
+    with transaction.atomic():
+        manter = Assistido.objects.select_for_update().get(pk=manter_id)
+        remover = Assistido.objects.select_for_update().get(pk=remover_id)
+
+        ativos_manter = BeneficioAssistido.objects.filter(assistido=manter, ativo=True).values("beneficio_id")
+        encerradas = encerrar_em_massa(
+            BeneficioAssistido.objects.filter(assistido=remover, ativo=True, beneficio_id__in=ativos_manter),
+            hoje,
+            usuario=usuario,
+            motivo=f"Mescla com o cadastro {manter.codigo}",
+        )["encerradas"]
+
+        atribuicoes = list(BeneficioAssistido.objects.filter(assistido=remover).values_list("pk", flat=True))
+        BeneficioAssistido.objects.filter(pk__in=atribuicoes).update(
+            assistido=manter, atualizado_em=timezone.now()
+        )
+
+        for campo in CAMPOS_COMPLETAR:
+            if not getattr(manter, campo) and getattr(remover, campo):
+                setattr(manter, campo, getattr(remover, campo))
+        cpf = None
+        if not manter.cpf and remover.cpf:
+            cpf, remover.cpf = remover.cpf, None  # unique: sai de um antes de entrar no outro
+
+        remover.status = StatusCadastro.INATIVO
+        remover.data_inativacao = hoje
+        remover.motivo_inativacao = f"Cadastro duplicado de {manter.codigo}"[:200]
+        remover.save()
+        if cpf:
+            manter.cpf = cpf
+        manter.save()
+
+        suspeita.status = StatusSuspeita.MESCLADA
+        suspeita.revisado_por = usuario if getattr(usuario, "is_authenticated", False) else None
+        suspeita.revisado_em = timezone.now()
+        suspeita.save(update_fields=["status", "revisado_por", "revisado_em"])
+
+        registrar_evento(
+            "MESCLAR_ASSISTIDOS",
+            usuario=usuario,
+            objeto=manter,
+            resumo=f"{remover.codigo} mesclado em {manter.codigo}",
+            removido=str(remover.pk),
+            atribuicoes=len(atribuicoes),
+            encerradas=encerradas,
+        )
+        registrar_por_objeto(
+            BeneficioAssistido, atribuicoes, "MOVER", usuario=usuario, de=str(remover.pk), para=str(manter.pk)
+        )
+
+    return {"manter": manter, "remover": remover, "atribuicoes": len(atribuicoes), "encerradas": encerradas}
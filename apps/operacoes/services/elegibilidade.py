@@ -0,0 +1,158 @@
+# apps/operacoes/services/elegibilidade.py
+"""
+Quem deve receber um benefício numa data.
+
+- Elegíveis: atribuição vigente na data (data_inicio <= data < data_termino)
+  e assistido ATIVO. A vigência é olhada na data pedida, não no campo
+  `ativo` (que reflete só o dia de hoje).
+- Atendidos: elegíveis com entrega confirmada no período da data
+  (semana ou mês, conforme a periodicidade; ocasional = desde o início
+  da atribuição).
+- Pendentes: elegíveis ainda não atendidos no período.
+- Em atraso: pendentes que também ficaram sem entrega no período anterior,
+  estando vigentes nele.
+
+Tudo em SQL (EXISTS correlacionado por atribuição): uma consulta para os
+totais, uma para a lista, sem laço em Python sobre as atribuições. Período
+(atual ou anterior) que alcança o corte do arquivo de entregas lê as views
+*_historico.
+"""
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Value
+
+from apps.assistidos.models import StatusCadastro
+from apps.beneficios.models import BeneficioAssistido, ItemEntregaHistorico, PeriodicidadeBeneficio
+from apps.operacoes.services.arquivo_entregas import modelos
+
+
+SITUACOES = ("pendentes", "atrasados", "atendidos", "elegiveis")
+
+
+@dataclass(frozen=True)
+class Periodo:
+    inicio: date
+    fim: date
+
+
+# =========================
+#  PERÍODOS
+# =========================
+
+def periodo(periodicidade: str, data: date) -> Periodo | None:
+    """Semana (seg–dom) ou mês da data; None para benefício ocasional."""
+    if periodicidade == PeriodicidadeBeneficio.SEMANAL:
+        inicio = data - timedelta(days=data.weekday())
+        return Periodo(inicio, inicio + timedelta(days=6))
+    if periodicidade == PeriodicidadeBeneficio.MENSAL:
+        ultimo = calendar.monthrange(data.year, data.month)[1]
+        return Periodo(data.replace(day=1), data.replace(day=ultimo))
+    return None
+
+
+def periodo_anterior(periodicidade: str, data: date) -> Periodo | None:
+    atual = periodo(periodicidade, data)
+    if atual is None:
+        return None
+    return periodo(periodicidade, atual.inicio - timedelta(days=1))
+
+
+# =========================
+#  CONSULTAS
+# =========================
+
+def elegiveis_qs(beneficio, data: date):
+    return (
+        BeneficioAssistido.objects
+        .filter(
+            beneficio_id=beneficio.pk,
+            data_inicio__lte=data,
+            assistido__status=StatusCadastro.ATIVO,
+        )
+        .filter(Q(data_termino__isnull=True) | Q(data_termino__gt=data))
+    )
+
+
+def _entregas(periodo_: Periodo | None, data: date, **filtros):
+    if periodo_ is None:
+        # Ocasional: qualquer entrega do ciclo atual da atribuição (pode estar no arquivo)
+        return ItemEntregaHistorico.objects.filter(
+            atribuicao=OuterRef("pk"),
+            lote__data_entrega__gte=OuterRef("data_inicio"),
+            lote__data_entrega__lte=data,
+            **filtros,
+        )
+    # Semana/mês que começa antes do corte do arquivo: lê quente + arquivo
+    _, item_model = modelos(periodo_.inicio, periodo_.fim)
+    itens = item_model.objects.filter(atribuicao=OuterRef("pk"), **filtros)
+    return itens.filter(lote__data_entrega__range=(periodo_.inicio, periodo_.fim))
+
+
+def com_situacao(beneficio, data: date):
+    """Elegíveis anotados com atendido / atrasado / faltou (booleans em SQL)."""
+    atual = periodo(beneficio.periodicidade, data)
+    anterior = periodo_anterior(beneficio.periodicidade, data)
+
+    qs = elegiveis_qs(beneficio, data).annotate(
+        atendido=Exists(_entregas(atual, data, entregue=True)),
+        # Estava na chamada do período e não retirou
+        faltou=Exists(_entregas(atual, data, entregue=False)),
+    )
+    if anterior is None:
+        return qs.annotate(atrasado=Value(False))
+
+    return qs.annotate(
+        atendido_anterior=Exists(_entregas(anterior, data, entregue=True)),
+        atrasado=Q(
+            atendido=False,
+            atendido_anterior=False,
+            data_inicio__lte=anterior.fim,
+        ),
+    )
+
+
+def resumo(beneficio, data: date) -> dict:
+    """Totais de elegíveis, atendidos, pendentes e em atraso (uma consulta)."""
+    totais = com_situacao(beneficio, data).aggregate(
+        elegiveis=Count("pk"),
+        atendidos=Count("pk", filter=Q(atendido=True)),
+        atrasados=Count("pk", filter=Q(atrasado=True)),
+        faltaram=Count("pk", filter=Q(atendido=False, faltou=True)),
+    )
+    totais["pendentes"] = totais["elegiveis"] - totais["atendidos"]
+    totais["periodo"] = periodo(beneficio.periodicidade, data)
+    return totais
+
+
+def relatorio(beneficio, data: date, situacao: str = "pendentes", order_by: str = "assistido__nome"):
+    """Lista para a consulta de faltosos, com a data da última entrega."""
+    # Última entrega pode ser anterior ao corte do arquivo
+    ultima = (
+        ItemEntregaHistorico.objects
+        .filter(atribuicao=OuterRef("pk"), entregue=True, lote__data_entrega__lte=data)
+        .order_by("-lote__data_entrega")
+        .values("lote__data_entrega")[:1]
+    )
+    qs = (
+        com_situacao(beneficio, data)
+        .select_related("assistido")
+        .annotate(ultima_entrega=Subquery(ultima))
+    )
+
+    if situacao == "atendidos":
+        qs = qs.filter(atendido=True)
+    elif situacao == "atrasados":
+        qs = qs.filter(atrasado=True)
+    elif situacao == "pendentes":
+        qs = qs.filter(atendido=False)
+
+    if order_by.lstrip("-") == "ultima_entrega":
+        # Nunca recebeu aparece primeiro no crescente
+        campo = F("ultima_entrega")
+        ordem = campo.desc(nulls_last=True) if order_by.startswith("-") else campo.asc(nulls_first=True)
+        return qs.order_by(ordem, "assistido__nome")
+    return qs.order_by(order_by)
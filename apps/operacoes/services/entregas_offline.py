@@ -0,0 +1,165 @@
+# apps/operacoes/services/entregas_offline.py
+"""
+Checklist de entrega offline.
+
+- snapshot_lote(): JSON compacto com os itens do lote (nome, código, final do CPF),
+  baixado pelo navegador antes de ir para o salão.
+- aplicar_marcacoes(): recebe as marcações feitas no aparelho (item, entregue,
+  marcado_em) e aplica em lote. Idempotente: reenviar o mesmo lote não muda nada.
+  Conflitos por item: vence a marcação com marcado_em mais recente.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.beneficios.models import ItemEntrega
+from apps.operacoes.services.auditoria import registrar_entregas
+from apps.operacoes.services.eventos_lote import notificar_itens
+
+
+MAX_MARCACOES = 2000
+# Relógio do aparelho adiantado não pode "travar" o item no futuro
+TOLERANCIA_RELOGIO = timedelta(minutes=5)
+
+
+class MarcacaoInvalida(Exception):
+    pass
+
+
+def _cpf_final(cpf: str | None) -> str:
+    cpf = cpf or ""
+    return f"{cpf[6:9]}-{cpf[9:]}" if len(cpf) == 11 else ""
+
+
+def snapshot_lote(lote) -> dict:
+    linhas = (
+        ItemEntrega.objects
+        .filter(lote=lote)
+        .order_by("atribuicao__assistido__nome", "id")
+        .values(
+            "id",
+            "entregue",
+            "marcado_em",
+            "atribuicao__assistido__nome",
+            "atribuicao__assistido__codigo",
+            "atribuicao__assistido__cpf",
+        )
+    )
+    itens = [
+        {
+            "id": l["id"],
+            "nome": l["atribuicao__assistido__nome"],
+            "codigo": l["atribuicao__assistido__codigo"] or "",
+            "cpf": _cpf_final(l["atribuicao__assistido__cpf"]),
+            "entregue": l["entregue"],
+            "marcado_em": l["marcado_em"],
+        }
+        for l in linhas
+    ]
+    return {
+        "lote": {
+            "id": lote.id,
+            "data_entrega": lote.data_entrega,
+            "beneficio": lote.beneficio.nome,
+        },
+        "gerado_em": timezone.now(),
+        "itens": itens,
+    }
+
+
+@dataclass
+class ResultadoSincronizacao:
+    aplicados: list[int] = field(default_factory=list)
+    ignorados: list[int] = field(default_factory=list)   # já havia marcação mais nova (ou a mesma)
+    invalidos: list[dict] = field(default_factory=list)  # item fora do lote / dados ruins
+    estado: dict[int, dict] = field(default_factory=dict)  # situação final dos itens enviados
+
+    def como_dict(self) -> dict:
+        return {
+            "aplicados": self.aplicados,
+            "ignorados": self.ignorados,
+            "invalidos": self.invalidos,
+            "estado": self.estado,
+        }
+
+
+def _validar(marcacoes, agora):
+    """Normaliza a entrada e mantém só a marcação mais recente por item."""
+    if not isinstance(marcacoes, list):
+        raise MarcacaoInvalida("marcacoes deve ser uma lista.")
+    if len(marcacoes) > MAX_MARCACOES:
+        raise MarcacaoInvalida(f"Máximo de {MAX_MARCACOES} marcações por envio.")
+
+    validas: dict[int, tuple[bool, object]] = {}
+    invalidos = []
+    limite = agora + TOLERANCIA_RELOGIO
+    for m in marcacoes:
+        try:
+            item_id = int(m["item"])
+            entregue = m["entregue"]
+            marcado_em = parse_datetime(str(m["marcado_em"]))
+        except (KeyError, TypeError, ValueError):
+            invalidos.append({"marcacao": m, "erro": "Formato inválido."})
+            continue
+        if not isinstance(entregue, bool) or marcado_em is None:
+            invalidos.append({"marcacao": m, "erro": "Formato inválido."})
+            continue
+        if timezone.is_naive(marcado_em):
+            marcado_em = timezone.make_aware(marcado_em)
+        marcado_em = min(marcado_em, limite)
+
+        atual = validas.get(item_id)
+        if atual is None or marcado_em > atual[1]:
+            validas[item_id] = (entregue, marcado_em)
+    return validas, invalidos
+
+
+def aplicar_marcacoes(lote, marcacoes) -> ResultadoSincronizacao:
+    agora = timezone.now()
+    validas, invalidos = _validar(marcacoes, agora)
+    resultado = ResultadoSincronizacao(invalidos=invalidos)
+    if not validas:
+        return resultado
+
+    with transaction.atomic():
+        # Trava só as linhas envolvidas: duas sincronizações simultâneas do mesmo
+        # item são serializadas e a comparação de marcado_em continua correta.
+        itens = {
+            i.id: i
+            for i in ItemEntrega.objects
+            .select_for_update()
+            .filter(lote=lote, id__in=list(validas))
+            .only("id", "entregue", "marcado_em")
+        }
+
+        alterar = []
+        for item_id, (entregue, marcado_em) in validas.items():
+            item = itens.get(item_id)
+            if item is None:
+                resultado.invalidos.append({"marcacao": {"item": item_id}, "erro": "Item não pertence ao lote."})
+                continue
+            if item.marcado_em is not None and marcado_em <= item.marcado_em:
+                resultado.ignorados.append(item_id)
+                continue
+            item.entregue = entregue
+            item.marcado_em = marcado_em
+            item.atualizado_em = agora
+            alterar.append(item)
+            resultado.aplicados.append(item_id)
+
+        if alterar:
+            ItemEntrega.objects.bulk_update(alterar, ["entregue", "marcado_em", "atualizado_em"], batch_size=500)
+            pares = [(i.id, i.entregue) for i in alterar]
+            notificar_itens(lote.id, pares)
+            registrar_entregas(lote.id, pares, "offline")
+
+    resultado.estado = {
+        i.id: {"entregue": i.entregue, "marcado_em": i.marcado_em}
+        for i in itens.values()
+    }
+    return resultado
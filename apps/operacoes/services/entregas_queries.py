@@ -7,7 +7,8 @@ from typing import Optional, Tuple
 from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
 
-from apps.beneficios.models import Beneficio, ItemEntrega, LoteEntrega
+from apps.beneficios.models import Beneficio, ItemEntrega, ItemEntregaHistorico, LoteEntrega, LoteEntregaHistorico
+from apps.operacoes.services.arquivo_entregas import lote_arquivado, modelos
 
 
 # =========================
@@ -74,11 +75,16 @@ def lotes_com_resumo(
       - benefício
       - intervalo de data
       - texto (nome do benefício ou ID do lote)
-    """
-    qs = LoteEntrega.objects.select_related("beneficio")
 
+    Lotes arquivados entram quando o período alcança o corte do arquivo ou
+    quando o texto é o id de um lote arquivado.
+    """
     di = _parse_date(data_ini)
     df = _parse_date(data_fim)
+    q = (q or "").strip()
+    lote_model, _ = modelos(di, df, arquivo=q.isdigit() and lote_arquivado(int(q)))
+    qs = lote_model.objects.select_related("beneficio")
+
     if di:
         qs = qs.filter(data_entrega__gte=di)
     if df:
@@ -90,7 +96,6 @@ def lotes_com_resumo(
         except ValueError:
             pass
 
-    q = (q or "").strip()
     if q:
         cond = Q(beneficio__nome__icontains=q)
         if q.isdigit():
@@ -120,16 +125,19 @@ def historico_itens_por_assistido(
       - intervalo de datas no lote
       - benefício do lote
       - status (todos/entregue/pendente)
+
+    Itens arquivados só entram quando o período alcança o corte do arquivo.
     """
     status = _normalize_status(status)
 
+    di = _parse_date(data_ini)
+    df = _parse_date(data_fim)
+    _, item_model = modelos(di, df)
     qs = (
-        ItemEntrega.objects
+        item_model.objects
         .select_related("lote", "lote__beneficio", "atribuicao", "atribuicao__assistido")
     )
 
-    di = _parse_date(data_ini)
-    df = _parse_date(data_fim)
     if di:
         qs = qs.filter(lote__data_entrega__gte=di)
     if df:
@@ -170,15 +178,18 @@ def itens_do_lote(
     """
     Retorna:
       (lote, itens_qs, entregues_qs, pendentes_qs)
+
+    Lote que não está nas tabelas quentes é procurado no arquivo.
     """
     lote_id = (lote_id or "").strip()
-    lote = get_object_or_404(
-        LoteEntrega.objects.select_related("beneficio"),
-        id=int(lote_id),
-    )
+    lote = LoteEntrega.objects.select_related("beneficio").filter(id=int(lote_id)).first()
+    item_model = ItemEntrega
+    if lote is None:
+        lote = get_object_or_404(LoteEntregaHistorico.objects.select_related("beneficio"), id=int(lote_id))
+        item_model = ItemEntregaHistorico
 
     itens_qs = (
-        ItemEntrega.objects
+        item_model.objects
         .select_related("atribuicao__assistido", "atribuicao__beneficio", "lote", "lote__beneficio")
         .filter(lote_id=lote.id)
         .order_by(order_by)
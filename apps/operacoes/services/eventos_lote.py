@@ -0,0 +1,208 @@
+# apps/operacoes/services/eventos_lote.py
+"""
+Progresso do lote ao vivo (Server-Sent Events).
+
+- Transmissor em processo: quem marca itens (checklist, check-in, sincronização
+  offline, admin) publica depois do commit; cada tela inscrita recebe na hora.
+- Fallback por consulta: a cada poucos segundos o fluxo procura itens do lote
+  com atualizado_em mais novo. Cobre alterações feitas em outro processo/worker,
+  sem broker externo.
+- Só faz sentido sob ASGI (config/asgi.py). Sob WSGI a view manda um evento
+  e um "retry:"; o EventSource reconecta e vira polling.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.beneficios.models import ItemEntrega
+
+
+INTERVALO_CONSULTA = 5      # s entre consultas de fallback ao banco
+INTERVALO_PING = 15         # s entre comentários de keep-alive
+RETRY_ASGI_MS = 3000
+RETRY_WSGI_MS = 10000
+TAMANHO_FILA = 200
+
+
+# =========================
+#  TRANSMISSOR EM PROCESSO
+# =========================
+
+class Transmissor:
+    """
+    Inscritos por lote: (event loop, asyncio.Queue). publicar() pode ser chamado
+    de qualquer thread (views síncronas); a entrega é agendada no loop do inscrito.
+    """
+
+    def __init__(self):
+        self._inscritos: dict[int, set] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def inscrever(self, lote_id: int) -> asyncio.Queue:
+        fila = asyncio.Queue(maxsize=TAMANHO_FILA)
+        with self._lock:
+            self._inscritos[lote_id].add((asyncio.get_running_loop(), fila))
+        return fila
+
+    def cancelar(self, lote_id: int, fila: asyncio.Queue) -> None:
+        with self._lock:
+            inscritos = self._inscritos.get(lote_id)
+            if not inscritos:
+                return
+            inscritos.difference_update({i for i in inscritos if i[1] is fila})
+            if not inscritos:
+                del self._inscritos[lote_id]
+
+    def inscritos(self, lote_id: int) -> int:
+        with self._lock:
+            return len(self._inscritos.get(lote_id, ()))
+
+    def publicar(self, lote_id: int, evento: dict) -> None:
+        with self._lock:
+            alvos = list(self._inscritos.get(lote_id, ()))
+        for loop, fila in alvos:
+            try:
+                loop.call_soon_threadsafe(self._entregar, fila, evento)
+            except RuntimeError:
+                # loop já encerrado: a conexão caiu e o finally do fluxo limpa
+                pass
+
+    @staticmethod
+    def _entregar(fila: asyncio.Queue, evento: dict) -> None:
+        try:
+            fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: a próxima consulta ao banco recupera o estado
+            pass
+
+
+transmissor = Transmissor()
+
+
+# =========================
+#  PUBLICAÇÃO (lado síncrono)
+# =========================
+
+def contadores_lote(lote_id: int) -> dict:
+    dados = ItemEntrega.objects.filter(lote_id=lote_id).aggregate(
+        total=Count("id"),
+        entregues=Count("id", filter=Q(entregue=True)),
+    )
+    dados["pendentes"] = dados["total"] - dados["entregues"]
+    return dados
+
+
+def notificar_itens(lote_id: int, itens) -> None:
+    """
+    itens: iterável de (item_id, entregue). Publica depois do commit
+    (nada é anunciado se a transação for desfeita). Sem inscritos neste
+    processo, não consulta nada.
+    """
+    itens = [{"id": item_id, "entregue": entregue} for item_id, entregue in itens]
+    if not itens:
+        return
+
+    def _publicar():
+        if not transmissor.inscritos(lote_id):
+            return
+        transmissor.publicar(lote_id, {"itens": itens, **contadores_lote(lote_id)})
+
+    transaction.on_commit(_publicar)
+
+
+# =========================
+#  FLUXO (lado assíncrono)
+# =========================
+
+def formatar_evento(dados: dict, *, id_evento: str = "", retry: int | None = None) -> str:
+    linhas = []
+    if retry is not None:
+        linhas.append(f"retry: {retry}")
+    if id_evento:
+        linhas.append(f"id: {id_evento}")
+    linhas.append("event: lote")
+    linhas.append("data: " + json.dumps(dados, cls=DjangoJSONEncoder, separators=(",", ":")))
+    return "\n".join(linhas) + "\n\n"
+
+
+def marca_inicial(last_event_id: str):
+    """Last-Event-ID (reconexão) ou agora."""
+    marca = parse_datetime(last_event_id or "")
+    return marca or timezone.now()
+
+
+async def contadores_lote_async(lote_id: int) -> dict:
+    dados = await ItemEntrega.objects.filter(lote_id=lote_id).aaggregate(
+        total=Count("id"),
+        entregues=Count("id", filter=Q(entregue=True)),
+    )
+    dados["pendentes"] = dados["total"] - dados["entregues"]
+    return dados
+
+
+async def alteracoes_desde(lote_id: int, marca):
+    """(itens alterados depois de `marca`, nova marca). Usa o índice de atualizado_em."""
+    qs = ItemEntrega.objects.filter(lote_id=lote_id, atualizado_em__gt=marca)
+    itens = [i async for i in qs.values("id", "entregue", "atualizado_em")]
+    if not itens:
+        return [], marca
+    nova = max(i["atualizado_em"] for i in itens)
+    return [{"id": i["id"], "entregue": i["entregue"]} for i in itens], nova
+
+
+async def evento_unico(lote_id: int, last_event_id: str) -> str:
+    """Resposta curta (WSGI): alterações desde a última conexão + contadores."""
+    marca = marca_inicial(last_event_id)
+    itens, marca = await alteracoes_desde(lote_id, marca)
+    dados = {"itens": itens, **await contadores_lote_async(lote_id)}
+    return formatar_evento(dados, id_evento=marca.isoformat(), retry=RETRY_WSGI_MS)
+
+
+async def fluxo_lote(lote_id: int, last_event_id: str = ""):
+    """Gerador assíncrono do text/event-stream de um lote."""
+    fila = transmissor.inscrever(lote_id)
+    try:
+        marca = marca_inicial(last_event_id)
+        itens, marca = await alteracoes_desde(lote_id, marca)
+        yield formatar_evento(
+            {"itens": itens, **await contadores_lote_async(lote_id)},
+            id_evento=marca.isoformat(),
+            retry=RETRY_ASGI_MS,
+        )
+
+        # Consulta ao banco em intervalo fixo, mesmo com eventos chegando,
+        # para não perder alterações feitas em outros processos. Itens já
+        # recebidos pelo transmissor podem vir de novo: o cliente só aplica estado.
+        loop = asyncio.get_running_loop()
+        proxima_consulta = loop.time() + INTERVALO_CONSULTA
+        ultimo_envio = loop.time()
+        while True:
+            try:
+                evento = await asyncio.wait_for(fila.get(), timeout=max(0, proxima_consulta - loop.time()))
+            except asyncio.TimeoutError:
+                proxima_consulta = loop.time() + INTERVALO_CONSULTA
+                itens, marca = await alteracoes_desde(lote_id, marca)
+                if itens:
+                    ultimo_envio = loop.time()
+                    yield formatar_evento(
+                        {"itens": itens, **await contadores_lote_async(lote_id)},
+                        id_evento=marca.isoformat(),
+                    )
+                elif loop.time() - ultimo_envio >= INTERVALO_PING:
+                    ultimo_envio = loop.time()
+                    yield ": ping\n\n"
+                continue
+
+            ultimo_envio = loop.time()
+            yield formatar_evento(evento, id_evento=marca.isoformat())
+    finally:
+        transmissor.cancelar(lote_id, fila)
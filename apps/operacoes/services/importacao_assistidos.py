@@ -0,0 +1,381 @@
+# apps/operacoes/services/importacao_assistidos.py
+from __future__ import annotations
+
+import csv
+import io
+import re
+import time
+import unicodedata
+import uuid
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.assistidos.models import (
+    Assistido,
+    cpf_valido,
+    normalizar_cep,
+    normalizar_cpf,
+    reservar_codigos,
+)
+from apps.assistidos.signals import limpar_cache_facetas
+from apps.operacoes.services.auditoria import registrar_evento
+
+
+TAMANHO_LOTE = 1000
+
+# Campos de texto livre aceitos na planilha (nome da coluna = nome do campo).
+CAMPOS_TEXTO = (
+    "nome", "telefone",
+    "logradouro", "numero", "complemento", "bairro", "cidade", "uf",
+    "motivo_inativacao",
+)
+
+# Campos com choices: aceita o valor ("NAO_INFORMADO") ou o rótulo ("Não informado").
+CAMPOS_CHOICES = (
+    "sit_trabalho", "responsavel_renda", "faixa_renda", "tipo_moradia",
+    "material_moradia", "area_risco", "sabe_ler_escrever", "escolaridade",
+    "diabetes", "pressao_alta", "medic_uso_continuo", "doenca_permanente",
+    "status",
+)
+
+CAMPOS_DATA = ("data_nascimento", "data_inicio_apoio")
+
+# Cabeçalhos alternativos (já normalizados) -> campo do model
+ALIASES = {
+    "nascimento": "data_nascimento",
+    "data_de_nascimento": "data_nascimento",
+    "ingresso": "data_inicio_apoio",
+    "ingresso_no_programa": "data_inicio_apoio",
+    "endereco": "logradouro",
+    "rua": "logradouro",
+    "n": "numero",
+    "no": "numero",
+    "fone": "telefone",
+    "celular": "telefone",
+}
+
+
+class ImportacaoErro(Exception):
+    """Erro que impede a leitura do arquivo inteiro (formato, dependência)."""
+
+
+# =========================
+# Helpers internos
+# =========================
+
+def _sem_acento(s: str) -> str:
+    s = unicodedata.normalize("NFKD", s or "")
+    return "".join(c for c in s if not unicodedata.combining(c))
+
+
+def _normalizar_cabecalho(s: str) -> str:
+    s = _sem_acento(str(s or "")).strip().lower()
+    s = "".join(c if c.isalnum() else "_" for c in s).strip("_")
+    while "__" in s:
+        s = s.replace("__", "_")
+    return ALIASES.get(s, s)
+
+
+def _mapa_choices():
+    """{campo: {valor_ou_rotulo_normalizado: valor}} para os campos com choices."""
+    mapa = {}
+    for nome in CAMPOS_CHOICES:
+        opcoes = {}
+        for valor, rotulo in Assistido._meta.get_field(nome).choices:
+            opcoes[_normalizar_cabecalho(valor)] = valor
+            opcoes[_normalizar_cabecalho(rotulo)] = valor
+        mapa[nome] = opcoes
+    return mapa
+
+
+def _parse_data(valor) -> Optional[date]:
+    """Aceita date/datetime (XLSX), 'DD/MM/AAAA' ou 'AAAA-MM-DD'."""
+    if valor in (None, ""):
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    s = str(valor).strip()
+    for formato in ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(s, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"data inválida: {s}")
+
+
+def _texto(valor) -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        # Planilhas costumam transformar CPF/CEP/telefone em número
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _ler_csv(arquivo) -> Iterator[dict]:
+    if isinstance(arquivo, (bytes, bytearray)):
+        arquivo = io.BytesIO(arquivo)
+    if not isinstance(arquivo, io.TextIOBase):
+        arquivo = io.TextIOWrapper(arquivo, encoding="utf-8-sig", errors="replace", newline="")
+
+    amostra = arquivo.read(4096)
+    arquivo.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=";,\t")
+    except csv.Error:
+        dialeto = csv.excel
+
+    leitor = csv.reader(arquivo, dialeto)
+    cabecalho = next(leitor, None)
+    if not cabecalho:
+        return
+    colunas = [_normalizar_cabecalho(c) for c in cabecalho]
+    for linha in leitor:
+        if not any((c or "").strip() for c in linha):
+            continue
+        yield dict(zip(colunas, linha))
+
+
+def _ler_xlsx(arquivo) -> Iterator[dict]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:  # dependência opcional
+        raise ImportacaoErro("Para importar arquivos XLSX instale o pacote 'openpyxl'.") from exc
+
+    planilha = load_workbook(arquivo, read_only=True, data_only=True).active
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = next(linhas, None)
+    if not cabecalho:
+        return
+    colunas = [_normalizar_cabecalho(c) for c in cabecalho]
+    for linha in linhas:
+        if not any(c not in (None, "") for c in linha):
+            continue
+        yield dict(zip(colunas, linha))
+
+
+def _em_lotes(iteravel: Iterable, tamanho: int) -> Iterator[list]:
+    lote = []
+    for item in iteravel:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+# =========================
+# API pública
+# =========================
+
+def ler_arquivo(arquivo, nome_arquivo: str) -> Iterator[dict]:
+    """
+    Lê o arquivo de forma incremental e devolve um dict por linha,
+    com as chaves já normalizadas para os nomes de campo do model.
+    """
+    nome = (nome_arquivo or "").lower()
+    if nome.endswith(".xlsx"):
+        return _ler_xlsx(arquivo)
+    if nome.endswith(".csv") or nome.endswith(".txt"):
+        return _ler_csv(arquivo)
+    raise ImportacaoErro("Formato não suportado. Envie um arquivo .csv ou .xlsx.")
+
+
+class ResultadoImportacao:
+    def __init__(self):
+        self.lidas = 0
+        self.criadas = 0
+        self.erros: list[dict] = []
+
+    @property
+    def rejeitadas(self) -> int:
+        return len(self.erros)
+
+    def adicionar_erro(self, linha: int, dados: dict, mensagem: str):
+        self.erros.append({
+            "linha": linha,
+            "nome": _texto(dados.get("nome")),
+            "cpf": _texto(dados.get("cpf")),
+            "erro": mensagem,
+        })
+
+
+@lru_cache(maxsize=1)
+def _limites_texto() -> dict[str, int]:
+    """max_length de cada campo de texto (nome fica de fora: é truncado)."""
+    return {
+        c: Assistido._meta.get_field(c).max_length
+        for c in CAMPOS_TEXTO
+        if c != "nome" and Assistido._meta.get_field(c).max_length
+    }
+
+
+def _montar_assistido(dados: dict, choices: dict) -> Assistido:
+    """Valida uma linha e devolve o Assistido (ainda não gravado). Levanta ValueError."""
+    nome = _texto(dados.get("nome"))
+    if not nome:
+        raise ValueError("nome obrigatório")
+
+    campos = {c: _texto(dados.get(c)) for c in CAMPOS_TEXTO if c in dados}
+    campos["nome"] = nome[:120]
+
+    cpf = normalizar_cpf(_texto(dados.get("cpf")))
+    if cpf and len(cpf) < 11:
+        cpf = cpf.zfill(11)  # zeros à esquerda perdidos na planilha
+    if cpf and not cpf_valido(cpf):
+        raise ValueError("CPF inválido")
+    campos["cpf"] = cpf or None
+
+    cep = normalizar_cep(_texto(dados.get("cep")))
+    if cep and len(cep) < 8:
+        cep = cep.zfill(8)
+    if cep and len(cep) != 8:
+        raise ValueError("CEP deve conter 8 dígitos")
+    campos["cep"] = cep
+
+    if campos.get("uf"):
+        campos["uf"] = campos["uf"].upper()[:2]
+    if "telefone" in campos:
+        campos["telefone"] = "".join(c for c in campos["telefone"] if c.isdigit())
+
+    for nome_campo, limite in _limites_texto().items():
+        valor = campos.get(nome_campo) or ""
+        if len(valor) > limite:
+            raise ValueError(f"{nome_campo} com mais de {limite} caracteres")
+
+    for nome_campo in CAMPOS_DATA:
+        if nome_campo in dados:
+            campos[nome_campo] = _parse_data(dados.get(nome_campo))
+
+    for nome_campo in CAMPOS_CHOICES:
+        bruto = _texto(dados.get(nome_campo))
+        if not bruto:
+            continue
+        valor = choices[nome_campo].get(_normalizar_cabecalho(bruto))
+        if valor is None:
+            raise ValueError(f"valor inválido para {nome_campo}: {bruto}")
+        campos[nome_campo] = valor
+
+    assistido = Assistido(**campos)
+    assistido.normalizar_campos()
+    return assistido
+
+
+def importar_assistidos(
+    linhas: Iterable[dict], *, tamanho_lote: int = TAMANHO_LOTE, usuario=None
+) -> ResultadoImportacao:
+    """
+    Importa assistidos em lotes:
+      1) valida CPF/CEP/choices de cada linha em memória;
+      2) confere CPFs já cadastrados com UMA consulta por lote;
+      3) reserva os códigos do lote de uma vez no contador diário;
+      4) grava com bulk_create (uma transação por lote).
+
+    Linhas com problema não interrompem a importação: vão para `resultado.erros`.
+    No fim, um evento de auditoria com os assistidos criados.
+    """
+    resultado = ResultadoImportacao()
+    criados: list[uuid.UUID] = []
+    choices = _mapa_choices()
+    cpfs_vistos: set[str] = set()
+
+    numeradas = enumerate(linhas, start=2)  # linha 1 = cabeçalho
+    for lote in _em_lotes(numeradas, tamanho_lote):
+        validos: list[tuple[int, dict, Assistido]] = []
+
+        for numero, dados in lote:
+            resultado.lidas += 1
+            try:
+                assistido = _montar_assistido(dados, choices)
+            except ValueError as exc:
+                resultado.adicionar_erro(numero, dados, str(exc))
+                continue
+
+            if assistido.cpf:
+                if assistido.cpf in cpfs_vistos:
+                    resultado.adicionar_erro(numero, dados, "CPF repetido no arquivo")
+                    continue
+                cpfs_vistos.add(assistido.cpf)
+            validos.append((numero, dados, assistido))
+
+        cpfs = [a.cpf for _, _, a in validos if a.cpf]
+        existentes = set(
+            Assistido.objects.filter(cpf__in=cpfs).values_list("cpf", flat=True)
+        ) if cpfs else set()
+
+        novos = []
+        for numero, dados, assistido in validos:
+            if assistido.cpf in existentes:
+                resultado.adicionar_erro(numero, dados, "CPF já cadastrado")
+                continue
+            novos.append(assistido)
+
+        if not novos:
+            continue
+
+        with transaction.atomic():
+            for assistido, codigo in zip(novos, reservar_codigos(len(novos))):
+                assistido.codigo = codigo
+            Assistido.objects.bulk_create(novos, batch_size=tamanho_lote)
+        resultado.criadas += len(novos)
+        criados.extend(a.pk for a in novos if a.pk is not None)
+
+    if resultado.criadas:
+        limpar_cache_facetas()  # bulk_create não dispara post_save
+        registrar_evento(
+            "IMPORTAR_ASSISTIDOS",
+            usuario=usuario,
+            resumo=f"{resultado.criadas} assistidos importados ({resultado.rejeitadas} linhas rejeitadas)",
+            quantidade=resultado.criadas,
+            ids=criados,
+            lidas=resultado.lidas,
+            rejeitadas=resultado.rejeitadas,
+        )
+    return resultado
+
+
+def pasta_relatorios() -> Path:
+    return Path(settings.TAREFAS_DIR) / "importacao"
+
+
+def salvar_relatorio_erros(erros: list[dict]) -> str:
+    """
+    Grava o relatório em disco (junto dos arquivos de tarefas) e devolve o
+    nome, que é o que vai para a sessão. Relatórios mais velhos que a
+    retenção das tarefas são apagados aqui.
+    """
+    pasta = pasta_relatorios()
+    pasta.mkdir(parents=True, exist_ok=True)
+    limite = time.time() - settings.TAREFAS_RETENCAO_DIAS * 86400
+    for antigo in pasta.glob("*.csv"):
+        if antigo.stat().st_mtime < limite:
+            antigo.unlink(missing_ok=True)
+
+    nome = f"{uuid.uuid4().hex}.csv"
+    (pasta / nome).write_text(relatorio_erros_csv(erros), encoding="utf-8-sig")  # BOM: Excel
+    return nome
+
+
+def caminho_relatorio_erros(nome: str) -> Path | None:
+    """Caminho do relatório pelo nome guardado na sessão (só nomes gerados aqui)."""
+    if not re.fullmatch(r"[0-9a-f]{32}\.csv", nome or ""):
+        return None
+    caminho = pasta_relatorios() / nome
+    return caminho if caminho.is_file() else None
+
+
+def relatorio_erros_csv(erros: list[dict]) -> str:
+    """Relatório de linhas rejeitadas (CSV com ';', abre direto no Excel)."""
+    saida = io.StringIO()
+    escritor = csv.DictWriter(saida, fieldnames=["linha", "nome", "cpf", "erro"], delimiter=";")
+    escritor.writeheader()
+    escritor.writerows(erros)
+    return saida.getvalue()
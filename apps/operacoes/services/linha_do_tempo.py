@@ -0,0 +1,132 @@
+# apps/operacoes/services/linha_do_tempo.py
+"""
+Linha do tempo do assistido: ciclos de atribuição + entregas, com totais
+por atribuição (recebidas, faltas, última entrega).
+
+- Duas consultas: atribuições (com o benefício) + todas as entregas delas
+  (Prefetch sobre ItemEntregaHistorico: inclui lotes arquivados).
+  Totais e a junção em ordem de data saem em Python, sem N+1.
+- Cache por assistido. A chave leva uma "impressão" barata (uma consulta
+  agregada: quantidades e maior atualizado_em de atribuições, itens e
+  lotes): qualquer alteração gera outra chave, sem precisar apagar nada.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Prefetch
+from django.utils import timezone
+
+from apps.beneficios.models import BeneficioAssistido, ItemEntregaHistorico
+
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass
+class ResumoAtribuicao:
+    id: int
+    beneficio: str
+    data_inicio: date
+    data_termino: date | None
+    ativo: bool
+    recebidas: int = 0
+    faltas: int = 0
+    agendadas: int = 0
+    ultima_entrega: date | None = None
+
+
+@dataclass
+class Evento:
+    data: date
+    tipo: str          # INICIO, TERMINO, RECEBEU, FALTOU, AGENDADA
+    beneficio: str
+    lote_id: int | None = None
+
+
+@dataclass
+class LinhaDoTempo:
+    atribuicoes: list[ResumoAtribuicao] = field(default_factory=list)
+    eventos: list[Evento] = field(default_factory=list)
+
+
+# =========================
+#  CACHE
+# =========================
+
+def impressao(assistido) -> str:
+    dados = BeneficioAssistido.objects.filter(assistido=assistido).aggregate(
+        atribuicoes=Count("id", distinct=True),
+        atribuicoes_alt=Max("atualizado_em"),
+        itens=Count("historico_entregas"),
+        itens_alt=Max("historico_entregas__atualizado_em"),
+        lotes_alt=Max("historico_entregas__lote__atualizado_em"),
+    )
+    # O dia entra na chave: "agendada" vira "faltou" quando a data passa
+    partes = [str(timezone.localdate()), str(assistido.atualizado_em)] + [str(dados[c]) for c in sorted(dados)]
+    return hashlib.md5("|".join(partes).encode()).hexdigest()
+
+
+def chave_cache(assistido) -> str:
+    return f"assistidos:linha_do_tempo:{assistido.pk}:{impressao(assistido)}"
+
+
+def linha_do_tempo(assistido) -> LinhaDoTempo:
+    """Versão em cache de montar_linha_do_tempo()."""
+    chave = chave_cache(assistido)
+    linha = cache.get(chave)
+    if linha is None:
+        linha = montar_linha_do_tempo(assistido)
+        cache.set(chave, linha, CACHE_TIMEOUT)
+    return linha
+
+
+# =========================
+#  MONTAGEM
+# =========================
+
+def montar_linha_do_tempo(assistido, hoje: date | None = None) -> LinhaDoTempo:
+    hoje = hoje or timezone.localdate()
+    atribuicoes = (
+        BeneficioAssistido.objects
+        .filter(assistido=assistido)
+        .select_related("beneficio")
+        .prefetch_related(
+            Prefetch(
+                "historico_entregas",
+                queryset=ItemEntregaHistorico.objects.select_related("lote").order_by("lote__data_entrega"),
+                to_attr="itens",
+            )
+        )
+        .order_by("data_inicio", "id")
+    )
+
+    linha = LinhaDoTempo()
+    for atrib in atribuicoes:
+        nome = atrib.beneficio.nome
+        resumo = ResumoAtribuicao(atrib.id, nome, atrib.data_inicio, atrib.data_termino, atrib.ativo)
+        linha.eventos.append(Evento(atrib.data_inicio, "INICIO", nome))
+        if atrib.data_termino:
+            linha.eventos.append(Evento(atrib.data_termino, "TERMINO", nome))
+
+        for item in atrib.itens:
+            data = item.lote.data_entrega
+            if item.entregue:
+                resumo.recebidas += 1
+                resumo.ultima_entrega = data  # itens em ordem de data
+                tipo = "RECEBEU"
+            elif data < hoje:
+                resumo.faltas += 1
+                tipo = "FALTOU"
+            else:
+                resumo.agendadas += 1
+                tipo = "AGENDADA"
+            linha.eventos.append(Evento(data, tipo, nome, item.lote_id))
+
+        linha.atribuicoes.append(resumo)
+
+    linha.eventos.sort(key=lambda e: e.data, reverse=True)
+    return linha
@@ -0,0 +1,31 @@
+# apps/operacoes/services/lotes.py
+"""
+Geração dos itens de um lote de entrega.
+
+Um item por atribuição elegível na data do lote (services/elegibilidade.py:
+vigente na data e assistido ATIVO). O filtro vai para o banco (antes: loop em Python sobre todas as
+atribuições) e a inserção é em blocos, com progresso para a tarefa em
+segundo plano.
+"""
+from __future__ import annotations
+
+from apps.beneficios.models import ItemEntrega
+from apps.operacoes.services.elegibilidade import elegiveis_qs
+
+
+TAMANHO_BLOCO = 1000
+
+
+def gerar_itens_lote(lote, progresso=None) -> int:
+    """Cria os itens que faltam (ignore_conflicts: pode ser repetido). Retorna quantos foram enviados."""
+    atribuicoes = list(elegiveis_qs(lote.beneficio, lote.data_entrega).values_list("id", flat=True))
+    total = len(atribuicoes)
+    for inicio in range(0, total, TAMANHO_BLOCO):
+        bloco = atribuicoes[inicio:inicio + TAMANHO_BLOCO]
+        ItemEntrega.objects.bulk_create(
+            [ItemEntrega(lote=lote, atribuicao_id=a) for a in bloco],
+            ignore_conflicts=True,
+        )
+        if progresso:
+            progresso(inicio + len(bloco), total, f"{inicio + len(bloco)} de {total} itens")
+    return total
@@ -0,0 +1,223 @@
+# apps/operacoes/services/pdf.py
+"""
+PDF no servidor, em lote: fichas preenchidas e listas de chamada.
+
+- O HTML sai dos mesmos templates da impressão pelo navegador.
+- HTML -> PDF (WeasyPrint) roda num pool de processos: é a etapa cara.
+- Cada documento (uma ficha, uma chamada) vira um PDF em cache no disco,
+  chaveado pelo carimbo de alteração do registro + versão dos templates.
+  Reimprimir fichas que não mudaram só junta arquivos prontos.
+- Junção final num único PDF com pypdf.
+
+Dependências opcionais: weasyprint e pypdf.
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.db.models import Count, Max
+from django.template.loader import get_template, render_to_string
+
+from apps.operacoes.services.arquivo_entregas import modelo_itens
+from apps.operacoes.services.ceps import versao_tabela
+from apps.operacoes.services.rotas import itens_em_rota
+
+
+TEMPLATES_FICHA = ("impressos/ficha_inscricao_assistido.html", "impressos/_ficha_paginas.html")
+TEMPLATES_CHAMADA = ("operacoes/consultas/entregas_lote_chamada_print.html",)
+
+
+class PdfIndisponivel(Exception):
+    pass
+
+
+@lru_cache(maxsize=1)
+def pdf_disponivel() -> bool:
+    """
+    Pacotes instalados E carregáveis: o weasyprint instalado pelo pip sem as
+    bibliotecas do sistema (pango) só falha no import (OSError).
+    """
+    if not all(importlib.util.find_spec(m) is not None for m in ("weasyprint", "pypdf")):
+        return False
+    try:
+        import weasyprint  # noqa: F401
+    except OSError:
+        return False
+    return True
+
+
+def _exigir_dependencias():
+    if not pdf_disponivel():  # dependência opcional
+        raise PdfIndisponivel("Para gerar PDF no servidor instale os pacotes 'weasyprint' e 'pypdf'.")
+
+
+@dataclass
+class Documento:
+    chave: str                 # "ficha/<uuid>", "chamada/<lote_id>"
+    carimbo: str               # muda sempre que o conteúdo impresso muda
+    html: Callable[[], str]    # só chamado quando não está em cache
+
+
+# =========================
+#  CACHE EM DISCO
+# =========================
+
+@lru_cache(maxsize=None)
+def versao_templates(nomes: tuple[str, ...]) -> str:
+    """Hash do código-fonte dos templates: editar o layout invalida o cache."""
+    h = hashlib.md5()
+    for nome in nomes:
+        h.update(Path(get_template(nome).origin.name).read_bytes())
+    return h.hexdigest()[:12]
+
+
+def caminho_cache(doc: Documento, versao: str) -> Path:
+    sufixo = hashlib.md5(f"{doc.carimbo}|{versao}".encode()).hexdigest()[:16]
+    return Path(settings.PDF_CACHE_DIR) / f"{doc.chave}-{sufixo}.pdf"
+
+
+def _remover_versoes_antigas(doc: Documento, atual: Path) -> None:
+    for antigo in atual.parent.glob(f"{Path(doc.chave).name}-*.pdf"):
+        if antigo != atual:
+            antigo.unlink(missing_ok=True)
+
+
+# =========================
+#  CONVERSÃO (pool de processos)
+# =========================
+
+def _converter(html: str, destino: str) -> str:
+    """Executa no processo do pool: não usa Django nem banco."""
+    from weasyprint import HTML
+
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    HTML(string=html).write_pdf(temporario)
+    os.replace(temporario, destino)  # leitor nunca vê arquivo pela metade
+    return destino
+
+
+def gerar_pdf(
+    documentos: Iterable[Documento],
+    destino: Path,
+    *,
+    versao: str,
+    progresso=None,
+    processos: int | None = None,
+) -> dict:
+    """Gera (ou reaproveita do cache) cada documento e junta tudo em `destino`."""
+    _exigir_dependencias()
+    import weasyprint  # noqa: F401  (carregado antes do fork: os processos herdam)
+    from pypdf import PdfWriter
+
+    documentos = list(documentos)
+    caminhos = [caminho_cache(doc, versao) for doc in documentos]
+    faltando = [(doc, cam) for doc, cam in zip(documentos, caminhos) if not cam.exists()]
+    total = len(faltando)
+
+    processos = processos or settings.PDF_PROCESSOS
+    # HTML é renderizado aqui (precisa do ORM) e enviado aos poucos: no máximo
+    # algumas páginas por processo em memória de cada vez.
+    limite = processos * 4
+    feitos = 0
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        pendentes = set()
+        for doc, cam in faltando:
+            cam.parent.mkdir(parents=True, exist_ok=True)
+            pendentes.add(pool.submit(_converter, doc.html(), str(cam)))
+            if len(pendentes) >= limite:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for f in prontos:
+                    f.result()
+                feitos += len(prontos)
+                if progresso:
+                    progresso(feitos * 90 // total, mensagem=f"{feitos} de {total} páginas novas")
+        for f in pendentes:
+            f.result()
+
+    for doc, cam in faltando:
+        _remover_versoes_antigas(doc, cam)
+
+    if progresso:
+        progresso(92, mensagem="Juntando o PDF…")
+    escritor = PdfWriter()
+    for cam in caminhos:
+        escritor.append(str(cam))
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    with open(destino, "wb") as arquivo:
+        escritor.write(arquivo)
+
+    return {"documentos": len(caminhos), "gerados": total, "em_cache": len(caminhos) - total}
+
+
+# =========================
+#  DOCUMENTOS
+# =========================
+
+def _logo_src() -> str:
+    caminho = finders.find("img/logo.png")
+    return Path(caminho).as_uri() if caminho else ""
+
+
+def documentos_fichas(assistidos) -> list[Documento]:
+    logo = _logo_src()
+
+    def _html(a):
+        return lambda: render_to_string(
+            "impressos/ficha_inscricao_assistido.html",
+            {"assistidos": [a], "pdf": True, "logo_src": logo},
+        )
+
+    # A ficha imprime a idade: muda no aniversário sem o cadastro mudar
+    return [Documento(f"ficha/{a.pk}", f"{a.atualizado_em.isoformat()}|{a.idade}", _html(a)) for a in assistidos]
+
+
+def documentos_chamadas(lotes, *, rota: bool = False) -> list[Documento]:
+    """
+    Carimbo da chamada: lote + itens (inclusões, exclusões, marcações) + dados
+    dos assistidos impressos (nome, telefone, nascimento, código).
+    Com `rota`, itens na ordem de entrega em casa (services/rotas.py).
+    """
+    lotes = list(
+        lotes.select_related("beneficio").annotate(
+            _itens=Count("itens"),
+            _itens_alt=Max("itens__atualizado_em"),
+            _assistidos_alt=Max("itens__atribuicao__assistido__atualizado_em"),
+        )
+    )
+
+    def _html(lote):
+        def render():
+            if rota:
+                itens = itens_em_rota(lote)
+            else:
+                itens = list(
+                    modelo_itens(lote).objects
+                    .select_related("atribuicao__assistido")
+                    .filter(lote_id=lote.pk)
+                    .order_by("atribuicao__assistido__nome")
+                )
+            return render_to_string(
+                "operacoes/consultas/entregas_lote_chamada_print.html",
+                {"lote": lote, "itens": itens, "total": len(itens), "rota": rota, "pdf": True},
+            )
+
+        return render
+
+    return [
+        Documento(
+            f"{'rota' if rota else 'chamada'}/{l.pk}",
+            f"{l.atualizado_em.isoformat()}|{l._itens}|{l._itens_alt}|{l._assistidos_alt}"
+            + (f"|{versao_tabela()}|{settings.ROTA_ENTREGAS_ORIGEM}" if rota else ""),
+            _html(l),
+        )
+        for l in lotes
+    ]
@@ -0,0 +1,230 @@
+# apps/operacoes/services/rotas.py
+"""
+Ordem de rota da chamada, para as entregas em casa (?ordem=rota).
+
+- Ponto de cada item: centro do CEP do assistido na tabela local
+  (assistidos.Cep); CEP sem coordenada usa a média dos CEPs do mesmo
+  prefixo de 5 dígitos (setor).
+- Grupos por bairro (sem bairro: prefixo do CEP). Os grupos seguem o
+  vizinho mais próximo entre os seus centros, a partir de
+  settings.ROTA_ENTREGAS_ORIGEM; dentro do grupo, o mesmo entre os
+  endereços, com empate (mesmo CEP) por logradouro e número.
+- Sem ponto: item vai ao fim do grupo, grupo vai ao fim da lista.
+- Resultado (ordem dos itens + grupo) calculado uma vez e guardado em
+  cache por lote. A chave leva uma impressão dos itens (quantidade e maior
+  id: inclusões e exclusões), dos endereços dos assistidos e a versão da
+  tabela de CEPs. Marcar entregue não muda a rota nem a chave.
+- Lote arquivado (LoteEntregaHistorico) lê os itens do arquivo.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import Substr
+
+from apps.assistidos.models import Cep, normalizar_busca, normalizar_cep
+from apps.operacoes.services.arquivo_entregas import modelo_itens
+from apps.operacoes.services.ceps import faixa_cep, versao_tabela
+
+
+CACHE_TIMEOUT = 60 * 60 * 24
+SETORES_POR_CONSULTA = 200
+SEM_ENDERECO = "Sem endereço"
+
+Ponto = tuple[float, float]
+
+
+@dataclass
+class Parada:
+    item_id: int
+    grupo: str
+    nome: str
+    cep: str
+    logradouro: str
+    numero: str
+    ponto: Ponto | None = None
+
+    def chave(self):
+        """Desempate: logradouro, número (numérico quando possível), nome."""
+        digitos = re.match(r"\d+", self.numero or "")
+        return (normalizar_busca(self.logradouro), int(digitos.group()) if digitos else math.inf, self.nome)
+
+
+# =========================
+#  GEOMETRIA
+# =========================
+
+def distancia(a: Ponto, b: Ponto) -> float:
+    """Aproximação equirretangular em km: suficiente para comparar trechos urbanos."""
+    lat = math.radians((a[0] + b[0]) / 2)
+    dx = math.radians(b[1] - a[1]) * math.cos(lat)
+    dy = math.radians(b[0] - a[0])
+    return 6371 * math.hypot(dx, dy)
+
+
+def centro(pontos: list[Ponto]) -> Ponto | None:
+    if not pontos:
+        return None
+    return sum(p[0] for p in pontos) / len(pontos), sum(p[1] for p in pontos) / len(pontos)
+
+
+def vizinho_mais_proximo(elementos: list, ponto_de, inicio: Ponto | None) -> list:
+    """
+    Caminho guloso: do ponto atual para o elemento mais perto ainda não
+    visitado. O(n²), ok para os tamanhos de lote. Empates ficam na ordem
+    de entrada (min() devolve o primeiro).
+    """
+    restantes = list(elementos)
+    ordem = []
+    atual = inicio
+    while restantes:
+        proximo = restantes[0] if atual is None else min(restantes, key=lambda e: distancia(atual, ponto_de(e)))
+        restantes.remove(proximo)
+        ordem.append(proximo)
+        atual = ponto_de(proximo)
+    return ordem
+
+
+def origem() -> Ponto | None:
+    try:
+        lat, lon = (float(v) for v in settings.ROTA_ENTREGAS_ORIGEM.split(","))
+    except ValueError:
+        return None
+    return lat, lon
+
+
+# =========================
+#  PONTOS (tabela de CEPs)
+# =========================
+
+def pontos_por_cep(ceps: set[str]) -> dict[str, Ponto]:
+    """Centro de cada CEP; sem coordenada própria, o centro do setor (5 dígitos)."""
+    com_coordenada = Cep.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    pontos = {
+        c: (lat, lon)
+        for c, lat, lon in com_coordenada.filter(cep__in=ceps).values_list("cep", "latitude", "longitude")
+    }
+
+    setores = sorted({c[:5] for c in ceps if c not in pontos and len(c) == 8})
+    por_setor = {}
+    for inicio in range(0, len(setores), SETORES_POR_CONSULTA):
+        faixas = Q()
+        for setor in setores[inicio:inicio + SETORES_POR_CONSULTA]:
+            menor, maior = faixa_cep(setor)
+            faixas |= Q(cep__gte=menor, cep__lte=maior)
+        medias = (
+            com_coordenada.filter(faixas)
+            .annotate(setor=Substr("cep", 1, 5))
+            .values("setor")
+            .annotate(lat=Avg("latitude"), lon=Avg("longitude"))
+        )
+        por_setor.update({m["setor"]: (m["lat"], m["lon"]) for m in medias})
+
+    for c in ceps:
+        if c not in pontos and c[:5] in por_setor:
+            pontos[c] = por_setor[c[:5]]
+    return pontos
+
+
+# =========================
+#  ROTA
+# =========================
+
+def _grupo(bairro: str, cep: str) -> str:
+    if bairro.strip():
+        return bairro.strip()
+    if len(cep) == 8:
+        return f"CEP {cep[:5]}-xxx"
+    return SEM_ENDERECO
+
+
+def _itens(lote):
+    return modelo_itens(lote).objects.filter(lote_id=lote.pk)
+
+
+def montar_rota(lote) -> list[tuple[int, str]]:
+    """[(item_id, grupo)] na ordem de visita."""
+    linhas = _itens(lote).values_list(
+        "id",
+        "atribuicao__assistido__nome",
+        "atribuicao__assistido__cep",
+        "atribuicao__assistido__bairro",
+        "atribuicao__assistido__logradouro",
+        "atribuicao__assistido__numero",
+    )
+    paradas = []
+    for item_id, nome, cep, bairro, logradouro, numero in linhas:
+        cep = normalizar_cep(cep)
+        paradas.append(Parada(item_id, _grupo(bairro or "", cep), nome, cep, logradouro or "", numero or ""))
+
+    pontos = pontos_por_cep({p.cep for p in paradas if p.cep})
+    grupos: dict[str, list[Parada]] = {}
+    nomes: dict[str, str] = {}
+    for p in sorted(paradas, key=Parada.chave):
+        p.ponto = pontos.get(p.cep)
+        chave = normalizar_busca(p.grupo)  # "Centro" e "centro" juntos
+        grupos.setdefault(chave, []).append(p)
+        nomes.setdefault(chave, p.grupo)
+
+    centros = {g: centro([p.ponto for p in ps if p.ponto]) for g, ps in grupos.items()}
+    com_centro = sorted((g for g in grupos if centros[g]), key=lambda g: nomes[g])
+    sem_centro = sorted((g for g in grupos if not centros[g]), key=lambda g: (nomes[g] == SEM_ENDERECO, nomes[g]))
+
+    inicio = origem()
+    if inicio is None and com_centro:
+        # Sem sede configurada: começa pela ponta (bairro mais longe do meio)
+        meio = centro([centros[g] for g in com_centro])
+        inicio = centros[max(com_centro, key=lambda g: distancia(meio, centros[g]))]
+
+    rota = []
+    atual = inicio
+    for g in vizinho_mais_proximo(com_centro, centros.get, inicio):
+        localizadas = [p for p in grupos[g] if p.ponto]
+        ordem = vizinho_mais_proximo(localizadas, lambda p: p.ponto, atual)
+        if ordem:
+            atual = ordem[-1].ponto  # próximo bairro parte do último endereço deste
+        ordem += [p for p in grupos[g] if not p.ponto]
+        rota += [(p.item_id, nomes[g]) for p in ordem]
+    for g in sem_centro:
+        rota += [(p.item_id, nomes[g]) for p in grupos[g]]
+    return rota
+
+
+def impressao(lote) -> str:
+    # Sem o atualizado_em dos itens: a marcação de entrega o altera e não mexe na rota
+    dados = _itens(lote).aggregate(
+        itens=Count("id"),
+        maior_id=Max("id"),
+        assistidos_alt=Max("atribuicao__assistido__atualizado_em"),
+    )
+    partes = [str(dados[c]) for c in sorted(dados)] + [versao_tabela(), settings.ROTA_ENTREGAS_ORIGEM]
+    return hashlib.md5("|".join(partes).encode()).hexdigest()
+
+
+def rota_do_lote(lote) -> list[tuple[int, str]]:
+    """Versão em cache de montar_rota()."""
+    chave = f"entregas:rota:{lote.pk}:{impressao(lote)}"
+    rota = cache.get(chave)
+    if rota is None:
+        rota = montar_rota(lote)
+        cache.set(chave, rota, CACHE_TIMEOUT)
+    return rota
+
+
+def itens_em_rota(lote) -> list:
+    """Itens do lote (com assistido) na ordem da rota; cada um com `.grupo`."""
+    rota = rota_do_lote(lote)
+    por_id = _itens(lote).select_related("atribuicao__assistido").in_bulk([i for i, _ in rota])
+    itens = []
+    for item_id, grupo in rota:
+        item = por_id.get(item_id)
+        if item is not None:
+            item.grupo = grupo
+            itens.append(item)
+    return itens
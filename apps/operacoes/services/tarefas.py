@@ -0,0 +1,272 @@
+# apps/operacoes/services/tarefas.py
+"""
+Fila de tarefas em segundo plano, no próprio banco (sem broker).
+
+- @registrar("tipo"): associa uma função ao tipo. A função recebe um Contexto
+  (parametros, usuario, progresso(), salvar_arquivo()) — ver apps/operacoes/tarefas.py.
+- enfileirar(): cria a Tarefa. Com settings.TAREFAS_SEGUNDO_PLANO desligado
+  executa na hora, dentro da requisição (comportamento antigo).
+- reservar_proxima(): usada pelo run_workers. select_for_update(skip_locked)
+  no Postgres + UPDATE condicional (status = PENDENTE): dois workers nunca
+  pegam a mesma tarefa, também no SQLite (onde o FOR UPDATE é ignorado).
+- recuperar_abandonadas(): worker morto no meio deixa a tarefa EXECUTANDO
+  sem sinal de vida; volta para a fila (ou ERRO depois de MAX_TENTATIVAS).
+  O sinal de vida (atualizado_em) é gravado por uma thread enquanto o
+  handler roda, mesmo que ele nunca chame progresso() (PDF grande).
+"""
+from __future__ import annotations
+
+import logging
+import shutil
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from apps.operacoes.models import StatusTarefa, Tarefa
+
+
+logger = logging.getLogger(__name__)
+
+MAX_TENTATIVAS = 3
+INTERVALO_PROGRESSO = 1.0   # s mínimos entre gravações de progresso
+SEM_SINAL_DE_VIDA = timedelta(minutes=15)
+INTERVALO_SINAL_DE_VIDA = 60  # s; bem abaixo de SEM_SINAL_DE_VIDA
+
+HANDLERS: dict[str, callable] = {}
+
+
+class TipoDesconhecido(Exception):
+    pass
+
+
+def registrar(tipo: str):
+    def decorator(funcao):
+        HANDLERS[tipo] = funcao
+        return funcao
+
+    return decorator
+
+
+# =========================
+#  CONTEXTO DO HANDLER
+# =========================
+
+def pasta_tarefa(tarefa_id) -> Path:
+    return Path(settings.TAREFAS_DIR) / str(tarefa_id)
+
+
+def caminho_resultado(tarefa: Tarefa) -> Path | None:
+    if not tarefa.arquivo:
+        return None
+    caminho = (Path(settings.TAREFAS_DIR) / tarefa.arquivo).resolve()
+    # Só dentro de TAREFAS_DIR
+    if Path(settings.TAREFAS_DIR).resolve() not in caminho.parents:
+        return None
+    return caminho
+
+
+class Contexto:
+    def __init__(self, tarefa: Tarefa):
+        self.tarefa = tarefa
+        self.parametros = tarefa.parametros or {}
+        self._ultimo_progresso = 0.0
+
+    @property
+    def usuario(self):
+        if not hasattr(self, "_usuario"):
+            User = get_user_model()
+            self._usuario = User.objects.filter(pk=self.tarefa.criado_por_id).first()
+        return self._usuario
+
+    def progresso(self, feito: int, total: int | None = None, mensagem: str = "") -> None:
+        """Percentual (feito/total) ou direto 0..100. Grava no máximo 1x por segundo."""
+        pct = int(feito * 100 / total) if total else int(feito)
+        pct = max(0, min(99, pct))
+        agora = time.monotonic()
+        if agora - self._ultimo_progresso < INTERVALO_PROGRESSO and pct < 99:
+            return
+        self._ultimo_progresso = agora
+        self.tarefa.progresso = pct
+        if mensagem:
+            self.tarefa.mensagem = mensagem[:200]
+        # Também serve de "sinal de vida" (atualizado_em) para recuperar_abandonadas
+        Tarefa.objects.filter(pk=self.tarefa.pk).update(
+            progresso=pct, mensagem=self.tarefa.mensagem, atualizado_em=timezone.now()
+        )
+
+    def caminho_arquivo(self, nome: str) -> Path:
+        """Caminho para o handler escrever o resultado direto em disco (arquivos grandes)."""
+        nome = get_valid_filename(nome)
+        pasta = pasta_tarefa(self.tarefa.pk)
+        pasta.mkdir(parents=True, exist_ok=True)
+        self.tarefa.arquivo = f"{self.tarefa.pk}/{nome}"
+        self.tarefa.nome_arquivo = nome
+        return pasta / nome
+
+    def salvar_arquivo(self, nome: str, conteudo: bytes | str, content_type: str) -> None:
+        caminho = self.caminho_arquivo(nome)
+        if isinstance(conteudo, str):
+            conteudo = conteudo.encode("utf-8")
+        caminho.write_bytes(conteudo)
+        self.tarefa.content_type = content_type
+
+    def redirecionar(self, url: str) -> None:
+        """Tela para onde o usuário vai quando a tarefa termina (sem arquivo)."""
+        self.tarefa.redirecionar_para = url
+
+
+class SinalDeVida(threading.Thread):
+    """
+    Enquanto o handler roda, grava atualizado_em da tarefa a cada
+    `intervalo` segundos (conexão própria da thread). Só toca a tarefa
+    se ela continua EXECUTANDO com este worker.
+    """
+
+    def __init__(self, tarefa: Tarefa, intervalo: float = INTERVALO_SINAL_DE_VIDA):
+        super().__init__(name=f"sinal-de-vida-{tarefa.pk}", daemon=True)
+        self.tarefa_id = tarefa.pk
+        self.worker = tarefa.worker
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+
+    def run(self):
+        try:
+            while not self._parar.wait(self.intervalo):
+                try:
+                    Tarefa.objects.filter(
+                        pk=self.tarefa_id, status=StatusTarefa.EXECUTANDO, worker=self.worker
+                    ).update(atualizado_em=timezone.now())
+                except Exception:
+                    # Banco ocupado (SQLite) ou fora do ar: tenta de novo no próximo intervalo
+                    logger.warning("Sinal de vida da tarefa %s não gravado", self.tarefa_id, exc_info=True)
+        finally:
+            connections.close_all()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self.join()
+
+
+# =========================
+#  FILA
+# =========================
+
+def enfileirar(tipo: str, parametros: dict | None = None, *, usuario=None) -> Tarefa:
+    if tipo not in HANDLERS:
+        raise TipoDesconhecido(tipo)
+    tarefa = Tarefa.objects.create(
+        tipo=tipo,
+        parametros=parametros or {},
+        criado_por=usuario if usuario is not None and usuario.is_authenticated else None,
+    )
+    if not settings.TAREFAS_SEGUNDO_PLANO and _reservar(tarefa.pk, "inline"):
+        tarefa.refresh_from_db()
+        executar(tarefa)
+    return tarefa
+
+
+def _reservar(tarefa_id, worker: str) -> bool:
+    agora = timezone.now()
+    return bool(
+        Tarefa.objects
+        .filter(pk=tarefa_id, status=StatusTarefa.PENDENTE)
+        .update(
+            status=StatusTarefa.EXECUTANDO,
+            worker=worker[:80],
+            tentativas=F("tentativas") + 1,
+            iniciado_em=agora,
+            atualizado_em=agora,
+        )
+    )
+
+
+def reservar_proxima(worker: str, *, candidatas: int = 5) -> Tarefa | None:
+    fila = (
+        Tarefa.objects
+        .filter(status=StatusTarefa.PENDENTE)
+        .order_by("criado_em", "id")
+    )
+    if connection.features.has_select_for_update_skip_locked:
+        # Postgres: cada worker enxerga só as linhas que ninguém travou
+        bloco = transaction.atomic()
+        fila = fila.select_for_update(skip_locked=True)
+    else:
+        # SQLite: sem transação aberta (leitura + escrita na mesma transação
+        # falha com "database is locked" quando outro processo grava)
+        bloco = nullcontext()
+
+    with bloco:
+        for tarefa_id in list(fila.values_list("id", flat=True)[:candidatas]):
+            if _reservar(tarefa_id, worker):
+                return Tarefa.objects.get(pk=tarefa_id)
+    return None
+
+
+def executar(tarefa: Tarefa) -> Tarefa:
+    contexto = Contexto(tarefa)
+    try:
+        handler = HANDLERS.get(tarefa.tipo)
+        if handler is None:
+            raise TipoDesconhecido(tarefa.tipo)
+        with SinalDeVida(tarefa):
+            handler(contexto)
+    except Exception:
+        logger.exception("Tarefa %s (%s) falhou", tarefa.pk, tarefa.tipo)
+        tarefa.status = StatusTarefa.ERRO
+        tarefa.erro = traceback.format_exc()[-4000:]
+    else:
+        tarefa.status = StatusTarefa.CONCLUIDA
+        tarefa.progresso = 100
+    tarefa.concluido_em = timezone.now()
+    tarefa.save(update_fields=[
+        "status", "progresso", "mensagem", "erro", "arquivo", "nome_arquivo",
+        "content_type", "redirecionar_para", "concluido_em", "atualizado_em",
+    ])
+    return tarefa
+
+
+# =========================
+#  MANUTENÇÃO
+# =========================
+
+def recuperar_abandonadas(limite: timedelta = SEM_SINAL_DE_VIDA) -> int:
+    corte = timezone.now() - limite
+    agora = timezone.now()
+    paradas = Tarefa.objects.filter(status=StatusTarefa.EXECUTANDO, atualizado_em__lt=corte)
+    esgotadas = paradas.filter(tentativas__gte=MAX_TENTATIVAS).update(
+        status=StatusTarefa.ERRO,
+        erro="Worker interrompido; tentativas esgotadas.",
+        concluido_em=agora,
+        atualizado_em=agora,
+    )
+    devolvidas = paradas.filter(tentativas__lt=MAX_TENTATIVAS).update(
+        status=StatusTarefa.PENDENTE, worker="", atualizado_em=agora
+    )
+    return esgotadas + devolvidas
+
+
+def limpar_antigas(dias: int | None = None) -> int:
+    dias = settings.TAREFAS_RETENCAO_DIAS if dias is None else dias
+    corte = timezone.now() - timedelta(days=dias)
+    antigas = Tarefa.objects.filter(
+        status__in=[StatusTarefa.CONCLUIDA, StatusTarefa.ERRO], concluido_em__lt=corte
+    )
+    ids = list(antigas.values_list("id", flat=True))
+    for tarefa_id in ids:
+        shutil.rmtree(pasta_tarefa(tarefa_id), ignore_errors=True)
+    Tarefa.objects.filter(id__in=ids).delete()
+    return len(ids)
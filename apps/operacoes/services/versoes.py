@@ -0,0 +1,188 @@
+# apps/operacoes/services/versoes.py
+"""
+"Versão" barata das tabelas usadas pelas consultas, para GET condicional
+(ETag / Last-Modified). Substitui rodar a consulta e renderizar a página
+quando nada mudou:
+
+- MAX(atualizado_em) por tabela (servido pelo índice) pega inclusões e
+  alterações;
+- exclusões contam em MarcaTabela (post_delete e arquivamento), lida de
+  uma vez para todas as tabelas; nada de COUNT da tabela inteira;
+- o dia entra no carimbo: faixas de aniversário, idade e o padrão de data
+  de algumas consultas mudam na virada do dia sem nenhuma linha mudar;
+- a permissão de consulta é conferida antes do carimbo: quem não pode ver
+  recebe 403, nunca um 304 que revele se os dados mudaram.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, time
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+from django.http import HttpResponseForbidden
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from apps.assistidos.models import Assistido, Cep
+from apps.beneficios.models import Beneficio, BeneficioAssistido, ItemEntrega, LoteEntrega
+from apps.operacoes.models import MarcaTabela
+from apps.operacoes.permissoes import pode_ver
+
+
+# Grupos de tabelas por tipo de consulta
+TABELAS_ASSISTIDOS = (Assistido,)
+TABELAS_ATRIBUICOES = (BeneficioAssistido, Assistido, Beneficio)
+TABELAS_ENTREGAS = (LoteEntrega, ItemEntrega, Beneficio, BeneficioAssistido, Assistido)
+# Chamada: a ordem de rota depende da tabela de CEPs (services/rotas.py)
+TABELAS_CHAMADA = (*TABELAS_ENTREGAS, Cep)
+
+
+# =========================
+#  MARCAS DE EXCLUSÃO
+# =========================
+
+def marcar_tabela(model) -> None:
+    """Incrementa o contador da tabela (um UPDATE; cria a linha na primeira vez)."""
+    tabela = model._meta.label_lower
+    agora = timezone.now()
+    marcas = MarcaTabela.objects.filter(tabela=tabela)
+    if marcas.update(contador=F("contador") + 1, alterado_em=agora):
+        return
+    try:
+        with transaction.atomic():
+            MarcaTabela.objects.create(tabela=tabela, contador=1, alterado_em=agora)
+    except IntegrityError:
+        marcas.update(contador=F("contador") + 1, alterado_em=agora)  # criada em paralelo
+
+
+def marcas_tabelas(models) -> dict:
+    """{tabela: (contador, alterado_em)} numa consulta."""
+    return {
+        tabela: (contador, alterado_em)
+        for tabela, contador, alterado_em in MarcaTabela.objects.filter(
+            tabela__in=[m._meta.label_lower for m in models]
+        ).values_list("tabela", "contador", "alterado_em")
+    }
+
+
+# =========================
+#  CARIMBOS
+# =========================
+
+def carimbo_tabela(model):
+    """
+    Maior atualizado_em (pelo índice): pega inclusões e alterações.
+    Tabela sem a coluna (CEPs) vale só pela MarcaTabela.
+    """
+    if not any(f.name == "atualizado_em" for f in model._meta.concrete_fields):
+        return None
+    return model.objects.order_by().aggregate(ultimo=Max("atualizado_em"))["ultimo"]
+
+
+def _carimbos(request, models):
+    """
+    [(tabela, contador de exclusões, última alteração)] calculado uma vez
+    por request (ETag e Last-Modified usam os mesmos valores).
+    """
+    cache = getattr(request, "_carimbos_consulta", None)
+    if cache is None:
+        cache = request._carimbos_consulta = {}
+    chave = tuple(m._meta.label_lower for m in models)
+    if chave not in cache:
+        marcas = marcas_tabelas(models)
+        carimbos = []
+        for model in models:
+            tabela = model._meta.label_lower
+            contador, excluido_em = marcas.get(tabela, (0, None))
+            datas = [d for d in (carimbo_tabela(model), excluido_em) if d]
+            carimbos.append((tabela, contador, max(datas) if datas else None))
+        cache[chave] = carimbos
+    return cache[chave]
+
+
+def _tem_mensagens(request) -> bool:
+    # Mensagens pendentes precisam aparecer na página: não responder 304.
+    # (len() não marca as mensagens como lidas, ao contrário de iterar)
+    return len(get_messages(request)) > 0
+
+
+def etag_consulta(request, models) -> str | None:
+    if _tem_mensagens(request):
+        return None
+    partes = [
+        request.get_full_path(),
+        str(getattr(request.user, "pk", "")),  # o menu/base.html muda por usuário
+        request.headers.get("X-Fragmento", ""),  # página inteira x só resultados
+        str(timezone.localdate()),  # idade, aniversários, datas padrão
+    ]
+    for tabela, contador, ultimo in _carimbos(request, models):
+        partes.append(f"{tabela}:{contador}:{ultimo.isoformat() if ultimo else ''}")
+    return hashlib.md5("|".join(partes).encode()).hexdigest()
+
+
+def ultima_alteracao(request, models):
+    """A mais recente entre as tabelas, nunca antes do início do dia (mesma regra do ETag)."""
+    inicio_do_dia = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    datas = [ultimo for _, _, ultimo in _carimbos(request, models) if ultimo]
+    return max([*datas, inicio_do_dia])
+
+
+def _pre_processar(request, models, permissao):
+    """(resposta 403/304/412 ou None, etag, last-modified em timestamp)."""
+    if not permissao(request.user):
+        return HttpResponseForbidden("Sem permissão."), None, None
+    etag = etag_consulta(request, models)
+    etag = quote_etag(etag) if etag is not None else None
+    ultimo = ultima_alteracao(request, models)
+    ts = int(ultimo.timestamp()) if ultimo else None
+    return get_conditional_response(request, etag=etag, last_modified=ts), etag, ts
+
+
+def _pos_processar(request, resposta, etag, ts):
+    if request.method in ("GET", "HEAD"):
+        if ts and not resposta.has_header("Last-Modified"):
+            resposta.headers["Last-Modified"] = http_date(ts)
+        if etag:
+            resposta.headers.setdefault("ETag", etag)
+    # Sempre revalidar com o servidor (nada de cache heurístico pelo Last-Modified)
+    patch_cache_control(resposta, private=True, no_cache=True)
+    return resposta
+
+
+def consulta_condicional(*models, permissao=pode_ver):
+    """
+    Decorator de view: responde 304 (sem consultar as linhas nem renderizar)
+    quando filtros, usuário e carimbos das tabelas não mudaram.
+    Aplicar DEPOIS de @login_required. Aceita views síncronas e async.
+    `permissao(user)` é conferida antes de qualquer carimbo (403).
+    """
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def _view_async(request, *args, **kwargs):
+                # Carimbos e mensagens tocam banco/sessão: fora do event loop
+                resposta, etag, ts = await sync_to_async(_pre_processar)(request, models, permissao)
+                if resposta is None:
+                    resposta = await view(request, *args, **kwargs)
+                return _pos_processar(request, resposta, etag, ts)
+
+            return _view_async
+
+        @wraps(view)
+        def _view(request, *args, **kwargs):
+            resposta, etag, ts = _pre_processar(request, models, permissao)
+            if resposta is None:
+                resposta = view(request, *args, **kwargs)
+            return _pos_processar(request, resposta, etag, ts)
+
+        return _view
+
+    return decorator
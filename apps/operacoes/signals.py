@@ -0,0 +1,110 @@
+# apps/operacoes/signals.py
+"""
+Auditoria das alterações feitas pelo save() (formulários, admin):
+cadastro de assistido e atribuição de benefício.
+
+pre_save lê os valores gravados (uma consulta só com os campos auditados);
+post_save registra o que mudou como {campo: [antes, depois]}.
+Operações em massa (UPDATE / bulk_create) não passam por aqui: registram os
+seus eventos nos próprios serviços.
+
+Exclusões nas tabelas das consultas também incrementam a MarcaTabela
+(carimbo do GET condicional, services/versoes.py), assim como qualquer
+gravação na tabela de CEPs (versão usada nas chaves de cache).
+"""
+import threading
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.assistidos.models import Assistido, Cep
+from apps.beneficios.models import BeneficioAssistido
+from apps.operacoes.services.auditoria import registrar_evento
+from apps.operacoes.services.ceps import limpar_cache as limpar_cache_ceps
+from apps.operacoes.services.versoes import TABELAS_ENTREGAS, marcar_tabela
+
+
+# Campos derivados ou de controle: mudam em todo save(), não interessam
+IGNORADOS = {"busca", "criado_em", "atualizado_em"}
+
+# O que vai para `dados` ao criar (o resto está no próprio registro)
+CAMPOS_CRIACAO = {
+    Assistido: ("codigo", "status"),
+    BeneficioAssistido: ("assistido_id", "beneficio_id", "data_inicio", "data_termino"),
+}
+
+
+def _campos(model) -> list[str]:
+    return [f.attname for f in model._meta.concrete_fields if f.name not in IGNORADOS and not f.primary_key]
+
+
+@receiver(pre_save, sender=Assistido)
+@receiver(pre_save, sender=BeneficioAssistido)
+def guardar_valores_antigos(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._auditoria_antes = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    campos = _campos(sender)
+    if update_fields is not None:
+        campos = [c for c in campos if c in update_fields or c.removesuffix("_id") in update_fields]
+    if campos:
+        instance._auditoria_antes = sender._base_manager.filter(pk=instance.pk).values(*campos).first()
+
+
+@receiver(post_save, sender=Assistido)
+@receiver(post_save, sender=BeneficioAssistido)
+def registrar_alteracao(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        registrar_evento(
+            "CRIAR",
+            objeto=instance,
+            **{campo: getattr(instance, campo) for campo in CAMPOS_CRIACAO[sender]},
+        )
+        return
+
+    antes = getattr(instance, "_auditoria_antes", None) or {}
+    mudancas = {
+        campo: [valor, getattr(instance, campo)]
+        for campo, valor in antes.items()
+        if valor != getattr(instance, campo)
+    }
+    if mudancas:
+        registrar_evento("ALTERAR", objeto=instance, resumo=", ".join(mudancas), campos=mudancas)
+
+
+@receiver(post_delete, sender=Assistido)
+@receiver(post_delete, sender=BeneficioAssistido)
+def registrar_exclusao(sender, instance, **kwargs):
+    registrar_evento("EXCLUIR", objeto=instance, resumo=str(instance.pk))
+
+
+# =========================
+#  MARCAS DE EXCLUSÃO (GET condicional)
+# =========================
+
+_ultima_exclusao = threading.local()
+
+
+def marcar_exclusao(sender, origin=None, **kwargs):
+    # Um delete() dispara post_delete por linha (cascata inclusive), em
+    # sequência por model e com o mesmo `origin`: uma marca por tabela basta.
+    anterior = getattr(_ultima_exclusao, "valor", None)
+    if anterior is not None and anterior[0] is origin and anterior[1] is sender:
+        return
+    _ultima_exclusao.valor = (origin, sender)
+    marcar_tabela(sender)
+
+
+for _model in TABELAS_ENTREGAS:  # cobre as tabelas de todos os grupos
+    post_delete.connect(marcar_exclusao, sender=_model, dispatch_uid=f"marca_exclusao_{_model._meta.label_lower}")
+
+
+@receiver(post_save, sender=Cep)
+@receiver(post_delete, sender=Cep)
+def marcar_versao_ceps(sender, raw=False, **kwargs):
+    # Edição pelo admin; a importação (bulk_create) marca no próprio serviço
+    if not raw:
+        marcar_tabela(Cep)
+        limpar_cache_ceps()
@@ -0,0 +1,152 @@
+# apps/operacoes/tarefas.py
+"""
+Tipos de tarefa em segundo plano (registrados em OperacoesConfig.ready()).
+
+Cada handler recebe o Contexto de services/tarefas.py e roda no processo do
+run_workers (ou na própria requisição, com TAREFAS_SEGUNDO_PLANO desligado).
+"""
+from __future__ import annotations
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import AnonymousUser
+from django.http import QueryDict
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from apps.beneficios.models import LoteEntrega, LoteEntregaHistorico
+from apps.operacoes.services import duplicidades, pdf, rotas
+from apps.operacoes.services.assistidos_queries import assistidos_identificacao_qs
+from apps.operacoes.services.lotes import gerar_itens_lote
+from apps.operacoes.services.tarefas import registrar
+
+
+# Impressões que podem ir para a fila (rota -> prefixo do arquivo)
+IMPRESSOES = {
+    "consultas:identificacao_print": "identificacao",
+    "consultas:saude_print": "saude",
+    "consultas:socioeconomico_print": "socioeconomico",
+    "consultas:atribuicoes_consulta_print": "atribuicoes",
+    "consultas:beneficio_assistidos_print": "beneficio_assistidos",
+    "consultas:entregas_lotes_print": "entregas_lotes",
+    "consultas:entregas_lote_print": "entrega_lote",
+    "consultas:entregas_assistido_historico_print": "historico_entregas",
+    "consultas:entregas_lote_chamada_print": "chamada",
+}
+
+
+@registrar("gerar_itens_lote")
+def tarefa_gerar_itens_lote(ctx):
+    lote = LoteEntrega.objects.get(pk=ctx.parametros["lote_id"])
+    total = gerar_itens_lote(lote, progresso=ctx.progresso)
+    rotas.rota_do_lote(lote)  # deixa a ordem de rota da chamada pronta no cache
+    ctx.tarefa.mensagem = f"{total} itens gerados."
+    ctx.redirecionar(reverse("entregas:lote_detail", args=[lote.id]))
+
+
+@registrar("imprimir_consulta")
+def tarefa_imprimir_consulta(ctx):
+    """
+    Executa a view de impressão com os mesmos filtros (querystring) e guarda o
+    HTML: mesma saída do botão Imprimir, sem prender o worker web.
+    """
+    rota = ctx.parametros["rota"]
+    if rota not in IMPRESSOES:
+        raise ValueError(f"Impressão não permitida: {rota}")
+
+    caminho = reverse(rota)
+    request = RequestFactory().get(caminho + "?" + ctx.parametros.get("query", ""))
+    usuario = ctx.usuario or AnonymousUser()
+    request.user = usuario
+
+    async def auser():
+        return usuario
+
+    request.auser = auser  # o AuthenticationMiddleware não passou por aqui
+    ctx.progresso(10, mensagem="Consultando…")
+
+    view = resolve(caminho).func
+    if iscoroutinefunction(view):
+        # Consultas async: aqui não há event loop rodando
+        view = async_to_sync(view)
+    resposta = view(request)
+    if resposta.status_code != 200:
+        raise RuntimeError(f"A impressão respondeu {resposta.status_code}.")
+
+    nome = f"{IMPRESSOES[rota]}_{timezone.localtime():%Y%m%d_%H%M}.html"
+    ctx.salvar_arquivo(nome, resposta.content, resposta.get("Content-Type", "text/html; charset=utf-8"))
+    ctx.tarefa.mensagem = "Arquivo gerado."
+
+
+# =========================
+#  PDF NO SERVIDOR
+# =========================
+
+def _salvar_pdf(ctx, prefixo: str, documentos, templates) -> None:
+    if not documentos:
+        raise ValueError("Nenhum registro para gerar o PDF.")
+    nome = f"{prefixo}_{timezone.localtime():%Y%m%d_%H%M}.pdf"
+    destino = ctx.caminho_arquivo(nome)
+    ctx.progresso(0, mensagem=f"{len(documentos)} documentos…")
+    r = pdf.gerar_pdf(
+        documentos, destino,
+        versao=pdf.versao_templates(templates),
+        progresso=ctx.progresso,
+    )
+    ctx.tarefa.content_type = "application/pdf"
+    ctx.tarefa.mensagem = f"{r['documentos']} documentos ({r['em_cache']} reaproveitados)."
+
+
+@registrar("pdf_fichas")
+def tarefa_pdf_fichas(ctx):
+    """Fichas de inscrição preenchidas, com os filtros da consulta de Identificação."""
+    query = QueryDict(ctx.parametros.get("query", ""))
+    assistidos = assistidos_identificacao_qs(
+        q=(query.get("q") or "").strip(),
+        status=(query.get("status") or "").strip(),
+        logradouro=(query.get("logradouro") or "").strip(),
+        cep=(query.get("cep") or "").strip(),
+        bairro=(query.get("bairro") or "").strip(),
+        cidade=(query.get("cidade") or "").strip(),
+        idade_min=(query.get("idade_min") or "").strip(),
+        idade_max=(query.get("idade_max") or "").strip(),
+        aniversario=(query.get("aniversario") or "").strip(),
+    )
+    _salvar_pdf(ctx, "fichas", pdf.documentos_fichas(assistidos), pdf.TEMPLATES_FICHA)
+
+
+@registrar("pdf_chamadas")
+def tarefa_pdf_chamadas(ctx):
+    """Listas de chamada dos lotes escolhidos (ou dos filtros da tela de chamada); ordem=rota para entrega em casa."""
+    lotes = LoteEntrega.objects.order_by("data_entrega", "id")
+    if ctx.parametros.get("lote_ids"):
+        ids = set(ctx.parametros["lote_ids"])
+        if lotes.filter(id__in=ids).count() < len(ids):
+            # Algum já foi arquivado: lê todos pelo histórico
+            lotes = LoteEntregaHistorico.objects.order_by("data_entrega", "id")
+        lotes = lotes.filter(id__in=ids)
+    else:
+        query = QueryDict(ctx.parametros.get("query", ""))
+        data_ini = (query.get("data_ini") or "").strip()
+        data_fim = (query.get("data_fim") or "").strip()
+        beneficio_id = (query.get("beneficio_id") or "").strip()
+        if data_ini:
+            lotes = lotes.filter(data_entrega__gte=data_ini)
+        if data_fim:
+            lotes = lotes.filter(data_entrega__lte=data_fim)
+        if beneficio_id:
+            lotes = lotes.filter(beneficio_id=beneficio_id)
+    rota = ctx.parametros.get("ordem") == "rota"
+    _salvar_pdf(
+        ctx, "rotas" if rota else "chamadas", pdf.documentos_chamadas(lotes, rota=rota), pdf.TEMPLATES_CHAMADA
+    )
+
+
+@registrar("detectar_duplicidades")
+def tarefa_detectar_duplicidades(ctx):
+    r = duplicidades.detectar(progresso=ctx.progresso)
+    ctx.tarefa.mensagem = (
+        f"{r['cadastros']} cadastros, {r['comparacoes']} pares comparados: "
+        f"{r['novas']} suspeitas novas."
+    )
+    ctx.redirecionar(reverse("assistidos:duplicidades_lista"))
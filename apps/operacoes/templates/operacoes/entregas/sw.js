@@ -0,0 +1,75 @@
+// Service worker das telas de entrega (escopo: {% url 'entregas:lote_lista' %}).
+// - Páginas e snapshots do escopo: rede primeiro, cópia no cache para uso offline.
+// - CSS/JS do layout (CDN): cache primeiro.
+// - POST (salvar / sincronizar) nunca passa pelo cache: a fila fica no navegador.
+const CACHE = "acolher-entregas-v1";
+const ESCOPO = "{% url 'entregas:lote_lista' %}";
+const LAYOUT = [
+  "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css",
+  "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/bootstrap-icons.css",
+  "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js",
+];
+
+self.addEventListener("install", function (ev) {
+  ev.waitUntil(
+    caches.open(CACHE)
+      .then(function (cache) { return cache.addAll(LAYOUT); })
+      .catch(function () { /* sem rede na instalação: cacheia depois */ })
+      .then(function () { return self.skipWaiting(); })
+  );
+});
+
+self.addEventListener("activate", function (ev) {
+  ev.waitUntil(
+    caches.keys()
+      .then(function (nomes) {
+        return Promise.all(nomes.filter(function (n) { return n !== CACHE; })
+          .map(function (n) { return caches.delete(n); }));
+      })
+      .then(function () { return self.clients.claim(); })
+  );
+});
+
+async function redePrimeiro(req) {
+  const cache = await caches.open(CACHE);
+  try {
+    const resp = await fetch(req);
+    // Redirecionamento (ex.: login) não vai para o cache
+    if (resp.ok && !resp.redirected) cache.put(req, resp.clone());
+    return resp;
+  } catch (e) {
+    const salvo = await cache.match(req, { ignoreVary: true });
+    if (salvo) return salvo;
+    if (req.mode === "navigate") {
+      return new Response(
+        "<!DOCTYPE html><meta charset='utf-8'><title>Sem conexão</title>" +
+        "<p style='font-family:sans-serif;padding:1rem'>Sem conexão e esta página não foi baixada para uso offline.</p>",
+        { status: 503, headers: { "Content-Type": "text/html; charset=utf-8" } }
+      );
+    }
+    throw e;
+  }
+}
+
+async function cachePrimeiro(req) {
+  const salvo = await caches.match(req);
+  if (salvo) return salvo;
+  const resp = await fetch(req);
+  if (resp.ok) (await caches.open(CACHE)).put(req, resp.clone());
+  return resp;
+}
+
+self.addEventListener("fetch", function (ev) {
+  const req = ev.request;
+  if (req.method !== "GET") return;
+
+  const url = new URL(req.url);
+  if (LAYOUT.indexOf(url.href) !== -1) {
+    ev.respondWith(cachePrimeiro(req));
+    return;
+  }
+  // Fragmentos (X-Fragmento) ficam de fora: só páginas inteiras e snapshots
+  if (url.origin === self.location.origin && url.pathname.startsWith(ESCOPO) && !req.headers.get("X-Fragmento")) {
+    ev.respondWith(redePrimeiro(req));
+  }
+});
@@ -0,0 +1,75 @@
+"""
+Código de barras Code 39 em SVG, gerado em Python puro (sem dependências).
+
+Code 39 cobre o formato de Assistido.codigo (A-AAAAMMDD-XXXX: maiúsculas,
+dígitos e "-") e é lido por qualquer leitor USB, que "digita" o código
+seguido de Enter no campo de check-in.
+"""
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+
+# 9 elementos por caractere (barra, espaço, barra, ...); 1 = largo, 0 = estreito
+PADROES = {
+    "0": "000110100", "1": "100100001", "2": "001100001", "3": "101100000",
+    "4": "000110001", "5": "100110000", "6": "001110000", "7": "000100101",
+    "8": "100100100", "9": "001100100", "A": "100001001", "B": "001001001",
+    "C": "101001000", "D": "000011001", "E": "100011000", "F": "001011000",
+    "G": "000001101", "H": "100001100", "I": "001001100", "J": "000011100",
+    "K": "100000011", "L": "001000011", "M": "101000010", "N": "000010011",
+    "O": "100010010", "P": "001010010", "Q": "000000111", "R": "100000110",
+    "S": "001000110", "T": "000010110", "U": "110000001", "V": "011000001",
+    "W": "111000000", "X": "010010001", "Y": "110010000", "Z": "011010000",
+    "-": "010000101", ".": "110000100", " ": "011000100", "$": "010101000",
+    "/": "010100010", "+": "010001010", "%": "000101010", "*": "010010100",
+}
+LARGO = 3           # proporção largo:estreito
+MARGEM = 10         # zona de silêncio, em módulos estreitos
+
+
+def barras_code39(valor: str) -> list[tuple[int, int]]:
+    """Lista de (x, largura) das barras, em módulos estreitos."""
+    barras = []
+    x = MARGEM
+    for ch in f"*{valor}*":
+        for i, largo in enumerate(PADROES[ch]):
+            largura = LARGO if largo == "1" else 1
+            if i % 2 == 0:
+                barras.append((x, largura))
+            x += largura
+        x += 1  # espaço entre caracteres
+    return barras
+
+
+@register.simple_tag
+def codigo_barras(valor, altura=40, modulo=1, texto=True):
+    """
+    {% codigo_barras assistido.codigo %} -> <svg> com o código (ou "" se vazio/inválido).
+    modulo = largura da barra estreita em px; texto = imprime o código embaixo.
+    """
+    valor = (valor or "").strip().upper()
+    if not valor or any(ch not in PADROES or ch == "*" for ch in valor):
+        return ""
+
+    modulo = float(modulo)
+    barras = barras_code39(valor)
+    largura_total = (barras[-1][0] + barras[-1][1] + MARGEM) * modulo
+    altura_texto = 12 if texto else 0
+    rects = "".join(
+        f'<rect x="{x * modulo:g}" y="0" width="{w * modulo:g}" height="{altura}"/>' for x, w in barras
+    )
+    legenda = (
+        f'<text x="{largura_total / 2:g}" y="{altura + altura_texto - 1}" text-anchor="middle" '
+        f'font-family="monospace" font-size="11">{escape(valor)}</text>'
+        if texto else ""
+    )
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" class="codigo-barras" role="img" '
+        f'aria-label="{escape(valor)}" width="{largura_total:g}" height="{altura + altura_texto}" '
+        f'shape-rendering="crispEdges"><rect width="100%" height="100%" fill="#fff"/>'
+        f'<g fill="#000">{rects}</g>{legenda}</svg>'
+    )
+    return mark_safe(svg)
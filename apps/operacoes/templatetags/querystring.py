@@ -15,6 +15,7 @@ def qs_update(request, **kwargs):
     - Remove parâmetros cujo valor seja "" ou None
     """
     params = request.GET.copy()
+    params.pop("fragmento", None)  # links gerados apontam sempre para a página inteira
 
     for key, value in kwargs.items():
         if value is None or value == "":
@@ -48,6 +49,7 @@ def sort_qs(request, field, default_field="nome"):
         new_o = field
 
     params = request.GET.copy()
+    params.pop("fragmento", None)
     params["o"] = new_o
     # se você usar paginação depois, é bom resetar:
     params.pop("page", None)
@@ -1,3 +1,213 @@
-from django.test import TestCase
+import base64
+import json
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.assistidos.models import Assistido
+from apps.beneficios.models import Beneficio, BeneficioAssistido, ItemEntrega, LoteEntrega, LoteEntregaHistorico
+from apps.operacoes.models import EventoAuditoria
+from apps.operacoes.services import rotas
+from apps.operacoes.services.arquivo_entregas import arquivar_lotes
+from apps.operacoes.services.auditoria import registrar_evento
+from apps.operacoes.services.entregas_offline import TOLERANCIA_RELOGIO, aplicar_marcacoes
+from apps.operacoes.services.pdf import TEMPLATES_FICHA, documentos_fichas, gerar_pdf, pdf_disponivel, versao_templates
+
+
+def _cursor(valores) -> str:
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip("=")
+
+
+class CursorApiTests(TestCase):
+    url = "/operacoes/api/assistidos/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_superuser("api", password="x")
+        for nome in ("Ana", "Bia", "Bia", "Caio"):
+            Assistido.objects.create(nome=nome)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_percorre_tudo_sem_repetir(self):
+        vistos, cursor = [], ""
+        while True:
+            resposta = self.client.get(self.url, {"limite": 2, "campos": "id,nome", "cursor": cursor})
+            self.assertEqual(resposta.status_code, 200)
+            corpo = resposta.json()
+            vistos += [r["id"] for r in corpo["results"]]
+            cursor = corpo["next_cursor"]
+            if not cursor:
+                break
+        esperado = [str(pk) for pk in Assistido.objects.order_by("nome", "id").values_list("id", flat=True)]
+        self.assertEqual(vistos, esperado)
+
+    def test_cursor_com_tipo_errado_e_400(self):
+        # ["nome", "id"]: id é UUID
+        for valores in (["Bia", "nao-e-uuid"], ["Bia", 12.5], ["Bia", None], ["Bia", ["x"]]):
+            resposta = self.client.get(self.url, {"cursor": _cursor(valores)})
+            self.assertEqual(resposta.status_code, 400, valores)
+
+    def test_cursor_ilegivel_ou_do_tamanho_errado_e_400(self):
+        for cursor in ("@@@", _cursor({"a": 1}), _cursor(["Bia"])):
+            self.assertEqual(self.client.get(self.url, {"cursor": cursor}).status_code, 400)
+
+    def test_cursor_de_data_invalida_e_400(self):
+        resposta = self.client.get("/operacoes/api/entregas/lotes/", {"cursor": _cursor(["ontem", 1])})
+        self.assertEqual(resposta.status_code, 400)
+
+
+class MarcacoesOfflineTests(TestCase):
+    """Última escrita vence por item (marcado_em), com o relógio do aparelho limitado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        beneficio = Beneficio.objects.create(nome="Cesta", categoria="ALIMENTACAO", periodicidade="MENSAL")
+        cls.lote = LoteEntrega.objects.create(beneficio=beneficio, data_entrega=date(2026, 3, 10))
+        cls.outro_lote = LoteEntrega.objects.create(beneficio=beneficio, data_entrega=date(2026, 4, 10))
+        atribuicao = BeneficioAssistido.objects.create(
+            assistido=Assistido.objects.create(nome="Ana"), beneficio=beneficio
+        )
+        cls.marcado_em = timezone.now() - timedelta(hours=1)
+        cls.item = ItemEntrega.objects.create(
+            lote=cls.lote, atribuicao=atribuicao, entregue=False, marcado_em=cls.marcado_em
+        )
+        cls.item_de_outro_lote = ItemEntrega.objects.create(lote=cls.outro_lote, atribuicao=atribuicao)
+
+    def _enviar(self, *marcacoes):
+        return aplicar_marcacoes(self.lote, [
+            {"item": item_id, "entregue": entregue, "marcado_em": quando.isoformat()}
+            for item_id, entregue, quando in marcacoes
+        ])
+
+    def test_marcacao_mais_nova_vence(self):
+        quando = self.marcado_em + timedelta(minutes=10)
+        resultado = self._enviar((self.item.id, True, quando))
+        self.assertEqual(resultado.aplicados, [self.item.id])
+        self.item.refresh_from_db()
+        self.assertTrue(self.item.entregue)
+        self.assertEqual(self.item.marcado_em, quando)
+
+    def test_marcacao_mais_velha_ou_igual_e_ignorada(self):
+        for quando in (self.marcado_em - timedelta(minutes=10), self.marcado_em):
+            resultado = self._enviar((self.item.id, True, quando))
+            self.assertEqual(resultado.ignorados, [self.item.id])
+        self.item.refresh_from_db()
+        self.assertFalse(self.item.entregue)
+        self.assertEqual(self.item.marcado_em, self.marcado_em)
+
+    def test_reenvio_e_idempotente(self):
+        marcacao = (self.item.id, True, self.marcado_em + timedelta(minutes=1))
+        self.assertEqual(self._enviar(marcacao).aplicados, [self.item.id])
+        self.assertEqual(self._enviar(marcacao).ignorados, [self.item.id])
+
+    def test_relogio_adiantado_e_limitado(self):
+        antes = timezone.now()
+        self._enviar((self.item.id, True, antes + timedelta(days=30)))
+        self.item.refresh_from_db()
+        self.assertLessEqual(self.item.marcado_em, timezone.now() + TOLERANCIA_RELOGIO)
+        # Uma marcação real logo depois (dentro da tolerância) ainda vence
+        depois = self.item.marcado_em + timedelta(seconds=1)
+        self.assertEqual(self._enviar((self.item.id, False, depois)).aplicados, [self.item.id])
+
+    def test_no_mesmo_envio_vale_a_mais_recente(self):
+        self._enviar(
+            (self.item.id, True, self.marcado_em + timedelta(minutes=5)),
+            (self.item.id, False, self.marcado_em + timedelta(minutes=9)),
+            (self.item.id, True, self.marcado_em + timedelta(minutes=2)),
+        )
+        self.item.refresh_from_db()
+        self.assertFalse(self.item.entregue)
+        self.assertEqual(self.item.marcado_em, self.marcado_em + timedelta(minutes=9))
+
+    def test_item_de_outro_lote_e_formato_ruim_sao_invalidos(self):
+        resultado = aplicar_marcacoes(self.lote, [
+            {"item": self.item_de_outro_lote.id, "entregue": True, "marcado_em": timezone.now().isoformat()},
+            {"item": self.item.id, "entregue": "sim", "marcado_em": timezone.now().isoformat()},
+            {"item": self.item.id},
+        ])
+        self.assertEqual(resultado.aplicados, [])
+        self.assertEqual(len(resultado.invalidos), 3)
+        self.item_de_outro_lote.refresh_from_db()
+        self.assertFalse(self.item_de_outro_lote.entregue)
+
+
+class RotaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        beneficio = Beneficio.objects.create(nome="Cesta", categoria="ALIMENTACAO", periodicidade="MENSAL")
+        cls.lote = LoteEntrega.objects.create(beneficio=beneficio, data_entrega=date(2020, 3, 10))
+        cls.atribuicoes = [
+            BeneficioAssistido.objects.create(
+                assistido=Assistido.objects.create(nome=nome, bairro=bairro), beneficio=beneficio
+            )
+            for nome, bairro in (("Ana", "Centro"), ("Bia", "Vila Nova"))
+        ]
+        cls.item = ItemEntrega.objects.create(lote=cls.lote, atribuicao=cls.atribuicoes[0])
+
+    def test_marcar_entregue_nao_muda_a_impressao(self):
+        antes = rotas.impressao(self.lote)
+        self.item.entregue = True
+        self.item.save()
+        self.assertEqual(rotas.impressao(self.lote), antes)
+
+    def test_incluir_item_muda_a_impressao(self):
+        antes = rotas.impressao(self.lote)
+        ItemEntrega.objects.create(lote=self.lote, atribuicao=self.atribuicoes[1])
+        self.assertNotEqual(rotas.impressao(self.lote), antes)
+
+    def test_lote_arquivado_le_o_arquivo(self):
+        ItemEntrega.objects.create(lote=self.lote, atribuicao=self.atribuicoes[1])
+        self.assertEqual(arquivar_lotes()["lotes"], 1)
+        lote = LoteEntregaHistorico.objects.get(pk=self.lote.pk)
+        self.assertTrue(lote.arquivado)
+        itens = rotas.itens_em_rota(lote)
+        self.assertEqual(len(itens), 2)
+        self.assertEqual({i.grupo for i in itens}, {"Centro", "Vila Nova"})
+
+
+class AuditoriaForaDeRequestTests(TestCase):
+    def test_grava_no_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_evento("TESTE", resumo="shell")
+        self.assertTrue(EventoAuditoria.objects.filter(acao="TESTE").exists())
+
+    def test_falha_na_gravacao_e_registrada_e_nao_propaga(self):
+        with mock.patch.object(EventoAuditoria.objects, "bulk_create", side_effect=RuntimeError("banco")):
+            with self.assertLogs("apps.operacoes.services.auditoria", "ERROR"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    registrar_evento("TESTE", resumo="shell")
+
+
+@unittest.skipUnless(pdf_disponivel(), "weasyprint/pypdf indisponíveis")
+class PdfFichasTests(TestCase):
+    """WeasyPrint -> cache em disco -> pypdf: o PDF juntado abre e tem as páginas de cada ficha."""
+
+    def setUp(self):
+        self.pasta = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(PDF_CACHE_DIR=self.pasta / "cache"))
+        self.assistidos = [Assistido.objects.create(nome=nome) for nome in ("Ana", "Bia")]
+
+    def _gerar(self, assistidos, nome):
+        from pypdf import PdfReader
+
+        destino = self.pasta / nome
+        totais = gerar_pdf(
+            documentos_fichas(assistidos), destino, versao=versao_templates(TEMPLATES_FICHA), processos=1
+        )
+        return totais, len(PdfReader(destino).pages)
+
+    def test_duas_fichas(self):
+        _, paginas_uma = self._gerar(self.assistidos[:1], "uma.pdf")
+        self.assertGreater(paginas_uma, 0)
+
+        totais, paginas_duas = self._gerar(self.assistidos, "duas.pdf")
+        self.assertEqual(paginas_duas, 2 * paginas_uma)
+        self.assertEqual(totais, {"documentos": 2, "gerados": 1, "em_cache": 1})
@@ -127,4 +127,17 @@ class BeneficioAssistidoForm(forms.ModelForm):
         # EXCETO quando estou apenas mantendo o benefício já existente na atribuição.
         if (not beneficio.ativo) and (not self.instance.pk or beneficio.pk != self.instance.beneficio_id):
             raise forms.ValidationError("Este benefício está inativo e não pode ser atribuído.")
-        return beneficio
\ No newline at end of file
+        return beneficio
+
+class ImportacaoAssistidosForm(forms.Form):
+    arquivo = forms.FileField(
+        label="Arquivo (.csv ou .xlsx)",
+        widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,.xlsx"}),
+    )
+
+    def clean_arquivo(self):
+        arquivo = self.cleaned_data["arquivo"]
+        nome = (arquivo.name or "").lower()
+        if not (nome.endswith(".csv") or nome.endswith(".xlsx")):
+            raise forms.ValidationError("Envie um arquivo .csv ou .xlsx.")
+        return arquivo
@@ -6,9 +6,17 @@ app_name = "assistidos"
 urlpatterns = [
     path("", views.lista_assistidos, name="assistidos_lista"),
     path("novo/", views.assistido_create, name="assistido_create"),
+    path("importar/", views.assistido_importar, name="assistido_importar"),
+    path("importar/relatorio/", views.assistido_importar_relatorio, name="assistido_importar_relatorio"),
+    path("cep/", views.cep_sugestoes, name="cep_sugestoes"),
+    path("status-em-massa/", views.assistidos_status_em_massa, name="assistidos_status_em_massa"),
+    path("duplicidades/", views.duplicidades_lista, name="duplicidades_lista"),
+    path("duplicidades/<int:pk>/", views.duplicidade_revisar, name="duplicidade_revisar"),
     path("<uuid:id>/", views.assistido_detail, name="assistido_detail"),
     path("<uuid:id>/editar/", views.assistido_update, name="assistido_update"),
     path("<uuid:id>/deletar/", views.assistido_delete, name="assistido_delete"),
+    path("<uuid:id>/historico/", views.assistido_historico, name="assistido_historico"),
+    path("<uuid:id>/linha-do-tempo/", views.assistido_linha_do_tempo, name="assistido_linha_do_tempo"),
     
     path("<uuid:id>/beneficios/",views.assistido_beneficios,name="assistido_beneficios"),
     path("<uuid:id>/beneficios/atribuir/",views.assistido_beneficio_create,name="assistido_beneficio_create"),
@@ -1,14 +1,37 @@
+import io
+
 from django.utils import timezone
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.db import IntegrityError
+from django.db.models import Count
 from django.contrib import messages
-from apps.assistidos.models import Assistido
+from django.utils.dateparse import parse_date
+from apps.assistidos.models import Assistido, StatusCadastro
+from apps.operacoes.fragmentos import render_lista
 from apps.operacoes.permissoes import pode_deletar, pode_editar, pode_ver
-from apps.beneficios.models import BeneficioAssistido
+from apps.beneficios.models import Beneficio, BeneficioAssistido, ItemEntrega, ItemEntregaHistorico
+from apps.operacoes.services.assistidos_massa import alterar_status_em_massa, previa_status
+from apps.operacoes.services.assistidos_queries import CONSULTAS_SELECAO, aniversario_mes_q, assistidos_da_consulta
+from apps.operacoes.models import StatusSuspeita, SuspeitaDuplicidade
+from apps.operacoes.services.auditoria import historico
+from apps.operacoes.services.ceps import sugerir
+from apps.operacoes.services.duplicidades import descartar, mesclar
+from apps.operacoes.services.linha_do_tempo import linha_do_tempo
+from apps.operacoes.services.importacao_assistidos import (
+    ImportacaoErro,
+    caminho_relatorio_erros,
+    importar_assistidos,
+    ler_arquivo,
+    salvar_relatorio_erros,
+)
+from apps.operacoes.services.tarefas import enfileirar
+
+from .forms import AssistidoForm, BeneficioAssistidoForm, ImportacaoAssistidosForm
 
-from .forms import AssistidoForm, BeneficioAssistidoForm
+
+LIMITE_SUSPEITAS = 200
 
 
 # =========================================================
@@ -27,8 +50,9 @@ def lista_assistidos(request):
     if q_nome:
         qs = qs.filter(nome__icontains=q_nome)
 
-    if mes:
-        qs = qs.filter(data_nascimento__month=int(mes))
+    if mes.isdigit() and 1 <= int(mes) <= 12:
+        # Faixa no campo aniversario (MMDD, indexado) em vez de EXTRACT(MONTH) por linha
+        qs = qs.filter(aniversario_mes_q(int(mes)))
 
     contexto = {
         "assistidos": qs,
@@ -36,7 +60,7 @@ def lista_assistidos(request):
         "f_nome": q_nome,
         "f_mes": mes,
     }
-    return render(request, "operacoes/assistidos/lista.html", contexto)
+    return render_lista(request, "operacoes/assistidos/lista.html", contexto)
 
 
 # =========================================================
@@ -123,6 +147,73 @@ def assistido_detail(request, id):
     return render(request, "operacoes/assistidos/detalhe.html", contexto)
 
 
+# =========================================================
+# LINHA DO TEMPO (ciclos de benefício + entregas)
+# =========================================================
+@login_required
+def assistido_linha_do_tempo(request, id):
+    if not pode_ver(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+
+    assistido = get_object_or_404(Assistido, id=id)
+    linha = linha_do_tempo(assistido)
+
+    contexto = {
+        "assistido": assistido,
+        "atribuicoes": linha.atribuicoes,
+        "eventos": linha.eventos,
+    }
+    return render(request, "operacoes/assistidos/linha_do_tempo.html", contexto)
+
+
+# =========================================================
+# HISTÓRICO (auditoria do cadastro, atribuições e entregas)
+# =========================================================
+@login_required
+def assistido_historico(request, id):
+    if not pode_ver(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+
+    assistido = get_object_or_404(Assistido, id=id)
+
+    atribuicoes = dict(
+        BeneficioAssistido.objects.filter(assistido=assistido).values_list("id", "beneficio__nome")
+    )
+    itens = dict(
+        # Inclui entregas já arquivadas (mesmo id do item original)
+        ItemEntregaHistorico.objects.filter(atribuicao__assistido=assistido).values_list("id", "lote__data_entrega")
+    )
+    eventos = list(historico(
+        (Assistido, [assistido.pk]),
+        (BeneficioAssistido, atribuicoes),
+        (ItemEntrega, itens),
+    ))
+
+    # Descrição curta de cada evento (benefício da atribuição, data do lote)
+    beneficios = None
+    for ev in eventos:
+        if ev.modelo == BeneficioAssistido._meta.label_lower:
+            ev.alvo = atribuicoes.get(int(ev.objeto_id), "Atribuição")
+        elif ev.modelo == ItemEntrega._meta.label_lower:
+            data = itens.get(int(ev.objeto_id))
+            ev.alvo = f"Entrega de {data:%d/%m/%Y}" if data else "Entrega"
+        else:
+            ev.alvo = "Cadastro"
+        mudancas = ev.dados.get("campos") or {}
+        ev.mudancas = [(campo, antes, depois) for campo, (antes, depois) in mudancas.items()]
+        if "beneficio" in ev.dados:
+            if beneficios is None:
+                beneficios = dict(Beneficio.objects.values_list("id", "nome"))
+            ev.alvo = beneficios.get(ev.dados["beneficio"], ev.alvo)
+        ev.detalhe = ev.dados.get("motivo") or ev.dados.get("origem") or ""
+
+    contexto = {
+        "assistido": assistido,
+        "eventos": eventos,
+    }
+    return render(request, "operacoes/assistidos/historico.html", contexto)
+
+
 # =========================================================
 # CREATE
 # =========================================================
@@ -146,6 +237,83 @@ def assistido_create(request):
     )
 
 
+# =========================================================
+# AUTOCOMPLETAR DE ENDEREÇO (tabela local de CEPs)
+# =========================================================
+@login_required
+def cep_sugestoes(request):
+    """GET ?q=<CEP ou início do logradouro> -> {"results": [{cep, logradouro, bairro, cidade, uf}]}."""
+    if not pode_ver(request.user):
+        return JsonResponse({"erro": "Sem permissão."}, status=403)
+    return JsonResponse({"results": sugerir(request.GET.get("q") or "")})
+
+
+# =========================================================
+# IMPORTAÇÃO EM LOTE (CSV/XLSX)
+# =========================================================
+SESSAO_RELATORIO_IMPORTACAO = "importacao_assistidos_erros"
+
+
+@login_required
+def assistido_importar(request):
+    if not pode_editar(request.user):
+        return HttpResponseForbidden("Sem permissão para importar.")
+
+    resultado = None
+
+    if request.method == "POST":
+        form = ImportacaoAssistidosForm(request.POST, request.FILES)
+        if form.is_valid():
+            arquivo = form.cleaned_data["arquivo"]
+            try:
+                if arquivo.name.lower().endswith(".xlsx"):
+                    linhas = ler_arquivo(arquivo, arquivo.name)
+                else:
+                    texto = io.TextIOWrapper(arquivo.file, encoding="utf-8-sig", errors="replace", newline="")
+                    linhas = ler_arquivo(texto, arquivo.name)
+                resultado = importar_assistidos(linhas, usuario=request.user)
+            except ImportacaoErro as exc:
+                form.add_error("arquivo", str(exc))
+            else:
+                if resultado.erros:
+                    # Só o nome do arquivo na sessão (o relatório pode ter milhares de linhas)
+                    request.session[SESSAO_RELATORIO_IMPORTACAO] = salvar_relatorio_erros(resultado.erros)
+                else:
+                    request.session.pop(SESSAO_RELATORIO_IMPORTACAO, None)
+                messages.success(
+                    request,
+                    f"Importação concluída: {resultado.criadas} assistido(s) criado(s), "
+                    f"{resultado.rejeitadas} linha(s) rejeitada(s).",
+                )
+    else:
+        form = ImportacaoAssistidosForm()
+
+    contexto = {
+        "form": form,
+        "resultado": resultado,
+        "erros": resultado.erros[:100] if resultado else [],
+    }
+    return render(request, "operacoes/assistidos/importar.html", contexto)
+
+
+@login_required
+def assistido_importar_relatorio(request):
+    if not pode_editar(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+
+    caminho = caminho_relatorio_erros(request.session.get(SESSAO_RELATORIO_IMPORTACAO))
+    if caminho is None:
+        messages.info(request, "Não há relatório de erros disponível.")
+        return redirect("assistidos:assistido_importar")
+
+    return FileResponse(
+        caminho.open("rb"),
+        as_attachment=True,
+        filename="importacao_assistidos_erros.csv",
+        content_type="text/csv; charset=utf-8",
+    )
+
+
 # =========================================================
 # UPDATE
 # =========================================================
@@ -316,3 +484,147 @@ def assistido_beneficio_encerrar(request, id, bid):
         atribuicao.save()  # sem update_fields
         messages.success(request, "Atribuição encerrada com sucesso.")
     return redirect("atribuicoes:atribuicoes_lista")
+
+
+# =========================================================
+# STATUS EM MASSA (inativação / reativação)
+# =========================================================
+@login_required
+def assistidos_status_em_massa(request):
+    """
+    Inativa ou reativa todos os assistidos de uma consulta (origem + filtros).
+    GET mostra a prévia; POST grava.
+    """
+    if not pode_editar(request.user):
+        return HttpResponseForbidden("Sem permissão para alterar cadastros.")
+
+    dados = request.POST if request.method == "POST" else request.GET
+    origem = dados.get("origem") or "identificacao"
+    if origem not in CONSULTAS_SELECAO:
+        origem = "identificacao"
+    filtros = [(c, dados.get(c).strip()) for c in CONSULTAS_SELECAO[origem][1] if (dados.get(c) or "").strip()]
+
+    status = dados.get("novo_status") or StatusCadastro.INATIVO
+    if status not in StatusCadastro.values:
+        status = StatusCadastro.INATIVO
+    try:
+        data = parse_date((dados.get("data") or "").strip()) or timezone.localdate()
+    except ValueError:
+        data = timezone.localdate()
+    motivo = (dados.get("motivo") or "").strip()[:200]
+    encerrar = dados.get("encerrar_atribuicoes") == "1"
+
+    assistidos = assistidos_da_consulta(origem, dados)
+
+    if request.method == "POST":
+        if status == StatusCadastro.INATIVO and not motivo:
+            messages.error(request, "Informe o motivo da inativação.")
+        else:
+            r = alterar_status_em_massa(
+                assistidos,
+                status,
+                motivo=motivo,
+                data=data,
+                encerrar_atribuicoes=encerrar,
+                usuario=request.user,
+                filtros={"origem": origem, **dict(filtros)},
+            )
+            texto = f"{r['alterados']} assistidos {'inativados' if status == StatusCadastro.INATIVO else 'reativados'}."
+            if r["atribuicoes_encerradas"]:
+                texto += f" {r['atribuicoes_encerradas']} atribuições encerradas."
+            messages.success(request, texto)
+            return redirect("assistidos:assistidos_lista")
+
+    contexto = {
+        "origem": origem,
+        "filtros": filtros,
+        "status": status,
+        "status_choices": StatusCadastro.choices,
+        "data": data,
+        "motivo": motivo,
+        "encerrar": encerrar,
+        "previa": previa_status(assistidos, status, data),
+        "amostra": assistidos.exclude(status=status)[:20],
+    }
+    return render(request, "operacoes/assistidos/status_em_massa.html", contexto)
+
+
+# =========================================================
+# DUPLICIDADES (fila de revisão + mescla)
+# =========================================================
+@login_required
+def duplicidades_lista(request):
+    if not pode_editar(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+
+    if request.method == "POST":
+        # Detecção roda como tarefa (segundo plano quando ligado)
+        tarefa = enfileirar("detectar_duplicidades", usuario=request.user)
+        return redirect("tarefas:tarefa_detalhe", id=tarefa.id)
+
+    suspeitas = (
+        SuspeitaDuplicidade.objects
+        .filter(status=StatusSuspeita.PENDENTE)
+        .select_related("assistido_a", "assistido_b")
+    )
+    contexto = {
+        "suspeitas": suspeitas[:LIMITE_SUSPEITAS],
+        "total": suspeitas.count(),
+        "limite": LIMITE_SUSPEITAS,
+    }
+    return render(request, "operacoes/assistidos/duplicidades.html", contexto)
+
+
+@login_required
+def duplicidade_revisar(request, pk):
+    if not pode_editar(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+
+    suspeita = get_object_or_404(
+        SuspeitaDuplicidade.objects.select_related("assistido_a", "assistido_b"), pk=pk
+    )
+
+    if request.method == "POST" and suspeita.status == StatusSuspeita.PENDENTE:
+        if request.POST.get("acao") == "descartar":
+            descartar(suspeita, usuario=request.user)
+            messages.success(request, "Suspeita descartada.")
+        else:
+            try:
+                r = mesclar(suspeita, request.POST.get("manter", ""), usuario=request.user)
+            except (ValueError, IntegrityError) as exc:
+                messages.error(request, f"Não foi possível mesclar: {exc}")
+                return redirect("assistidos:duplicidade_revisar", pk=suspeita.pk)
+            messages.success(
+                request,
+                f"Cadastros mesclados: {r['atribuicoes']} atribuições movidas para {r['manter'].nome}"
+                + (f" ({r['encerradas']} ciclos repetidos encerrados)." if r["encerradas"] else "."),
+            )
+        return redirect("assistidos:duplicidades_lista")
+
+    a, b = suspeita.assistido_a, suspeita.assistido_b
+    campos = [
+        ("Código", a.codigo, b.codigo),
+        ("Nome", a.nome, b.nome),
+        ("CPF", a.cpf_formatado, b.cpf_formatado),
+        ("Nascimento", a.data_nascimento, b.data_nascimento),
+        ("Telefone", a.telefone, b.telefone),
+        ("Endereço", f"{a.logradouro} {a.numero}".strip(), f"{b.logradouro} {b.numero}".strip()),
+        ("Bairro", a.bairro, b.bairro),
+        ("CEP", a.cep_formatado, b.cep_formatado),
+        ("Status", a.get_status_display(), b.get_status_display()),
+        ("Cadastrado em", a.criado_em, b.criado_em),
+    ]
+    atribuicoes = dict(
+        BeneficioAssistido.objects.filter(assistido__in=[a, b])
+        .values("assistido_id").annotate(n=Count("id")).values_list("assistido_id", "n")
+    )
+    contexto = {
+        "suspeita": suspeita,
+        "a": a,
+        "b": b,
+        "campos": campos,
+        "atribuicoes_a": atribuicoes.get(a.pk, 0),
+        "atribuicoes_b": atribuicoes.get(b.pk, 0),
+    }
+    return render(request, "operacoes/assistidos/duplicidade_revisar.html", contexto)
+
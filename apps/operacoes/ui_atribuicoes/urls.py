@@ -6,4 +6,6 @@ app_name = "atribuicoes"
 urlpatterns = [
     path("", views.atribuicoes_lista, name="atribuicoes_lista"),
     path("nova/", views.selecionar_assistido_para_atribuicao, name="atribuicao_nova"),
+    path("em-massa/", views.atribuicao_em_massa, name="atribuicao_em_massa"),
+    path("em-massa/encerrar/", views.encerramento_em_massa, name="encerramento_em_massa"),
 ]
\ No newline at end of file
@@ -4,9 +4,18 @@ from django.shortcuts import render
 from django.shortcuts import get_object_or_404, redirect, render
 from apps.assistidos.models import Assistido
 from apps.operacoes.permissoes import pode_editar, pode_ver
-from apps.beneficios.models import BeneficioAssistido
+from apps.beneficios.models import Beneficio, BeneficioAssistido
+from apps.operacoes.services.assistidos_queries import CONSULTAS_SELECAO, assistidos_da_consulta
+from apps.operacoes.services.atribuicoes_massa import (
+    abertas,
+    atribuir_em_massa,
+    encerrar_em_massa,
+    previa,
+    previa_encerramento,
+)
 from django.contrib import messages
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.views.decorators.http import require_POST
 
 
@@ -99,8 +108,141 @@ def atribuicao_encerrar(request, pk):
     # ✅ regra: encerrar sem modal => término = hoje
     atribuicao.data_termino = timezone.localdate()
     atribuicao.ativo = False
-    atribuicao.save(update_fields=["data_termino", "ativo"])
+    atribuicao.save(update_fields=["data_termino", "ativo", "atualizado_em"])
 
     messages.success(request, "Atribuição encerrada com sucesso.")
     return redirect("atribuicoes:atribuicoes_lista")
 
+
+@login_required
+def atribuicao_em_massa(request):
+    """
+    Um benefício para todos os assistidos de uma consulta (Identificação,
+    Saúde ou Socioeconômico, com os filtros da tela). GET mostra a prévia;
+    POST grava.
+    """
+    if not pode_editar(request.user):
+        messages.error(request, "Sem permissão para atribuir benefícios.")
+        return redirect("atribuicoes:atribuicoes_lista")
+
+    dados = request.POST if request.method == "POST" else request.GET
+    origem = dados.get("origem") or "identificacao"
+    if origem not in CONSULTAS_SELECAO:
+        origem = "identificacao"
+    filtros = [(c, dados.get(c).strip()) for c in CONSULTAS_SELECAO[origem][1] if (dados.get(c) or "").strip()]
+
+    assistidos = assistidos_da_consulta(origem, dados)
+    beneficio_id = (dados.get("beneficio_id") or "").strip()
+    beneficio = Beneficio.objects.filter(id=beneficio_id, ativo=True).first() if beneficio_id.isdigit() else None
+    try:
+        data_inicio = parse_date((dados.get("data_inicio") or "").strip()) or timezone.localdate()
+    except ValueError:
+        data_inicio = timezone.localdate()
+
+    if request.method == "POST":
+        if beneficio is None:
+            messages.error(request, "Selecione um benefício ativo.")
+        else:
+            r = atribuir_em_massa(
+                assistidos, beneficio, data_inicio, usuario=request.user, filtros={"origem": origem, **dict(filtros)}
+            )
+            messages.success(
+                request,
+                f"{r['criadas']} atribuições criadas para {beneficio.nome}. "
+                f"Já possuíam: {r['ja_possuem']}. Inativos ignorados: {r['inativos']}.",
+            )
+            return redirect("atribuicoes:atribuicoes_lista")
+
+    contexto = {
+        "origem": origem,
+        "filtros": filtros,
+        "beneficios": Beneficio.objects.filter(ativo=True).order_by("nome", "id"),
+        "beneficio": beneficio,
+        "beneficio_id": beneficio_id,
+        "data_inicio": data_inicio,
+        "total_selecao": assistidos.count(),
+        "amostra": assistidos[:20],
+        "previa": previa(assistidos, beneficio, data_inicio) if beneficio else None,
+    }
+    return render(request, "operacoes/atribuicoes/em_massa.html", contexto)
+
+
+# Até este tamanho a tela lista os ciclos para desmarcar um a um
+LIMITE_SELECAO = 300
+
+
+@login_required
+def encerramento_em_massa(request):
+    """
+    Encerra ciclos abertos por benefício, pelos assistidos de uma consulta
+    (origem + filtros) ou pelos dois; com poucos ciclos, dá para desmarcar
+    um a um. GET mostra a prévia; POST grava.
+    """
+    if not pode_editar(request.user):
+        messages.error(request, "Sem permissão para encerrar atribuições.")
+        return redirect("atribuicoes:atribuicoes_lista")
+
+    dados = request.POST if request.method == "POST" else request.GET
+    origem = dados.get("origem") or ""
+    if origem not in CONSULTAS_SELECAO:
+        origem = ""
+    filtros = []
+    if origem:
+        filtros = [(c, dados.get(c).strip()) for c in CONSULTAS_SELECAO[origem][1] if (dados.get(c) or "").strip()]
+
+    beneficio_id = (dados.get("beneficio_id") or "").strip()
+    beneficio = Beneficio.objects.filter(id=beneficio_id).first() if beneficio_id.isdigit() else None
+    try:
+        data_termino = parse_date((dados.get("data_termino") or "").strip()) or timezone.localdate()
+    except ValueError:
+        data_termino = timezone.localdate()
+    motivo = (dados.get("motivo") or "").strip()[:150]
+
+    atribuicoes = None
+    if beneficio or origem:
+        atribuicoes = BeneficioAssistido.objects.all()
+        if beneficio:
+            atribuicoes = atribuicoes.filter(beneficio=beneficio)
+        if origem:
+            atribuicoes = atribuicoes.filter(
+                assistido__in=assistidos_da_consulta(origem, dados).order_by().values("pk")
+            )
+
+    if request.method == "POST":
+        if atribuicoes is None:
+            messages.error(request, "Escolha um benefício ou uma seleção de assistidos.")
+        else:
+            if dados.get("selecao"):
+                atribuicoes = atribuicoes.filter(pk__in=[int(i) for i in dados.getlist("atribuicao") if i.isdigit()])
+            r = encerrar_em_massa(
+                atribuicoes,
+                data_termino,
+                usuario=request.user,
+                motivo=motivo,
+                filtros={"beneficio_id": beneficio_id, "origem": origem, **dict(filtros)},
+            )
+            messages.success(request, f"{r['encerradas']} atribuições encerradas.")
+            return redirect("atribuicoes:atribuicoes_lista")
+
+    resumo = previa_encerramento(atribuicoes, data_termino) if atribuicoes is not None else None
+    lista = None
+    if resumo and 0 < resumo["encerrar"] <= LIMITE_SELECAO:
+        lista = (
+            abertas(atribuicoes, data_termino)
+            .filter(data_inicio__lte=data_termino)
+            .select_related("assistido", "beneficio")
+            .order_by("assistido__nome", "beneficio__nome")
+        )
+
+    contexto = {
+        "origem": origem,
+        "filtros": filtros,
+        "beneficios": Beneficio.objects.order_by("nome", "id"),
+        "beneficio": beneficio,
+        "beneficio_id": beneficio_id,
+        "data_termino": data_termino,
+        "motivo": motivo,
+        "resumo": resumo,
+        "lista": lista,
+    }
+    return render(request, "operacoes/atribuicoes/encerrar_em_massa.html", contexto)
@@ -9,4 +9,16 @@ urlpatterns = [
     path("<int:id>/", views.lote_detail, name="lote_detail"),
     path("<int:id>/editar/", views.lote_update, name="lote_update"),
     path("<int:id>/deletar/", views.lote_delete, name="lote_delete"),     
+
+    # Check-in por código (leitor no balcão)
+    path("<int:id>/checkin/", views.lote_checkin, name="lote_checkin"),
+
+    # Progresso ao vivo (SSE)
+    path("<int:id>/eventos/", views.lote_eventos, name="lote_eventos"),
+
+    # Checklist offline
+    path("<int:id>/offline/", views.lote_offline_snapshot, name="lote_offline_snapshot"),
+    path("<int:id>/offline/sincronizar/", views.lote_offline_sincronizar, name="lote_offline_sincronizar"),
+    path("sw.js", views.entregas_service_worker, name="service_worker"),
+    path("manifest.webmanifest", views.entregas_manifest, name="manifest"),
 ]
@@ -1,12 +1,27 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.db import IntegrityError
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.views.decorators.http import require_GET, require_POST
 
 from .forms import LoteEntregaForm
-from apps.beneficios.models import LoteEntrega, ItemEntrega, BeneficioAssistido
-from apps.operacoes.permissoes import pode_deletar,pode_ver
-from django.http import HttpResponseForbidden
+from apps.beneficios.models import LoteEntrega, ItemEntrega
+from apps.operacoes.models import StatusTarefa
+from apps.operacoes.fragmentos import render_lista
+from apps.operacoes.permissoes import pode_deletar, pode_editar, pode_ver
+from apps.operacoes.services.auditoria import registrar_entregas
+from apps.operacoes.services.checkin import registrar_checkin
+from apps.operacoes.services.elegibilidade import resumo as resumo_elegibilidade
+from apps.operacoes.services.entregas_offline import MarcacaoInvalida, aplicar_marcacoes, snapshot_lote
+from apps.operacoes.services.eventos_lote import evento_unico, fluxo_lote, notificar_itens
+from apps.operacoes.services.tarefas import enfileirar
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 
 
 def lote_lista(request):
@@ -26,36 +41,36 @@ def lote_lista(request):
         "data_inicio": data_inicio,
         "data_fim": data_fim,
     }
-    return render(request, "operacoes/entregas/lote_lista.html", context)
+    return render_lista(request, "operacoes/entregas/lote_lista.html", context)
 
 
 def lote_create(request):
+    previa = None
     if request.method == "POST":
         form = LoteEntregaForm(request.POST)
-        if form.is_valid():
+        if form.is_valid() and "previa" in request.POST:
+            # Só mostra quem entraria no lote; nada é gravado
+            previa = resumo_elegibilidade(form.cleaned_data["beneficio"], form.cleaned_data["data_entrega"])
+        elif form.is_valid():
             try:
                 lote = form.save()
             except IntegrityError:
                 # ✅ mensagem única em português (validate_unique foi desativado no form)
                 form.add_error(None, "Já existe um lote para este benefício nesta data.")
             else:
-                # Gerar itens automaticamente
-                if not lote.itens.exists():
-                    atribuicoes = (
-                        BeneficioAssistido.objects
-                        .select_related("assistido", "beneficio")
-                        .filter(beneficio=lote.beneficio, ativo=True)
-                    )
-                    atribuicoes = [a for a in atribuicoes if a.assistido.is_ativo]
-                    itens = [ItemEntrega(lote=lote, atribuicao=a) for a in atribuicoes]
-                    ItemEntrega.objects.bulk_create(itens, ignore_conflicts=True)
+                # Gerar itens automaticamente (na hora ou pelo run_workers, conforme
+                # TAREFAS_SEGUNDO_PLANO; lotes grandes passavam do timeout do worker)
+                tarefa = enfileirar("gerar_itens_lote", {"lote_id": lote.id}, usuario=request.user)
+                if tarefa.status != StatusTarefa.CONCLUIDA:
+                    messages.info(request, "Lote criado. Acompanhe a geração dos itens.")
+                    return redirect("tarefas:tarefa_detalhe", id=tarefa.id)
 
                 messages.success(request, "Lote criado com sucesso.")
                 return redirect("entregas:lote_lista")
     else:
         form = LoteEntregaForm()
 
-    return render(request, "operacoes/entregas/lote_form.html", {"form": form})
+    return render(request, "operacoes/entregas/lote_form.html", {"form": form, "previa": previa})
 
 
 def lote_detail(request, id):
@@ -75,11 +90,17 @@ def lote_detail(request, id):
         marcados = request.POST.getlist("entregue")
         marcados_ids = {int(x) for x in marcados if x.isdigit()}
 
+        agora = timezone.now()
+        alterados = []
         for item in itens:
             novo_valor = item.id in marcados_ids
             if item.entregue != novo_valor:
                 item.entregue = novo_valor
-                item.save(update_fields=["entregue"])
+                item.marcado_em = agora
+                item.save(update_fields=["entregue", "marcado_em", "atualizado_em"])
+                alterados.append((item.id, novo_valor))
+        notificar_itens(lote.id, alterados)
+        registrar_entregas(lote.id, alterados, "checklist")
 
         messages.success(request, "Checklist atualizado com sucesso.")
         return redirect("entregas:lote_detail", id=lote.id)
@@ -138,4 +159,113 @@ def lote_delete(request, id):
         request,
         "operacoes/entregas/lote_confirm_delete.html",
         {"lote": lote, "entregues_count": entregues_count},
-    )
\ No newline at end of file
+    )
+
+
+# =========================================================
+# CHECK-IN POR CÓDIGO (leitor de código de barras no balcão)
+# =========================================================
+@login_required
+@require_POST
+def lote_checkin(request, id):
+    """
+    POST codigo=<Assistido.codigo>. Com Accept: application/json responde JSON
+    (usado pelo campo de check-in da tela); sem JS, mensagem + volta para o lote.
+    """
+    quer_json = "application/json" in request.headers.get("Accept", "")
+    if not pode_editar(request.user):
+        if quer_json:
+            return JsonResponse({"erro": "Sem permissão."}, status=403)
+        return HttpResponseForbidden("Sem permissão.")
+
+    resultado = registrar_checkin(id, request.POST.get("codigo", ""))
+
+    if quer_json:
+        return JsonResponse(resultado.como_dict(), status=200 if resultado.encontrado else 404)
+
+    if not resultado.encontrado:
+        messages.error(request, f"Código {resultado.codigo or '(vazio)'} não encontrado neste lote.")
+    elif resultado.ja_entregue:
+        messages.warning(request, f"{resultado.nome.title()} já estava marcado como entregue.")
+    else:
+        messages.success(request, f"Entrega registrada: {resultado.nome.title()}.")
+    return redirect("entregas:lote_detail", id=id)
+
+
+# =========================================================
+# PROGRESSO AO VIVO (Server-Sent Events)
+# =========================================================
+@login_required
+@require_GET
+async def lote_eventos(request, id):
+    """
+    text/event-stream com itens marcados e contadores do lote.
+    ASGI: conexão longa alimentada pelo transmissor em processo (+ consulta periódica).
+    WSGI: um evento e "retry:", para não prender um worker síncrono.
+    """
+    user = await request.auser()
+    if not await sync_to_async(pode_ver)(user):
+        return HttpResponseForbidden("Sem permissão.")
+    if not await LoteEntrega.objects.filter(id=id).aexists():
+        return HttpResponse("Lote não encontrado.", status=404)
+
+    ultimo_id = request.headers.get("Last-Event-ID", "")
+    if isinstance(request, ASGIRequest):
+        resposta = StreamingHttpResponse(fluxo_lote(id, ultimo_id), content_type="text/event-stream")
+    else:
+        resposta = HttpResponse(await evento_unico(id, ultimo_id), content_type="text/event-stream")
+    resposta["Cache-Control"] = "no-cache"
+    resposta["X-Accel-Buffering"] = "no"  # nginx: não segurar o fluxo em buffer
+    return resposta
+
+
+# =========================================================
+# CHECKLIST OFFLINE (snapshot + sincronização em lote)
+# =========================================================
+@login_required
+@require_GET
+def lote_offline_snapshot(request, id):
+    if not pode_ver(request.user):
+        return JsonResponse({"erro": "Sem permissão."}, status=403)
+
+    lote = get_object_or_404(LoteEntrega.objects.select_related("beneficio"), id=id)
+    resposta = JsonResponse(snapshot_lote(lote), encoder=DjangoJSONEncoder, json_dumps_params={"ensure_ascii": False})
+    resposta["Cache-Control"] = "private, no-cache"
+    return resposta
+
+
+@login_required
+@require_POST
+def lote_offline_sincronizar(request, id):
+    """
+    Corpo: {"marcacoes": [{"item": 12, "entregue": true, "marcado_em": "2026-10-19T13:02:11.120Z"}, ...]}
+    Resposta: itens aplicados / ignorados (marcação mais nova no servidor) / inválidos
+    e o estado final de cada item enviado, para o aparelho se reconciliar.
+    """
+    if not pode_editar(request.user):
+        return JsonResponse({"erro": "Sem permissão."}, status=403)
+
+    lote = get_object_or_404(LoteEntrega, id=id)
+    try:
+        corpo = json.loads(request.body or b"{}")
+        resultado = aplicar_marcacoes(lote, corpo.get("marcacoes"))
+    except (ValueError, AttributeError):
+        return JsonResponse({"erro": "JSON inválido."}, status=400)
+    except MarcacaoInvalida as exc:
+        return JsonResponse({"erro": str(exc)}, status=400)
+
+    return JsonResponse(resultado.como_dict(), encoder=DjangoJSONEncoder)
+
+
+@require_GET
+def entregas_service_worker(request):
+    # Servido sob /operacoes/entregas/ para que o escopo cubra só as telas de entrega
+    resposta = render(request, "operacoes/entregas/sw.js", content_type="application/javascript")
+    resposta["Cache-Control"] = "no-cache"
+    resposta["Service-Worker-Allowed"] = "/operacoes/entregas/"
+    return resposta
+
+
+@require_GET
+def entregas_manifest(request):
+    return render(request, "operacoes/entregas/manifest.webmanifest", content_type="application/manifest+json")
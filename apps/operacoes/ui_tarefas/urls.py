@@ -0,0 +1,14 @@
+from django.urls import path
+from . import views
+
+app_name = "tarefas"
+
+urlpatterns = [
+    path("", views.tarefa_lista, name="tarefa_lista"),
+    path("<int:id>/", views.tarefa_detalhe, name="tarefa_detalhe"),
+    path("<int:id>/status/", views.tarefa_status, name="tarefa_status"),
+    path("<int:id>/arquivo/", views.tarefa_download, name="tarefa_download"),
+    path("imprimir/", views.imprimir_em_segundo_plano, name="imprimir"),
+    path("pdf/fichas/", views.pdf_fichas, name="pdf_fichas"),
+    path("pdf/chamadas/", views.pdf_chamadas, name="pdf_chamadas"),
+]
@@ -0,0 +1,144 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpResponseForbidden, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+
+from apps.operacoes.models import Tarefa
+from apps.operacoes.permissoes import pode_ver
+from apps.operacoes.services.pdf import pdf_disponivel
+from apps.operacoes.services.tarefas import caminho_resultado, enfileirar
+from apps.operacoes.tarefas import IMPRESSOES
+
+
+def _tarefa_do_usuario(request, id):
+    tarefa = get_object_or_404(Tarefa, id=id)
+    # Cada um vê as suas; superusuário vê todas
+    if tarefa.criado_por_id != request.user.id and not request.user.is_superuser:
+        raise Http404
+    return tarefa
+
+
+def _status_dict(tarefa) -> dict:
+    return {
+        "id": tarefa.id,
+        "tipo": tarefa.tipo,
+        "status": tarefa.status,
+        "status_display": tarefa.get_status_display(),
+        "progresso": tarefa.progresso,
+        "mensagem": tarefa.mensagem,
+        "finalizada": tarefa.finalizada,
+        "erro": bool(tarefa.erro),
+        "download": (
+            reverse("tarefas:tarefa_download", args=[tarefa.id])
+            if tarefa.status == "CONCLUIDA" and tarefa.arquivo else ""
+        ),
+        "redirecionar": tarefa.redirecionar_para if tarefa.status == "CONCLUIDA" else "",
+    }
+
+
+@login_required
+def tarefa_lista(request):
+    if not pode_ver(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+
+    tarefas = Tarefa.objects.select_related("criado_por")
+    if not request.user.is_superuser:
+        tarefas = tarefas.filter(criado_por=request.user)
+
+    return render(request, "operacoes/tarefas/lista.html", {"tarefas": tarefas[:50]})
+
+
+@login_required
+def tarefa_detalhe(request, id):
+    if not pode_ver(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+
+    tarefa = _tarefa_do_usuario(request, id)
+    if tarefa.status == "CONCLUIDA" and tarefa.redirecionar_para:
+        return redirect(tarefa.redirecionar_para)
+    return render(request, "operacoes/tarefas/detalhe.html", {"tarefa": tarefa, "estado": _status_dict(tarefa)})
+
+
+@login_required
+@require_GET
+def tarefa_status(request, id):
+    """JSON consultado pela tela de acompanhamento a cada poucos segundos."""
+    if not pode_ver(request.user):
+        return JsonResponse({"erro": "Sem permissão."}, status=403)
+
+    resposta = JsonResponse(_status_dict(_tarefa_do_usuario(request, id)))
+    resposta["Cache-Control"] = "no-store"
+    return resposta
+
+
+@login_required
+@require_GET
+def tarefa_download(request, id):
+    if not pode_ver(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+
+    tarefa = _tarefa_do_usuario(request, id)
+    caminho = caminho_resultado(tarefa) if tarefa.status == "CONCLUIDA" else None
+    if caminho is None or not caminho.exists():
+        raise Http404("Arquivo não disponível (tarefa não concluída ou já removida).")
+
+    # HTML de impressão abre no navegador; o resto baixa
+    return FileResponse(
+        caminho.open("rb"),
+        as_attachment=not tarefa.content_type.startswith("text/html"),
+        filename=tarefa.nome_arquivo,
+        content_type=tarefa.content_type or None,
+    )
+
+
+@login_required
+@require_POST
+def imprimir_em_segundo_plano(request):
+    """POST rota=<consultas:..._print>&query=<filtros da tela> -> tarefa de impressão."""
+    if not pode_ver(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+
+    rota = request.POST.get("rota", "")
+    if rota not in IMPRESSOES:
+        messages.error(request, "Impressão não disponível em segundo plano.")
+        return redirect("tarefas:tarefa_lista")
+
+    tarefa = enfileirar(
+        "imprimir_consulta",
+        {"rota": rota, "query": request.POST.get("query", "")},
+        usuario=request.user,
+    )
+    return redirect("tarefas:tarefa_detalhe", id=tarefa.id)
+
+
+def _enfileirar_pdf(request, tipo, parametros, voltar_para):
+    if not pode_ver(request.user):
+        return HttpResponseForbidden("Sem permissão.")
+    if not pdf_disponivel():
+        messages.error(request, "PDF no servidor indisponível: instale os pacotes 'weasyprint' e 'pypdf'.")
+        return redirect(voltar_para)
+
+    tarefa = enfileirar(tipo, parametros, usuario=request.user)
+    return redirect("tarefas:tarefa_detalhe", id=tarefa.id)
+
+
+@login_required
+@require_POST
+def pdf_fichas(request):
+    """POST query=<filtros da Identificação> -> um PDF com as fichas preenchidas."""
+    query = request.POST.get("query", "")
+    voltar = reverse("consultas:identificacao_lista") + (f"?{query}" if query else "")
+    return _enfileirar_pdf(request, "pdf_fichas", {"query": query}, voltar)
+
+
+@login_required
+@require_POST
+def pdf_chamadas(request):
+    """POST lote_id=<id> (vários) ou query=<filtros da tela de chamada> [+ ordem=rota] -> um PDF."""
+    query = request.POST.get("query", "")
+    lote_ids = [int(i) for i in request.POST.getlist("lote_id") if i.isdigit()]
+    ordem = "rota" if request.POST.get("ordem") == "rota" else "nome"
+    voltar = reverse("consultas:entregas_lote_chamada") + (f"?{query}" if query else "")
+    return _enfileirar_pdf(request, "pdf_chamadas", {"query": query, "lote_ids": lote_ids, "ordem": ordem}, voltar)
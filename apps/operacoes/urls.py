@@ -6,10 +6,14 @@ urlpatterns = [
     path("beneficios/", include("apps.operacoes.ui_beneficios.urls")),
     path("atribuicoes/", include("apps.operacoes.ui_atribuicoes.urls")),
     path("entregas/", include("apps.operacoes.ui_entregas.urls")),
+    path("tarefas/", include("apps.operacoes.ui_tarefas.urls")),
 
     # Mantém o app de consultas (todas as rotas existentes continuam funcionando)
     path("consultas/", include("apps.operacoes.consultas.urls")),
 
+    # API JSON somente leitura (mesmos filtros das consultas)
+    path("api/", include("apps.operacoes.api.urls")),
+
     # Home do módulo Operações (apenas UMA)
     path("", views.home_view, name="operacoes_home"),
 
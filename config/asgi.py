@@ -5,6 +5,13 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+O progresso ao vivo dos lotes (entregas/<id>/eventos/, Server-Sent Events)
+só mantém a conexão aberta quando o projeto roda por aqui, ex.:
+
+    uvicorn config.asgi:application --host 0.0.0.0 --port 8000
+
+Sob WSGI o mesmo endpoint responde um evento e o navegador reconecta (polling).
 """
 
 import os
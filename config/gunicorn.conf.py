@@ -0,0 +1,39 @@
+"""
+Configuração do Gunicorn (Projeto Acolher).
+
+Dois perfis, escolhidos por ACOLHER_MODO:
+
+- "wsgi" (padrão): workers síncronos em config.wsgi. Uma impressão/exportação
+  lenta ocupa o worker inteiro até terminar.
+- "asgi": workers Uvicorn em config.asgi. As consultas async esperam o banco
+  sem prender o worker, e o progresso ao vivo dos lotes (SSE) fica aberto.
+  Requer `pip install uvicorn-worker` (ou uvicorn[standard] < 0.30).
+
+Uso (systemd):
+
+    gunicorn -c config/gunicorn.conf.py
+
+Roteiro completo em docs/deploy-asgi.md.
+"""
+import multiprocessing
+import os
+
+MODO = os.getenv("ACOLHER_MODO", "wsgi").lower()
+
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+accesslog = "-"
+errorlog = "-"
+
+if MODO == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+    # Cada worker atende muitas conexões: menos processos que no modo síncrono
+    workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() + 1))
+    # Conexões SSE ficam abertas; o timeout do worker não deve derrubá-las
+    timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "sync"
@@ -55,6 +55,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.operacoes.middleware.AuditoriaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -92,6 +93,9 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD", ""),
         "HOST": os.getenv("DB_HOST", ""),
         "PORT": os.getenv("DB_PORT", ""),
+        # Sob ASGI (docs/deploy-asgi.md) manter 0: as views async usam o banco
+        # em threads do sync_to_async e conexões persistentes se acumulam por thread.
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "0")),
     }
 }
 
@@ -135,3 +139,38 @@ STATICFILES_DIRS = [BASE_DIR / "static"] if (BASE_DIR / "static").exists() else
 LOGIN_REDIRECT_URL = "/operacoes/"
 LOGOUT_REDIRECT_URL = "/accounts/login/"
 
+
+# Chave primária de novos Assistidos: UUIDv7 (ordenado no tempo). "0" volta ao uuid4.
+ASSISTIDOS_UUID_V7 = os.getenv("ASSISTIDOS_UUID_V7", "1") == "1"
+
+# Cache (facetas do admin etc.). Padrão em memória por processo; com vários
+# workers use um backend compartilhado, ex.:
+#   DJANGO_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+#   DJANGO_CACHE_LOCATION=/var/tmp/acolher_cache
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "acolher"),
+    }
+}
+
+
+# Tarefas em segundo plano (apps.operacoes.Tarefa + manage.py run_workers).
+# Com TAREFAS_SEGUNDO_PLANO=0 (padrão) as mesmas tarefas rodam dentro da
+# requisição, como antes; ligue só com ao menos um run_workers no ar.
+TAREFAS_SEGUNDO_PLANO = os.getenv("TAREFAS_SEGUNDO_PLANO", "0") == "1"
+TAREFAS_DIR = Path(os.getenv("TAREFAS_DIR", "/var/tmp/acolher_tarefas"))
+TAREFAS_RETENCAO_DIAS = int(os.getenv("TAREFAS_RETENCAO_DIAS", "7"))
+
+# PDF no servidor (fichas e chamadas em lote; requer weasyprint + pypdf)
+PDF_PROCESSOS = int(os.getenv("PDF_PROCESSOS", str(os.cpu_count() or 2)))
+PDF_CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR", str(TAREFAS_DIR / "cache_pdf")))
+
+# Arquivo de entregas (manage.py arquivar_lotes): lotes com entrega há mais
+# de N meses vão para tabelas frias; as consultas só as leem quando a data
+# inicial do filtro cai antes desse corte.
+ARQUIVO_ENTREGAS_MESES = int(os.getenv("ARQUIVO_ENTREGAS_MESES", "24"))
+
+# Ordem de rota da chamada (?ordem=rota): ponto de partida "lat,lon" (a sede).
+# Vazio: começa pelo bairro mais afastado do centro dos endereços do lote.
+ROTA_ENTREGAS_ORIGEM = os.getenv("ROTA_ENTREGAS_ORIGEM", "")